@@ -0,0 +1,158 @@
+"""Runs benchmark suite and saves results
+
+    $ python -m benchmarks                      # run all benchmarks
+    $ python -m benchmarks ls parse             # run only some of them
+    $ python -m benchmarks --compare results/2024-03-01T10-00-00.json
+    $ python -m benchmarks compare OLD.json NEW.json
+
+Every `benchmarks/bench_<name>.py` module with a `run()` function is a
+benchmark; `run()` returns flat dictionary of metric name -> number.
+Results are saved as JSON in `benchmarks/results/` (one file per run,
+named after start time) together with git revision, Python version and
+platform, so that runs of different revisions can be compared.
+"""
+import argparse
+import importlib
+import json
+import pkgutil
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).parent
+RESULTS_DIR = BENCHMARKS_DIR / 'results'
+PREFIX = 'bench_'
+
+
+def available() -> list[str]:
+    return sorted(
+        module.name.removeprefix(PREFIX)
+        for module in pkgutil.iter_modules([str(BENCHMARKS_DIR)])
+        if module.name.startswith(PREFIX)
+    )
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARKS_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: list[str]) -> dict:
+    report = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': {},
+    }
+    for name in names:
+        module = importlib.import_module(f'benchmarks.{PREFIX}{name}')
+        print(f'{name} ...', file=sys.stderr)
+        started_at = time.monotonic()
+        report['benchmarks'][name] = module.run()
+        print(
+            f'{name} done in {time.monotonic() - started_at:.1f}s',
+            file=sys.stderr
+        )
+
+    return report
+
+
+def save(report: dict, results_dir: Path = RESULTS_DIR) -> Path:
+    results_dir.mkdir(parents=True, exist_ok=True)
+    name = report['started_at'].replace(':', '-')
+    path = results_dir / f'{name}.json'
+    path.write_text(json.dumps(report, indent=2))
+
+    return path
+
+
+def load(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def compare(old: dict, new: dict) -> list[tuple[str, float, float, float]]:
+    """Returns (metric, old value, new value, change in %) of metrics
+    present in both reports"""
+    rows = []
+    for name, metrics in new['benchmarks'].items():
+        old_metrics = old['benchmarks'].get(name, {})
+        for metric, value in metrics.items():
+            if metric not in old_metrics:
+                continue
+            old_value = old_metrics[metric]
+            change = (value - old_value) / old_value * 100 if old_value \
+                else 0.0
+            rows.append((f'{name}.{metric}', old_value, value, change))
+
+    return rows
+
+
+def print_report(report: dict):
+    for name, metrics in report['benchmarks'].items():
+        for metric, value in metrics.items():
+            print(f'{name + "." + metric:45} {value:10.2f}')
+
+
+def print_comparison(old: dict, new: dict):
+    old_revision = old['revision'] or 'old'
+    new_revision = new['revision'] or 'new'
+    print(f'{"":45} {old_revision:>10} {new_revision:>10}')
+    for metric, old_value, value, change in compare(old, new):
+        print(f'{metric:45} {old_value:10.2f} {value:10.2f} {change:+8.1f}%')
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument(
+        'names',
+        nargs='*',
+        metavar='NAME',
+        help=f'benchmarks to run (default: all of {", ".join(available())})'
+    )
+    parser.add_argument(
+        '--compare',
+        type=Path,
+        metavar='RESULTS',
+        help='saved results to compare this run with'
+    )
+    parser.add_argument(
+        '--no-save',
+        action='store_true',
+        help='do not save results'
+    )
+    args = parser.parse_args(argv)
+
+    if args.names[:1] == ['compare']:
+        if len(args.names) != 3:
+            parser.error('compare expects two result files')
+        old, new = args.names[1:]
+        return print_comparison(load(Path(old)), load(Path(new)))
+
+    unknown = set(args.names) - set(available())
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    report = run(args.names or available())
+    if not args.no_save:
+        print(f'Results saved in {save(report)}', file=sys.stderr)
+
+    if args.compare:
+        print_comparison(load(args.compare), report)
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
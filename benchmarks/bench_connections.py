@@ -0,0 +1,74 @@
+"""TCP connections opened per imported document
+
+Imports a tree of small documents into the stand-in server twice: once
+with a fresh HTTP session per REST API call (how `ApiClient` used to
+work) and once with the shared keep-alive session.
+
+    $ python -m benchmarks.bench_connections
+"""
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+import papermerge_cli.api_client as api_client
+from benchmarks.server import StandInServer
+from papermerge_cli.lib.importer import upload_file_or_folder
+
+DOCUMENTS = 50
+
+
+class OneShotSession(requests.Session):
+    """Session closed after first request i.e. `requests.post` & co"""
+
+    def request(self, *args, **kwargs):
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            self.close()
+
+
+def make_tree(root: Path, count: int) -> Path:
+    for index in range(count):
+        (root / f'doc-{index:04}.pdf').write_bytes(b'%PDF-1.4 bench')
+
+    return root
+
+
+def import_tree(source: Path) -> dict[str, float]:
+    with StandInServer() as server:
+        upload_file_or_folder(
+            host=server.host,
+            token='bench',
+            file_or_folder=source
+        )
+        state = server.state
+
+    return {
+        'connections': state.connections,
+        'requests': state.requests,
+        'connections_per_document': state.connections / DOCUMENTS,
+    }
+
+
+def run() -> dict[str, float]:
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = make_tree(Path(tmp), DOCUMENTS)
+
+        with mock.patch.object(api_client, 'get_session', OneShotSession):
+            for key, value in import_tree(source).items():
+                results[f'per_call_session.{key}'] = value
+
+        api_client.configure()
+        for key, value in import_tree(source).items():
+            results[f'shared_session.{key}'] = value
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f'{name:45} {value:10.2f}')
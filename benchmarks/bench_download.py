@@ -0,0 +1,86 @@
+"""Download throughput and memory
+
+Downloads `DOCUMENTS` documents of `SIZE` bytes each from the stand-in
+server, with one and with several workers, and reports throughput and
+peak of Python allocations. Content is streamed to disk in chunks, so
+the peak stays flat regardless of document size. Finally, one download
+is interrupted half way and resumed.
+
+    $ python -m benchmarks.bench_download [size in MB]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.server import StandInServer
+from papermerge_cli.lib.download import (PART_SUFFIX, DownloadStats,
+                                         perform_bulk_download)
+
+DOCUMENTS = 4
+SIZE = 256 * 1024 * 1024
+WORKERS = (1, 4)
+
+
+def download(server, node_ids, target_dir: Path, workers: int) -> dict:
+    stats = DownloadStats()
+    tracemalloc.start()
+    for result in perform_bulk_download(
+        host=server.host,
+        token='bench',
+        node_ids=node_ids,
+        target_dir=target_dir,
+        workers=workers
+    ):
+        if not result.ok:
+            raise RuntimeError(result.error)
+        stats.add(result)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats.finished_at = time.monotonic()
+
+    return {
+        'mb_per_second': stats.mb_per_second,
+        'peak_traced_memory_mb': peak / 1024 / 1024,
+    }
+
+
+def run(size: int = SIZE) -> dict[str, float]:
+    results = {'total_mb': DOCUMENTS * size / 1024 / 1024}
+
+    with StandInServer() as server:
+        node_ids = [
+            server.state.add_document(
+                server.state.home_folder_id,
+                title=f'document-{index}.pdf',
+                size=size
+            )['id']
+            for index in range(DOCUMENTS)
+        ]
+        for workers in WORKERS:
+            with tempfile.TemporaryDirectory() as tmp:
+                metrics = download(server, node_ids, Path(tmp), workers)
+            for key, value in metrics.items():
+                results[f'workers_{workers}.{key}'] = value
+
+        with tempfile.TemporaryDirectory() as tmp:
+            download(server, node_ids[:1], Path(tmp), workers=1)
+            # interrupted half way: only half of the document on disk
+            path = Path(tmp) / 'document-0.pdf'
+            part = path.with_name(path.name + PART_SUFFIX)
+            path.replace(part)
+            with open(part, 'r+b') as f:
+                f.truncate(size // 2)
+            before = server.state.downloaded_bytes
+            download(server, node_ids[:1], Path(tmp), workers=1)
+            transferred = server.state.downloaded_bytes - before
+            results['resume.transferred_mb'] = transferred / 1024 / 1024
+
+    return results
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else SIZE
+    for name, value in run(size).items():
+        print(f'{name:45} {value:10.2f}')
@@ -0,0 +1,88 @@
+"""Import throughput
+
+Imports two kinds of trees into the stand-in server: many small files
+spread over a few folders and a few huge (sparse) files. Each tree is
+imported sequentially and with several workers, and once more with
+deduplication: every file is hashed and, as all files of a tree have
+the same content, only one of them is uploaded. The server answers
+every request after `LATENCY` seconds, as a real one over the network
+would.
+
+    $ python -m benchmarks.bench_import
+"""
+import tempfile
+from pathlib import Path
+
+from benchmarks.server import StandInServer
+from papermerge_cli.lib.importer import upload_file_or_folder
+
+SMALL_FILES = 500
+SMALL_FILE_SIZE = 4 * 1024
+SMALL_FOLDERS = 10
+HUGE_FILES = 3
+HUGE_FILE_SIZE = 128 * 1024 * 1024
+WORKERS = (1, 8)
+LATENCY = 0.005
+
+
+def make_small_tree(root: Path) -> Path:
+    for index in range(SMALL_FILES):
+        folder = root / f'folder-{index % SMALL_FOLDERS:02}'
+        folder.mkdir(exist_ok=True)
+        (folder / f'doc-{index:05}.pdf').write_bytes(
+            b'%PDF-1.4'.ljust(SMALL_FILE_SIZE, b' ')
+        )
+
+    return root
+
+
+def make_huge_tree(root: Path) -> Path:
+    for index in range(HUGE_FILES):
+        with open(root / f'huge-{index}.pdf', 'wb') as f:
+            f.truncate(HUGE_FILE_SIZE)
+
+    return root
+
+
+def import_tree(
+    source: Path,
+    workers: int,
+    dedup: str | None = None
+) -> dict[str, float]:
+    with StandInServer(latency=LATENCY) as server:
+        stats = upload_file_or_folder(
+            host=server.host,
+            token='bench',
+            file_or_folder=source,
+            workers=workers,
+            resume=False,
+            dedup=dedup
+        )
+
+    return {
+        'seconds': stats.elapsed,
+        'files_per_second': stats.files_per_second,
+        'mb_per_second': stats.mb_per_second,
+    }
+
+
+def run() -> dict[str, float]:
+    results = {}
+    trees = {'small': make_small_tree, 'huge': make_huge_tree}
+
+    for name, make_tree in trees.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            source = make_tree(Path(tmp))
+            for workers in WORKERS:
+                for key, value in import_tree(source, workers).items():
+                    results[f'{name}.workers_{workers}.{key}'] = value
+            workers = max(WORKERS)
+            for key, value in import_tree(source, workers, 'skip').items():
+                results[f'{name}.workers_{workers}.dedup.{key}'] = value
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f'{name:45} {value:10.2f}')
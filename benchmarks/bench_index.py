@@ -0,0 +1,86 @@
+"""`ls` and find: REST API vs local index
+
+Syncs the stand-in server (folder of `NODES` documents plus a tree of
+`FOLDERS` subfolders) into local index, then compares listing one page
+and finding nodes by tag live and from the index. Server answers every
+request after `LATENCY` seconds, as a real one over the network would.
+
+    $ python -m benchmarks.bench_index
+"""
+import os
+import tempfile
+import time
+import timeit
+
+from benchmarks.server import StandInServer
+from papermerge_cli.lib.index import (Index, account_index_path,
+                                      find_nodes_live, sync_index)
+from papermerge_cli.lib.nodes import list_nodes
+
+NODES = 1000
+FOLDERS = 50
+LATENCY = 0.005
+REPEAT = 5
+
+
+def best_of(func, number: int = 1) -> float:
+    """Returns best time (in ms) of one call"""
+    times = timeit.repeat(func, repeat=REPEAT, number=number)
+    return min(times) / number * 1000
+
+
+def run() -> dict[str, float]:
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            StandInServer(latency=LATENCY) as server:
+        os.environ['XDG_CACHE_HOME'] = tmp
+        home = server.state.home_folder_id
+        server.state.populate(home, NODES)
+        for index in range(FOLDERS):
+            folder = server.state.add_node(home, f'folder-{index}', 'folder')
+            server.state.populate(folder['id'], 10)
+
+        index = Index(account_index_path(server.host, 'bench'))
+        started_at = time.monotonic()
+        sync_index(host=server.host, token='bench', index=index)
+        results['sync_ms'] = (time.monotonic() - started_at) * 1000
+        started_at = time.monotonic()
+        sync_index(host=server.host, token='bench', index=index)
+        results['resync_unchanged_ms'] = (
+            time.monotonic() - started_at
+        ) * 1000
+
+        for size in (15, 1000):
+            results[f'ls_page_{size}.live_ms'] = best_of(
+                lambda: list_nodes(
+                    host=server.host,
+                    token='bench',
+                    parent_id=home,
+                    page_size=size
+                )
+            )
+            results[f'ls_page_{size}.index_ms'] = best_of(
+                lambda: index.page(home, page_size=size),
+                number=10
+            )
+
+        results['find_tag.live_ms'] = best_of(
+            lambda: list(find_nodes_live(
+                host=server.host,
+                token='bench',
+                tags=['tag-3']
+            ))
+        )
+        results['find_tag.index_ms'] = best_of(
+            lambda: list(index.find(tags=['tag-3'])),
+            number=10
+        )
+        index.close()
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f'{name:45} {value:10.2f}')
@@ -0,0 +1,73 @@
+"""`ls` latency and rendering cost
+
+Measures, against the stand-in server with a folder of `NODES`
+documents:
+
+* round trip of one `ls` page (request, response parsing) for page
+  sizes 15 and 1000
+* cost of building and rendering the rich table of that page
+  (rendered into an in-memory console)
+
+    $ python -m benchmarks.bench_ls
+"""
+import io
+import timeit
+
+from rich.console import Console
+
+from benchmarks.server import StandInServer
+from papermerge_cli.format.nodes import list_nodes as format_list_nodes
+from papermerge_cli.lib.nodes import list_nodes
+
+NODES = 1000
+PAGE_SIZES = (15, 1000)
+REPEAT = 5
+
+
+def best_of(func, number: int) -> float:
+    """Returns best time (in ms) of one call"""
+    times = timeit.repeat(func, repeat=REPEAT, number=number)
+    return min(times) / number * 1000
+
+
+def render(data) -> str:
+    console = Console(
+        file=io.StringIO(),
+        width=160,
+        force_terminal=True,
+        color_system='truecolor'
+    )
+    console.print(format_list_nodes(data))
+    return console.file.getvalue()
+
+
+def run() -> dict[str, float]:
+    results = {}
+
+    with StandInServer() as server:
+        folder_id = server.state.home_folder_id
+        server.state.populate(folder_id, NODES)
+
+        for size in PAGE_SIZES:
+            def fetch():
+                return list_nodes(
+                    host=server.host,
+                    token='bench',
+                    parent_id=folder_id,
+                    page_size=size
+                )
+
+            number = max(1, 1000 // size)
+            data = fetch()
+            results[f'page_{size}.fetch_ms'] = best_of(fetch, number)
+            results[f'page_{size}.render_ms'] = best_of(
+                lambda: render(data),
+                number
+            )
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f'{name:45} {value:10.2f}')
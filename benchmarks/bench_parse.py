@@ -0,0 +1,113 @@
+"""Cost of parsing one page of nodes
+
+Compares how `Paginator[Node]` page used to be parsed (JSON decoded to
+python dicts, then validated field by field, with `document` part built
+by hand) with parsing straight from raw bytes via cached type adapter.
+
+    $ python -m benchmarks.bench_parse
+"""
+import json
+import timeit
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, field_validator
+
+from papermerge_cli.schema import Node, Paginator
+from papermerge_cli.schema.adapters import parse_json
+from papermerge_cli.schema.nodes import DocumentNode, NodeType
+
+PAGE_SIZES = (15, 1000)
+REPEAT = 5
+
+T = TypeVar('T')
+
+
+class LegacyPaginator(BaseModel, Generic[T]):
+    """`Paginator` with its original `items` annotation"""
+    page_size: int
+    page_number: int
+    num_pages: int
+    items: Sequence[T]
+
+
+class LegacyNode(Node):
+    """`Node` with its original `document` validator"""
+
+    @field_validator('document', mode='before')
+    def document_validator(cls, value, values):
+        if values.data['ctype'] == NodeType.document:
+            return DocumentNode(
+                ocr_status=value['ocr_status'],
+                ocr=value['ocr']
+            )
+
+        return None
+
+
+def make_page(size: int) -> bytes:
+    timestamp = datetime.now(timezone.utc).isoformat()
+    items = []
+    for index in range(size):
+        is_document = index % 5 != 0
+        items.append({
+            'id': str(uuid.uuid4()),
+            'title': f'node-{index}',
+            'ctype': 'document' if is_document else 'folder',
+            'tags': [
+                {'name': f'tag-{tag}', 'bg_color': '#fff', 'fg_color': '#000'}
+                for tag in range(index % 4)
+            ],
+            'created_at': timestamp,
+            'updated_at': timestamp,
+            'parent_id': str(uuid.uuid4()),
+            'user_id': str(uuid.uuid4()),
+            'document': {'ocr': True, 'ocr_status': 'SUCCESS'}
+            if is_document else None,
+        })
+
+    return json.dumps({
+        'page_size': size,
+        'page_number': 1,
+        'num_pages': 1,
+        'items': items
+    }).encode()
+
+
+def legacy_parse(body: bytes):
+    return LegacyPaginator[LegacyNode](**json.loads(body))
+
+
+def parse(body: bytes):
+    return parse_json(Paginator[Node], body)
+
+
+def best_of(func, body: bytes, number: int) -> float:
+    """Returns best time (in ms) of one call"""
+    times = timeit.repeat(
+        lambda: func(body),
+        repeat=REPEAT,
+        number=number
+    )
+    return min(times) / number * 1000
+
+
+def run() -> dict[str, float]:
+    results = {}
+    for size in PAGE_SIZES:
+        body = make_page(size)
+        number = max(1, 2000 // size)
+        legacy = best_of(legacy_parse, body, number)
+        current = best_of(parse, body, number)
+        results[f'page_{size}.legacy_ms'] = legacy
+        results[f'page_{size}.validate_json_ms'] = current
+        results[f'page_{size}.speedup'] = legacy / current
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f'{name:45} {value:10.3f}')
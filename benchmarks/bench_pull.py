@@ -0,0 +1,67 @@
+"""Initial and repeated `pull` of a large folder tree
+
+Pulls folder of `DOCUMENTS` small documents (spread over `FOLDERS`
+folders) from the stand-in server twice. The second pull finds nothing
+changed: it only lists folders and checks local files, without any
+per-document request.
+
+    $ python -m benchmarks.bench_pull [number of documents]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.server import StandInServer
+from papermerge_cli.lib.pull import pull_folder
+
+DOCUMENTS = 5_000
+FOLDERS = 100
+SIZE = 1024
+
+
+def pull(server, folder_id, target_dir: Path) -> tuple[float, int]:
+    requests = server.state.requests
+    started_at = time.monotonic()
+    stats = pull_folder(
+        host=server.host,
+        token='bench',
+        folder_id=folder_id,
+        target_dir=target_dir,
+        workers=8
+    )
+    if stats.errors:
+        raise RuntimeError(stats.errors[0])
+
+    return time.monotonic() - started_at, server.state.requests - requests
+
+
+def run(documents: int = DOCUMENTS) -> dict[str, float]:
+    results = {'documents': documents}
+
+    with tempfile.TemporaryDirectory() as tmp, StandInServer() as server:
+        root_id = server.state.home_folder_id
+        folders = [
+            server.state.add_node(root_id, f'folder-{index}', 'folder')['id']
+            for index in range(FOLDERS)
+        ]
+        for index in range(documents):
+            server.state.add_document(
+                folders[index % FOLDERS],
+                title=f'document-{index:06}.pdf',
+                size=SIZE
+            )
+
+        for name in ('initial', 'repeated'):
+            seconds, requests = pull(server, root_id, Path(tmp))
+            results[f'{name}.seconds'] = seconds
+            results[f'{name}.requests'] = requests
+            results[f'{name}.documents_per_second'] = documents / seconds
+
+    return results
+
+
+if __name__ == '__main__':
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else DOCUMENTS
+    for name, value in run(documents).items():
+        print(f'{name:45} {value:10.2f}')
@@ -0,0 +1,57 @@
+"""CLI cold start time
+
+Runs the CLI in a fresh interpreter, the way a shell runs it, and
+reports the best wall-clock time of:
+
+* bare interpreter start up, for reference
+* `import papermerge_cli.main`
+* `--help` - start up cost only (imports, command line parsing)
+* `me` - start up plus one REST API call to the stand-in server
+
+    $ python -m benchmarks.bench_startup
+"""
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.server import StandInServer
+
+REPEAT = 10
+CLI = 'from papermerge_cli.main import app; app()'
+
+
+def best_of(args: list[str], env: dict | None = None) -> float:
+    """Returns best time (in ms) of running `python args`"""
+    times = []
+    for _ in range(REPEAT):
+        started_at = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+        times.append(time.perf_counter() - started_at)
+
+    return min(times) * 1000
+
+
+def run() -> dict[str, float]:
+    with StandInServer() as server:
+        env = {
+            **os.environ,
+            'PAPERMERGE_CLI__HOST': server.host,
+            'PAPERMERGE_CLI__TOKEN': 'bench',
+        }
+        return {
+            'python_ms': best_of(['-c', 'pass']),
+            'import_main_ms': best_of(['-c', 'import papermerge_cli.main']),
+            'help_ms': best_of(['-c', CLI, '--help'], env),
+            'me_ms': best_of(['-c', CLI, 'me'], env),
+        }
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f'{name:45} {value:10.2f}')
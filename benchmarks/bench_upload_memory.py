@@ -0,0 +1,52 @@
+"""Peak memory of uploading one large document
+
+Uploads a (sparse) file of `SIZE` bytes to the stand-in server and
+reports peak of Python allocations during upload. With streamed
+multipart body the peak stays around a few chunks, regardless of file
+size.
+
+    $ python -m benchmarks.bench_upload_memory [size in MB]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.server import StandInServer
+from papermerge_cli.rest import upload_document
+
+SIZE = 1024 * 1024 * 1024  # 1 GB
+
+
+def run(size: int = SIZE) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp, StandInServer() as server:
+        file_path = Path(tmp) / 'large.pdf'
+        with open(file_path, 'wb') as f:
+            f.truncate(size)
+
+        tracemalloc.start()
+        started_at = time.monotonic()
+        upload_document(
+            host=server.host,
+            token='bench',
+            file_path=file_path,
+            parent_id=server.state.inbox_folder_id
+        )
+        elapsed = time.monotonic() - started_at
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        uploaded = server.state.uploaded_bytes
+
+    return {
+        'file_size_mb': size / 1024 / 1024,
+        'uploaded_mb': uploaded / 1024 / 1024,
+        'peak_traced_memory_mb': peak / 1024 / 1024,
+        'mb_per_second': size / 1024 / 1024 / elapsed,
+    }
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else SIZE
+    for name, value in run(size).items():
+        print(f'{name:45} {value:10.2f}')
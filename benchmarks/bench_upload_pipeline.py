@@ -0,0 +1,82 @@
+"""Upload throughput with node creation pipelined ahead of upload
+
+Uploads same set of files into the stand-in server, which answers
+every request after `LATENCY` seconds, in two ways with `WORKERS`
+concurrent uploads:
+
+- two_step: each worker creates document node and then uploads its
+  content, one request after the other (as `rest.upload_document`)
+- pipelined: importer creates nodes in its own stage, so that node of
+  the next file is ready when upload of the previous one completes
+
+    $ python -m benchmarks.bench_upload_pipeline
+"""
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.server import StandInServer
+from papermerge_cli.lib.importer import Importer
+from papermerge_cli.rest import upload_document
+
+FILES = 200
+FILE_SIZE = 64 * 1024
+WORKERS = 4
+LATENCY = 0.02
+
+
+def make_files(root: Path) -> list[Path]:
+    paths = []
+    for index in range(FILES):
+        path = root / f'doc-{index:05}.pdf'
+        path.write_bytes(b'%PDF-1.4'.ljust(FILE_SIZE, b' '))
+        paths.append(path)
+
+    return paths
+
+
+def two_step(server: StandInServer, paths: list[Path]) -> float:
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        list(executor.map(
+            lambda path: upload_document(
+                host=server.host,
+                token='bench',
+                file_path=path,
+                parent_id=server.state.inbox_folder_id
+            ),
+            paths
+        ))
+
+    return time.monotonic() - started_at
+
+
+def pipelined(server: StandInServer, source: Path) -> float:
+    importer = Importer(host=server.host, token='bench', workers=WORKERS)
+    stats = importer.run(source, parent_id=server.state.inbox_folder_id)
+
+    return stats.elapsed
+
+
+def run() -> dict[str, float]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_files(Path(tmp))
+        with StandInServer(latency=LATENCY) as server:
+            results['two_step.seconds'] = two_step(server, paths)
+        with StandInServer(latency=LATENCY) as server:
+            results['pipelined.seconds'] = pipelined(server, Path(tmp))
+
+    for name in ('two_step', 'pipelined'):
+        results[f'{name}.files_per_second'] = \
+            FILES / results[f'{name}.seconds']
+    results['speedup'] = \
+        results['two_step.seconds'] / results['pipelined.seconds']
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f'{name:45} {value:10.2f}')
@@ -0,0 +1,316 @@
+"""Minimal stand-in for Papermerge REST API server
+
+Serves just enough of the REST API for the CLI hot paths to run
+against it over real TCP connections. Keeps everything in memory and
+counts accepted connections, which makes it possible to measure how
+many connections/requests client code opens.
+"""
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+NODES_URL = re.compile(r'^/api/nodes/(?P<id>[0-9a-f-]+)/?$')
+TAGS_URL = re.compile(r'^/api/nodes/(?P<id>[0-9a-f-]+)/tags$')
+UPLOAD_URL = re.compile(r'^/api/documents/(?P<id>[0-9a-f-]+)/upload$')
+DOCUMENT_URL = re.compile(r'^/api/documents/(?P<id>[0-9a-f-]+)$')
+DOWNLOAD_URL = re.compile(
+    r'^/api/document-versions/(?P<id>[0-9a-f-]+)/download$'
+)
+# content of downloaded files is this block repeated
+BLOCK = bytes(range(256)) * 256
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class State:
+    """In-memory content of the stand-in server"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.user_id = str(uuid.uuid4())
+        self.home_folder_id = str(uuid.uuid4())
+        self.inbox_folder_id = str(uuid.uuid4())
+        # node_id -> node dict
+        self.nodes = {}
+        # parent_id -> list of child node ids
+        self.children = {}
+        # document version id -> size of its (synthetic) file
+        self.files = {}
+        self.connections = 0
+        self.requests = 0
+        self.uploaded_bytes = 0
+        self.downloaded_bytes = 0
+
+    def user(self) -> dict:
+        return {
+            'id': self.user_id,
+            'username': 'bench',
+            'email': 'bench@example.com',
+            'created_at': now(),
+            'updated_at': now(),
+            'home_folder_id': self.home_folder_id,
+            'inbox_folder_id': self.inbox_folder_id,
+        }
+
+    def add_node(
+        self,
+        parent_id: str,
+        title: str,
+        ctype: str,
+        tags: list[str] | None = None
+    ) -> dict:
+        timestamp = now()
+        node = {
+            'id': str(uuid.uuid4()),
+            'title': title,
+            'ctype': ctype,
+            'tags': [
+                {'name': name, 'bg_color': '#fff', 'fg_color': '#000'}
+                for name in (tags or [])
+            ],
+            'created_at': timestamp,
+            'updated_at': timestamp,
+            'parent_id': parent_id,
+            'user_id': self.user_id,
+            'breadcrumb': [],
+            'versions': [],
+            'ocr': True,
+            'ocr_status': 'UNKNOWN',
+        }
+        if ctype == 'document':
+            node['document'] = {'ocr': True, 'ocr_status': 'UNKNOWN'}
+        else:
+            node['document'] = None
+
+        with self.lock:
+            self.nodes[node['id']] = node
+            self.children.setdefault(parent_id, []).append(node['id'])
+
+        return node
+
+    def add_document(self, parent_id: str, title: str, size: int) -> dict:
+        """Adds document with one version of `size` bytes"""
+        node = self.add_node(parent_id, title=title, ctype='document')
+        version_id = str(uuid.uuid4())
+        node['versions'] = [{
+            'id': version_id,
+            'number': 1,
+            'lang': 'deu',
+            'file_name': title,
+            'size': size,
+            'page_count': 1,
+            'short_description': '',
+            'document_id': node['id'],
+            'download_url': f'/api/document-versions/{version_id}/download',
+        }]
+        with self.lock:
+            self.files[version_id] = size
+
+        return node
+
+    def populate(self, parent_id: str, count: int, ctype='document'):
+        """Adds `count` synthetic nodes to the folder `parent_id`"""
+        for index in range(count):
+            self.add_node(
+                parent_id,
+                title=f'{ctype}-{index:06}.pdf',
+                ctype=ctype,
+                tags=['bench', f'tag-{index % 7}']
+            )
+
+    def page(self, parent_id: str, page_number: int, page_size: int):
+        child_ids = self.children.get(parent_id, [])
+        num_pages = max(1, -(-len(child_ids) // page_size))
+        start = (page_number - 1) * page_size
+        items = [
+            self.nodes[child_id]
+            for child_id in child_ids[start:start + page_size]
+        ]
+        return {
+            'page_size': page_size,
+            'page_number': page_number,
+            'num_pages': num_pages,
+            'items': items,
+        }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately; without TCP_NODELAY
+    # small responses stall on delayed ACKs of the client
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self) -> State:
+        return self.server.state
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def iter_body(self, chunk_size: int = 64 * 1024):
+        if self.headers.get('Transfer-Encoding', '') == 'chunked':
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining > 0:
+            chunk = self.rfile.read(min(chunk_size, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    def read_body(self) -> bytes:
+        return b''.join(self.iter_body())
+
+    def discard_body(self) -> int:
+        """Reads request body without keeping it in memory"""
+        return sum(len(chunk) for chunk in self.iter_body())
+
+    def respond(self, status: int, payload=None):
+        with self.state.lock:
+            self.state.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_file(self, size: int):
+        """Streams synthetic file of `size` bytes, honouring Range"""
+        with self.state.lock:
+            self.state.requests += 1
+        start = 0
+        if match := re.match(r'bytes=(\d+)-$', self.headers.get('Range', '')):
+            start = int(match[1])
+        if start and start >= size:
+            self.send_response(416)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(206 if start else 200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(size - start))
+        if start:
+            self.send_header(
+                'Content-Range',
+                f'bytes {start}-{size - 1}/{size}'
+            )
+        self.end_headers()
+
+        position = start
+        while position < size:
+            offset = position % len(BLOCK)
+            chunk = BLOCK[offset:offset + size - position]
+            self.wfile.write(chunk)
+            position += len(chunk)
+        with self.state.lock:
+            self.state.downloaded_bytes += size - start
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == '/api/users/me':
+            return self.respond(200, self.state.user())
+
+        if url.path == '/api/version/':
+            return self.respond(200, {'version': '3.1'})
+
+        if match := DOCUMENT_URL.match(url.path):
+            if match['id'] not in self.state.nodes:
+                return self.respond(404, {'detail': 'Not found'})
+            return self.respond(200, self.state.nodes[match['id']])
+
+        if match := DOWNLOAD_URL.match(url.path):
+            return self.send_file(self.state.files[match['id']])
+
+        if match := NODES_URL.match(url.path):
+            page = self.state.page(
+                match['id'],
+                page_number=int(query.get('page_number', ['1'])[0]),
+                page_size=int(query.get('page_size', ['15'])[0]),
+            )
+            return self.respond(200, page)
+
+        self.respond(404, {'detail': 'Not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        if match := UPLOAD_URL.match(url.path):
+            size = self.discard_body()
+            with self.state.lock:
+                self.state.uploaded_bytes += size
+                node = self.state.nodes[match['id']]
+            return self.respond(200, node)
+
+        body = self.read_body()
+
+        if url.path == '/api/nodes/':
+            data = json.loads(body)
+            node = self.state.add_node(
+                data['parent_id'],
+                title=data['title'],
+                ctype=data['ctype']
+            )
+            return self.respond(201, node)
+
+        if TAGS_URL.match(url.path):
+            return self.respond(200, {})
+
+        self.respond(404, {'detail': 'Not found'})
+
+    def do_PATCH(self):
+        self.read_body()
+        self.respond(200, {})
+
+    def do_DELETE(self):
+        self.read_body()
+        self.respond(200, {})
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0):
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.state = State()
+        # artificial delay (in seconds) added to every request
+        self.latency = latency
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
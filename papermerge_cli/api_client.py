@@ -1,19 +1,97 @@
+import threading
+import time
 from mimetypes import guess_type
 from pathlib import Path
 from typing import Generic, TypeVar
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from papermerge_cli import metrics, tracing
+from papermerge_cli.constants import (DEFAULT_CONNECT_TIMEOUT,
+                                      DEFAULT_POOL_SIZE, DEFAULT_READ_TIMEOUT)
 from papermerge_cli.exceptions import FileMimeTypeUnknown
+from papermerge_cli.multipart import CHUNK_SIZE, MultipartFile
+from papermerge_cli.retry import get_retry_policy
+from papermerge_cli.schema.adapters import parse_json
 
 T = TypeVar('T')
 
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_pool_size = DEFAULT_POOL_SIZE
+_timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+
+def make_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Returns new HTTP session backed by a keep-alive connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def configure(
+    pool_size: int | None = None,
+    connect_timeout: float | None = None,
+    read_timeout: float | None = None
+) -> None:
+    """Configures HTTP session shared by all `ApiClient` instances
+
+    Only provided settings are changed. Session is (re)created with
+    given pool size.
+    """
+    global _session, _pool_size, _timeout
+
+    with _session_lock:
+        _timeout = (
+            connect_timeout or _timeout[0],
+            read_timeout or _timeout[1]
+        )
+        if pool_size is not None:
+            _pool_size = pool_size
+            if _session is not None:
+                _session.close()
+            _session = make_session(pool_size=pool_size)
+
+
+def get_session() -> requests.Session:
+    """Returns HTTP session shared by all `ApiClient` instances
+
+    Session is created on first use and lives for the whole CLI
+    invocation, this way all REST API calls reuse same TCP/TLS
+    connections instead of opening new one for every request.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = make_session(pool_size=_pool_size)
+
+        return _session
+
+
+def is_absolute(url: str) -> bool:
+    return url.startswith(('http://', 'https://'))
+
 
 class ApiClient(Generic[T]):
 
-    def __init__(self, host: str, token: str):
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        session: requests.Session | None = None
+    ):
         self.host = host
         self.token = token
+        self.session = session or get_session()
+        self.timeout = _timeout
 
     def get(
         self,
@@ -21,15 +99,16 @@ class ApiClient(Generic[T]):
         response_model,
         query_params=None
     ) -> T:
-        response = requests.get(
-            f"{self.host}{url}",
+        response = self.request(
+            'GET',
+            url,
             headers=self.headers,
             params=query_params
         )
         if response.status_code != 200:
             raise ValueError(response.text)
 
-        return response_model(**response.json())
+        return parse_json(response_model, response.content)
 
     def post(
         self,
@@ -41,8 +120,9 @@ class ApiClient(Generic[T]):
             'Content-Type': 'application/json',
             **self.headers
         }
-        response = requests.post(
-            f"{self.host}{url}",
+        response = self.request(
+            'POST',
+            url,
             headers=headers,
             json=json
         )
@@ -51,7 +131,7 @@ class ApiClient(Generic[T]):
             raise ValueError(response.text)
 
         if response_model:
-            return response_model(**response.json())
+            return parse_json(response_model, response.content)
 
     def patch(
         self,
@@ -59,8 +139,9 @@ class ApiClient(Generic[T]):
         json,
         response_model=None
     ):
-        response = requests.patch(
-            f"{self.host}{url}",
+        response = self.request(
+            'PATCH',
+            url,
             headers=self.headers,
             json=json
         )
@@ -69,47 +150,195 @@ class ApiClient(Generic[T]):
             raise ValueError(response.text)
 
         if response_model:
-            return response_model(**response.json())
+            return parse_json(response_model, response.content)
 
     def delete(
         self,
         url,
         json,
     ):
-        requests.delete(
-            f"{self.host}{url}",
+        response = self.request(
+            'DELETE',
+            url,
             headers=self.headers,
             json=json
         )
 
+        if response.status_code not in (200, 201, 204):
+            raise ValueError(response.text)
+
     def upload(
         self,
         url: str,
         file_path: Path,
         response_model
     ) -> T:
-        mime_type, _ = guess_type(file_path)
+        with tracing.span('mime type', 'io', path=file_path):
+            mime_type, _ = guess_type(file_path)
 
         if mime_type is None:
             msg = f"{file_path} mime type cannot be guessed"
             raise FileMimeTypeUnknown(msg)
 
-        data = open(file_path, 'rb').read()
-        # https://stackoverflow.com/a/35974071/381116
-        multipart_form_data = {
-            'file': (file_path.name, data, mime_type),
-        }
-        response = requests.post(
-            f"{self.host}{url}",
-            headers=self.headers,
-            files=multipart_form_data
-        )
+        # body is streamed from disk, file is never loaded in memory
+        with MultipartFile(file_path, mime_type) as body:
+            response = self.request(
+                'POST',
+                url,
+                headers={
+                    'Content-Type': body.content_type,
+                    **self.headers
+                },
+                data=body
+            )
 
         if response.status_code != 200:
             raise ValueError(response.text)
 
-        return response_model(**response.json())
+        return parse_json(response_model, response.content)
+
+    def download(
+        self,
+        url: str,
+        file_path: Path,
+        chunk_size: int = CHUNK_SIZE
+    ) -> int:
+        """Streams content at `url` into `file_path`, chunk by chunk
+
+        Content is never held in memory as a whole. If `file_path`
+        already has (partial) content, only the missing bytes are
+        requested (with HTTP Range header); transfer broken half way is
+        resumed the same way, according to the retry policy. Returns
+        number of bytes received.
+        """
+        retry = get_retry_policy().begin()
+        received = 0
+        # absolute URLs (e.g. pre-signed storage URLs) need no token
+        headers = {} if is_absolute(url) else self.headers
+
+        while True:
+            offset = file_path.stat().st_size if file_path.exists() else 0
+            range_headers = {'Range': f'bytes={offset}-'} if offset else {}
+            response = self.request(
+                'GET',
+                url,
+                headers={**headers, **range_headers},
+                stream=True
+            )
+            try:
+                if response.status_code == 416:
+                    # nothing left to download beyond `offset`
+                    return received
+                if response.status_code not in (200, 206):
+                    raise ValueError(response.text)
+
+                # server may ignore Range header and send everything
+                mode = 'ab' if response.status_code == 206 else 'wb'
+                with open(file_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk)
+                        received += len(chunk)
+
+                return received
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                delay = retry.on_error('GET', connect_failed=False)
+                if delay is None:
+                    raise
+            finally:
+                response.close()
+
+            time.sleep(delay)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends request, retrying it according to the retry policy
+
+        Connection errors/timeouts are retried for idempotent methods,
+        429/502/503 responses for all methods (see `RetryPolicy`).
+        Call is recorded in metrics (if enabled), with its latency
+        covering all attempts.
+        """
+        retry = get_retry_policy().begin()
+        data = kwargs.get('data')
+        started_at = time.perf_counter()
+
+        with tracing.span(f'{method} {url}', 'http') as span:
+            while True:
+                wait = retry.before_attempt()
+                if wait:
+                    time.sleep(wait)
+                if retry.retries and isinstance(data, MultipartFile):
+                    data.rewind()
+                try:
+                    response = self.session.request(
+                        method,
+                        url if is_absolute(url) else f"{self.host}{url}",
+                        timeout=self.timeout,
+                        **kwargs
+                    )
+                except (requests.ConnectionError, requests.Timeout) as ex:
+                    delay = retry.on_error(
+                        method,
+                        connect_failed=isinstance(
+                            ex,
+                            requests.ConnectTimeout
+                        )
+                    )
+                    if delay is None:
+                        metrics.record(
+                            method,
+                            url,
+                            status=None,
+                            seconds=time.perf_counter() - started_at,
+                            retries=retry.retries
+                        )
+                        span.set(retries=retry.retries)
+                        raise
+                else:
+                    delay = retry.on_response(
+                        method,
+                        response.status_code,
+                        retry_after=response.headers.get('Retry-After')
+                    )
+                    if delay is None:
+                        metrics.record(
+                            method,
+                            url,
+                            status=response.status_code,
+                            seconds=time.perf_counter() - started_at,
+                            sent=_sent_bytes(response.request.body),
+                            received=_received_bytes(
+                                response,
+                                streamed=kwargs.get('stream', False)
+                            ),
+                            retries=retry.retries
+                        )
+                        span.set(
+                            status=response.status_code,
+                            retries=retry.retries
+                        )
+                        return response
+
+                time.sleep(delay)
 
     @property
     def headers(self) -> dict[str, str]:
         return {'Authorization': f'Bearer {self.token}'}
+
+
+def _sent_bytes(body) -> int:
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        # body of unknown length, e.g. generator
+        return 0
+
+
+def _received_bytes(response: requests.Response, streamed: bool) -> int:
+    if streamed:
+        # content is not read yet; count what server announced
+        return int(response.headers.get('Content-Length') or 0)
+
+    return len(response.content)
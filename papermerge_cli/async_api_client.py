@@ -0,0 +1,290 @@
+import asyncio
+import time
+import weakref
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Generic, TypeVar
+
+import httpx
+
+from papermerge_cli import metrics, tracing
+from papermerge_cli.constants import (DEFAULT_CONNECT_TIMEOUT,
+                                      DEFAULT_READ_TIMEOUT)
+from papermerge_cli.exceptions import FileMimeTypeUnknown
+from papermerge_cli.multipart import MultipartFile
+from papermerge_cli.retry import get_retry_policy
+from papermerge_cli.schema.adapters import parse_json
+
+T = TypeVar('T')
+
+# Maximum number of concurrent connections to REST API host; requests
+# above this limit wait (without blocking event loop) for a free one
+DEFAULT_MAX_CONNECTIONS = 100
+
+_max_connections = DEFAULT_MAX_CONNECTIONS
+_timeout = httpx.Timeout(
+    None,
+    connect=DEFAULT_CONNECT_TIMEOUT,
+    read=DEFAULT_READ_TIMEOUT
+)
+# one client (i.e. one connection pool) per event loop
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def make_async_client(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+) -> httpx.AsyncClient:
+    """Returns new HTTP client backed by a keep-alive connection pool"""
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections
+    )
+    # waiting for a free connection from the pool is not limited,
+    # only connecting to and reading from server is
+    return httpx.AsyncClient(limits=limits, timeout=_timeout)
+
+
+def configure_async(
+    max_connections: int | None = None,
+    connect_timeout: float | None = None,
+    read_timeout: float | None = None
+) -> None:
+    """Configures HTTP clients created from now on
+
+    Only provided settings are changed.
+    """
+    global _max_connections, _timeout
+    if max_connections is not None:
+        _max_connections = max_connections
+    _timeout = httpx.Timeout(
+        None,
+        connect=connect_timeout or _timeout.connect,
+        read=read_timeout or _timeout.read
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Returns HTTP client shared by all `AsyncApiClient` instances
+
+    Client is bound to the running event loop, so each event loop gets
+    its own client, created on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = make_async_client(max_connections=_max_connections)
+        _clients[loop] = client
+
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Closes HTTP client of the running event loop"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncApiClient(Generic[T]):
+    """asyncio counterpart of `ApiClient`"""
+
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        client: httpx.AsyncClient | None = None
+    ):
+        self.host = host
+        self.token = token
+        self.client = client or get_async_client()
+
+    async def get(
+        self,
+        url: str,
+        response_model,
+        query_params=None
+    ) -> T:
+        response = await self.request(
+            'GET',
+            url,
+            headers=self.headers,
+            params=query_params
+        )
+        if response.status_code != 200:
+            raise ValueError(response.text)
+
+        return parse_json(response_model, response.content)
+
+    async def post(
+        self,
+        url,
+        json,
+        response_model=None
+    ):
+        headers = {
+            'Content-Type': 'application/json',
+            **self.headers
+        }
+        response = await self.request(
+            'POST',
+            url,
+            headers=headers,
+            json=json
+        )
+
+        if response.status_code not in (200, 201):
+            raise ValueError(response.text)
+
+        if response_model:
+            return parse_json(response_model, response.content)
+
+    async def patch(
+        self,
+        url,
+        json,
+        response_model=None
+    ):
+        response = await self.request(
+            'PATCH',
+            url,
+            headers=self.headers,
+            json=json
+        )
+
+        if response.status_code not in (200, 201):
+            raise ValueError(response.text)
+
+        if response_model:
+            return parse_json(response_model, response.content)
+
+    async def delete(
+        self,
+        url,
+        json,
+    ):
+        response = await self.request(
+            'DELETE',
+            url,
+            headers=self.headers,
+            json=json
+        )
+
+        if response.status_code not in (200, 201, 204):
+            raise ValueError(response.text)
+
+    async def upload(
+        self,
+        url: str,
+        file_path: Path,
+        response_model
+    ) -> T:
+        with tracing.span('mime type', 'io', path=file_path):
+            mime_type, _ = guess_type(file_path)
+
+        if mime_type is None:
+            msg = f"{file_path} mime type cannot be guessed"
+            raise FileMimeTypeUnknown(msg)
+
+        with MultipartFile(file_path, mime_type) as body:
+            response = await self.request(
+                'POST',
+                url,
+                headers={
+                    'Content-Type': body.content_type,
+                    'Content-Length': str(len(body)),
+                    **self.headers
+                },
+                content=body
+            )
+
+        if response.status_code != 200:
+            raise ValueError(response.text)
+
+        return parse_json(response_model, response.content)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Sends request, retrying it according to the retry policy"""
+        retry = get_retry_policy().begin()
+        content = kwargs.pop('content', None)
+        started_at = time.perf_counter()
+
+        # requests of concurrent tasks overlap within the event loop thread
+        with tracing.span(
+            f'{method} {url}',
+            'http',
+            asynchronous=True
+        ) as span:
+            while True:
+                wait = retry.before_attempt()
+                if wait:
+                    await asyncio.sleep(wait)
+                if isinstance(content, MultipartFile):
+                    content.rewind()
+                    kwargs['content'] = _aiter_chunks(content)
+                elif content is not None:
+                    kwargs['content'] = content
+                try:
+                    response = await self.client.request(
+                        method,
+                        f"{self.host}{url}",
+                        **kwargs
+                    )
+                except httpx.TransportError as ex:
+                    delay = retry.on_error(
+                        method,
+                        connect_failed=isinstance(
+                            ex,
+                            (httpx.ConnectError, httpx.ConnectTimeout)
+                        )
+                    )
+                    if delay is None:
+                        metrics.record(
+                            method,
+                            url,
+                            status=None,
+                            seconds=time.perf_counter() - started_at,
+                            retries=retry.retries
+                        )
+                        span.set(retries=retry.retries)
+                        raise
+                else:
+                    delay = retry.on_response(
+                        method,
+                        response.status_code,
+                        retry_after=response.headers.get('Retry-After')
+                    )
+                    if delay is None:
+                        metrics.record(
+                            method,
+                            url,
+                            status=response.status_code,
+                            seconds=time.perf_counter() - started_at,
+                            sent=int(
+                                response.request.headers.get(
+                                    'Content-Length', 0
+                                )
+                            ),
+                            received=len(response.content),
+                            retries=retry.retries
+                        )
+                        span.set(
+                            status=response.status_code,
+                            retries=retry.retries
+                        )
+                        return response
+
+                await asyncio.sleep(delay)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {'Authorization': f'Bearer {self.token}'}
+
+
+async def _aiter_chunks(body: MultipartFile):
+    """Yields body chunks, read from disk in a worker thread
+
+    File reads block (for long on slow or network disks), they must
+    not stall other requests of the event loop.
+    """
+    while chunk := await asyncio.to_thread(body.read, body.chunk_size):
+        yield chunk
@@ -0,0 +1,11 @@
+"""Default settings, kept apart so that CLI can use them without
+importing the HTTP clients"""
+
+# Maximum number of keep-alive connections kept open per host
+DEFAULT_POOL_SIZE = 10
+# Seconds to wait for connection to be established
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# Seconds to wait for server to send (next bytes of) response
+DEFAULT_READ_TIMEOUT = 60.0
+# How many times failed request is retried
+DEFAULT_MAX_RETRIES = 5
@@ -1,2 +1,10 @@
 class FileMimeTypeUnknown(Exception):
     """Raised when mime of type to be uploaded cannot be guessed"""
+
+
+class ServerUnavailable(Exception):
+    """Raised when REST API server failed too many times in a row
+
+    Requests are not sent to the server for a while (until circuit
+    breaker resets) to avoid hammering a server which is down.
+    """
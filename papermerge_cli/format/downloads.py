@@ -0,0 +1,43 @@
+from papermerge_cli.lib.download import DownloadResult, DownloadStats
+from papermerge_cli.lib.pull import PullStats
+
+
+def download_result(result: DownloadResult) -> str:
+    if not result.ok:
+        return f"FAILED  {result.node_id} {result.error}"
+    if result.skipped:
+        return f"SKIPPED {result.node_id} {result.path} (already downloaded)"
+
+    return f"OK      {result.node_id} {result.path}"
+
+
+def download_summary(stats: DownloadStats) -> str:
+    size_mb = stats.bytes / 1024 / 1024
+    summary = (
+        f"Downloaded {stats.files} document(s) ({size_mb:.2f} MB)"
+        f" in {stats.elapsed:.2f}s: {stats.mb_per_second:.2f} MB/s"
+    )
+    if stats.skipped:
+        summary += f"; {stats.skipped} already downloaded"
+    if stats.failed:
+        summary += f"; {stats.failed} failed"
+
+    return summary
+
+
+def pull_summary(stats: PullStats) -> str:
+    size_mb = stats.bytes / 1024 / 1024
+    summary = (
+        f"Pulled {stats.downloaded} document(s) ({size_mb:.2f} MB)"
+        f" in {stats.elapsed:.2f}s; {stats.skipped} up to date"
+    )
+    if stats.moved:
+        summary += f", {stats.moved} moved"
+    if stats.unchanged:
+        summary += f", {stats.unchanged} with unchanged content"
+    if stats.removed:
+        summary += f", {stats.removed} removed"
+    if stats.failed:
+        summary += f", {stats.failed} failed"
+
+    return summary
@@ -0,0 +1,42 @@
+from papermerge_cli.lib.dedup import Duplicate
+from papermerge_cli.lib.importer import ImportStats
+from papermerge_cli.lib.ocr import OCRWaitStats
+
+
+def import_summary(stats: ImportStats) -> str:
+    size_mb = stats.bytes / 1024 / 1024
+    summary = (
+        f"Imported {stats.files} document(s) and {stats.folders} folder(s)"
+        f" ({size_mb:.2f} MB) in {stats.elapsed:.2f}s:"
+        f" {stats.files_per_second:.2f} files/s,"
+        f" {stats.mb_per_second:.2f} MB/s"
+    )
+    if stats.existing_folders:
+        summary += f"; {stats.existing_folders} existing folder(s) reused"
+    if stats.skipped:
+        summary += f"; {stats.skipped} already imported item(s) skipped"
+    if stats.duplicates:
+        summary += f"; {len(stats.duplicates)} duplicate(s)"
+
+    return summary
+
+
+def duplicate(item: Duplicate) -> str:
+    original = item.original_path or f"document {item.document_id}"
+
+    return f"DUPLICATE {item.path} (same content as {original})"
+
+
+def ocr_summary(stats: OCRWaitStats) -> str:
+    summary = (
+        f"OCR done for {stats.success} document(s)"
+        f" in {stats.elapsed:.2f}s ({stats.polls} poll(s))"
+    )
+    if stats.failed:
+        summary += f"; {len(stats.failed)} failed"
+    if stats.missing:
+        summary += f"; {len(stats.missing)} not found"
+    if stats.timed_out:
+        summary += f"; timed out waiting for {len(stats.pending)}"
+
+    return summary
@@ -0,0 +1,25 @@
+import time
+
+from papermerge_cli.lib.index import Index, SyncStats
+
+
+def sync_summary(stats: SyncStats) -> str:
+    summary = (
+        f"Synced {stats.nodes} node(s) from {stats.listed} folder(s)"
+        f" in {stats.elapsed:.2f}s"
+    )
+    if stats.skipped:
+        summary += f"; {stats.skipped} unchanged folder(s) skipped"
+    if stats.removed:
+        summary += f"; {stats.removed} deleted node(s) removed"
+
+    return summary
+
+
+def index_status(index: Index) -> str:
+    synced_at = time.strftime(
+        '%Y-%m-%d %H:%M:%S',
+        time.localtime(index.synced_at)
+    )
+
+    return f"{index.count()} node(s), last synced at {synced_at}"
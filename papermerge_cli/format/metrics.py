@@ -0,0 +1,81 @@
+import math
+
+from rich.table import Table
+
+from papermerge_cli.metrics import LATENCY_BUCKETS, EndpointMetrics, Metrics
+
+HISTOGRAM_WIDTH = 40
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}"
+
+
+def _size(num_bytes: int) -> str:
+    return f"{num_bytes / 1024 / 1024:.2f} MB"
+
+
+def metrics_table(metrics: Metrics) -> Table:
+    table = Table(title="REST API calls")
+
+    table.add_column("Method", no_wrap=True)
+    table.add_column("Endpoint", no_wrap=True)
+    table.add_column("Requests", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Retries", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p90 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    table.add_column("max ms", justify="right")
+    table.add_column("Sent", justify="right")
+    table.add_column("Received", justify="right")
+
+    for endpoint in metrics.endpoints():
+        table.add_row(
+            endpoint.method,
+            endpoint.endpoint,
+            str(endpoint.count),
+            str(endpoint.errors),
+            str(endpoint.retries),
+            _ms(endpoint.percentile(50)),
+            _ms(endpoint.percentile(90)),
+            _ms(endpoint.percentile(99)),
+            _ms(max(endpoint.latencies, default=0.0)),
+            _size(endpoint.sent),
+            _size(endpoint.received)
+        )
+
+    return table
+
+
+def latency_histogram(endpoint: EndpointMetrics) -> str:
+    """Returns latency histogram as text, one line per bucket"""
+    histogram = endpoint.histogram()
+    largest = max((count for _, count in histogram), default=0)
+    lines = []
+    for bound, count in histogram:
+        if bound == math.inf:
+            label = f"> {_ms(LATENCY_BUCKETS[-1])}"
+        else:
+            label = f"<= {_ms(bound)}"
+        bar = "#" * math.ceil(count / largest * HISTOGRAM_WIDTH) \
+            if largest else ""
+        lines.append(f"{label:>11} ms {count:8} {bar}")
+
+    return "\n".join(lines)
+
+
+def metrics_summary(metrics: Metrics) -> str:
+    total = metrics.total()
+    elapsed = metrics.elapsed
+    summary = (
+        f"{total.count} request(s) in {elapsed:.2f}s:"
+        f" {total.count / elapsed if elapsed else 0:.2f} req/s,"
+        f" {_size(total.sent)} sent, {_size(total.received)} received"
+    )
+    if total.errors:
+        summary += f"; {total.errors} error(s)"
+    if total.retries:
+        summary += f"; {total.retries} retried attempt(s)"
+
+    return summary
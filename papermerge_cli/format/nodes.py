@@ -1,9 +1,11 @@
-from rich.table import Table
-
+from papermerge_cli.lib.nodes import NodeCommandResult
 from papermerge_cli.schema import Node, Paginator
 
 
-def list_nodes(data: Paginator[Node]) -> Table:
+def list_nodes(data: Paginator[Node]):
+    """Returns page of nodes as rich Table"""
+    from rich.table import Table
+
     table = Table(
         title=f"Page={data.page_number} of {data.num_pages}"
     )
@@ -21,3 +23,10 @@ def list_nodes(data: Paginator[Node]) -> Table:
         )
 
     return table
+
+
+def node_command_result(result: NodeCommandResult) -> str:
+    if result.ok:
+        return f"OK     {result.node_id}"
+
+    return f"FAILED {result.node_id} {result.error}"
@@ -0,0 +1,68 @@
+"""Records and lines of nodes, written when listings are streamed
+
+Kept apart from table formatting: machine-readable and line output
+must not pay for importing rich.
+"""
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from papermerge_cli.schema import Node
+
+if TYPE_CHECKING:
+    from papermerge_cli.lib.tree import TreeEntry
+
+# Fields of node records in machine-readable output
+NODE_FIELDS = [
+    'id', 'ctype', 'title', 'tags', 'ocr_status', 'parent_id',
+    'created_at', 'updated_at'
+]
+TREE_FIELDS = ['path', 'depth', *NODE_FIELDS]
+# nodes listed from local index carry time of the sync they come from
+INDEXED_NODE_FIELDS = [*NODE_FIELDS, 'indexed_at']
+
+
+def node_record(node: Node) -> dict:
+    """Returns node as a flat dictionary of JSON/CSV friendly values
+
+    Values are taken directly from model attributes, which is much
+    cheaper than `node.model_dump`.
+    """
+    return {
+        'id': str(node.id),
+        'ctype': node.ctype.value,
+        'title': node.title,
+        'tags': [tag.name for tag in node.tags],
+        'ocr_status': node.document.ocr_status.value if node.document
+        else None,
+        'parent_id': str(node.parent_id) if node.parent_id else None,
+        'created_at': node.created_at.isoformat(),
+        'updated_at': node.updated_at.isoformat(),
+    }
+
+
+def indexed_node_record(node: Node, synced_at: float) -> dict:
+    """Returns record of node listed from local index synced at
+    `synced_at` (seconds since epoch)"""
+    indexed_at = datetime.fromtimestamp(synced_at, timezone.utc)
+
+    return {**node_record(node), 'indexed_at': indexed_at.isoformat()}
+
+
+def tree_record(entry: 'TreeEntry') -> dict:
+    return {
+        'path': entry.path,
+        'depth': entry.depth,
+        **node_record(entry.node)
+    }
+
+
+def node_line(node: Node) -> str:
+    """Returns node as one line of text, used when streaming listings"""
+    tags = ','.join(sorted(tag.name for tag in node.tags))
+
+    return f"{node.ctype.value:8} {node.id} {node.title} {tags}".rstrip()
+
+
+def tree_line(entry: 'TreeEntry') -> str:
+    """Returns tree entry as one line of text"""
+    return f"{entry.node.ctype.value:8} {entry.node.id} {entry.path}"
@@ -0,0 +1,91 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from typing import Any, TextIO
+
+from papermerge_cli.types import OutputFormatEnum
+
+
+class RecordWriter(ABC):
+    """Writes records (flat dictionaries) one at a time
+
+    Each record is written as soon as `write` is called, nothing is
+    accumulated in memory, which makes output usable in pipelines.
+    """
+
+    def __init__(self, out: TextIO, fields: list[str]):
+        self.out = out
+        self.fields = fields
+
+    @abstractmethod
+    def write(self, record: dict[str, Any]) -> None:
+        ...
+
+    def close(self) -> None:
+        self.out.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class JSONLinesWriter(RecordWriter):
+    def write(self, record: dict[str, Any]) -> None:
+        self.out.write(json.dumps(record, default=str))
+        self.out.write('\n')
+
+
+class JSONWriter(RecordWriter):
+    """Writes records as one JSON array, element by element"""
+
+    def __init__(self, out: TextIO, fields: list[str]):
+        super().__init__(out, fields)
+        self._count = 0
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.out.write('[\n' if self._count == 0 else ',\n')
+        self.out.write(json.dumps(record, default=str))
+        self._count += 1
+
+    def close(self) -> None:
+        self.out.write('[]\n' if self._count == 0 else '\n]\n')
+        super().close()
+
+
+class CSVWriter(RecordWriter):
+    def __init__(self, out: TextIO, fields: list[str], delimiter=','):
+        super().__init__(out, fields)
+        self._writer = csv.writer(out, delimiter=delimiter)
+        self._writer.writerow(fields)
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._writer.writerow(
+            [_csv_value(record[field]) for field in self.fields]
+        )
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ','.join(value)
+    return str(value)
+
+
+def make_writer(
+    output: OutputFormatEnum,
+    out: TextIO,
+    fields: list[str]
+) -> RecordWriter:
+    if output == OutputFormatEnum.json:
+        return JSONWriter(out, fields)
+    elif output == OutputFormatEnum.jsonl:
+        return JSONLinesWriter(out, fields)
+    elif output == OutputFormatEnum.csv:
+        return CSVWriter(out, fields)
+    elif output == OutputFormatEnum.tsv:
+        return CSVWriter(out, fields, delimiter='\t')
+
+    raise ValueError(f"Unsupported output format: {output}")
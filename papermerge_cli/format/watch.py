@@ -0,0 +1,20 @@
+from papermerge_cli.lib.watch import WatchResult, WatchStats
+
+
+def watch_result(result: WatchResult) -> str:
+    if not result.ok:
+        return f"FAILED  {result.path} {result.error}"
+
+    return f"OK      {result.path} {result.document_id}"
+
+
+def watch_summary(stats: WatchStats) -> str:
+    size_mb = stats.bytes / 1024 / 1024
+    summary = (
+        f"Uploaded {stats.files} document(s) ({size_mb:.2f} MB)"
+        f" in {stats.batches} batch(es) over {stats.elapsed:.2f}s"
+    )
+    if stats.failed:
+        summary += f"; {stats.failed} failed"
+
+    return summary
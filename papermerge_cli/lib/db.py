@@ -0,0 +1,31 @@
+import sqlite3
+from pathlib import Path
+
+
+def open_database(
+    path: Path,
+    schema: str,
+    foreign_keys: bool = False
+) -> sqlite3.Connection:
+    """Opens SQLite database with local state, creating it if needed
+
+    Database is in WAL mode with `synchronous=NORMAL`: readers do not
+    block the writer and commits are not fsync-ed one by one. An
+    interrupted run loses at most its last commits, never consistency.
+    Connection may be used from any thread, callers serialize access.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    if foreign_keys:
+        conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(schema)
+
+    return conn
+
+
+def delete_database(path: Path) -> None:
+    """Deletes SQLite database together with its WAL files"""
+    for suffix in ('', '-wal', '-shm'):
+        Path(f'{path}{suffix}').unlink(missing_ok=True)
@@ -0,0 +1,181 @@
+import hashlib
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID
+
+from papermerge_cli import tracing
+from papermerge_cli.lib.db import open_database
+from papermerge_cli.utils import cache_dir
+
+# files smaller than this are hashed by the thread which uploads them;
+# sending them to another process would cost more than hashing
+PROCESS_MIN_SIZE = 1024 * 1024
+# read size used when file cannot be memory mapped
+BUFFER_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    sha256 TEXT PRIMARY KEY,
+    node_id TEXT NOT NULL
+);
+"""
+
+
+def file_sha256(path: str) -> str:
+    """Returns hex digest of SHA-256 of file content
+
+    File is memory mapped, so that it is hashed without copying its
+    content into Python objects.
+    """
+    with tracing.span('hash', 'io', path=path):
+        return _file_sha256(path)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        except (OSError, ValueError, OverflowError):
+            # e.g. special files or file larger than address space
+            digest = hashlib.sha256()
+            f.seek(0)
+            buffer = bytearray(BUFFER_SIZE)
+            view = memoryview(buffer)
+            while size := f.readinto(buffer):
+                digest.update(view[:size])
+
+    return digest.hexdigest()
+
+
+def timed_file_sha256(path: str) -> tuple[str, float, float, int]:
+    """Same as `file_sha256`, run in `Hasher` processes
+
+    Returns hex digest together with start and end (`perf_counter`) of
+    hashing and process id, so that the calling process can trace it.
+    """
+    started_at = time.perf_counter()
+    digest = _file_sha256(path)
+
+    return digest, started_at, time.perf_counter(), os.getpid()
+
+
+def hash_store_path(host: str, user_id: UUID) -> Path:
+    """Returns location of the hash store of given account"""
+    key = hashlib.sha256(f"{host}|{user_id}".encode()).hexdigest()[:32]
+
+    return cache_dir() / 'hashes' / f'{key}.sqlite'
+
+
+class HashStore:
+    """Content hash of every document uploaded with deduplication
+
+    Maps SHA-256 of the uploaded file to UUID of the document created
+    from it; kept across runs, one store per account.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_database(path, SCHEMA)
+
+    def document_id(self, sha256: str) -> UUID | None:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT node_id FROM documents WHERE sha256 = ?',
+                (sha256,)
+            ).fetchone()
+
+        return UUID(row[0]) if row else None
+
+    def add_document(self, sha256: str, node_id: UUID) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents VALUES (?, ?)',
+                (sha256, str(node_id))
+            )
+
+    def remove_document(self, sha256: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM documents WHERE sha256 = ?',
+                (sha256,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Hasher:
+    """Computes content hashes of files in a pool of processes
+
+    Processes are started on first submitted file. Hashing large files
+    in other processes keeps it from slowing down uploads.
+
+    Processes are spawned, not forked: pool is created while other
+    threads (uploaders) run, and a child forked from a multithreaded
+    process may inherit locks held by them (e.g. of the tracer).
+    """
+
+    def __init__(self, processes: int | None = None):
+        self.processes = processes
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, path: Path) -> Future:
+        """Returns future of the hex digest of file content"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            hashed = self._pool.submit(timed_file_sha256, str(path))
+
+        digest = Future()
+
+        def done(future: Future) -> None:
+            try:
+                sha256, started_at, finished_at, pid = future.result()
+            except BaseException as ex:
+                digest.set_exception(ex)
+                return
+            tracing.record_remote(
+                'hash',
+                'io',
+                started_at=started_at,
+                finished_at=finished_at,
+                pid=pid,
+                process_name='papermerge-cli hasher',
+                path=path
+            )
+            digest.set_result(sha256)
+
+        hashed.add_done_callback(done)
+
+        return digest
+
+    def shutdown(self, cancel_futures: bool = False) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=cancel_futures)
+
+
+@dataclass(frozen=True)
+class Duplicate:
+    path: Path
+    sha256: str
+    # file with same content imported earlier in this run ...
+    original_path: Path | None = None
+    # ... or document with same content uploaded by previous run
+    document_id: UUID | None = None
@@ -0,0 +1,277 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from papermerge_cli import rest
+from papermerge_cli.lib.db import open_database
+from papermerge_cli.schema import Document
+from papermerge_cli.schema.documents import DocumentVersion
+
+# partially downloaded files are kept under this suffix until complete
+PART_SUFFIX = '.part'
+# which document each downloaded file belongs to, kept in target dir
+MANIFEST_FILE = '.papermerge-cli-download.sqlite'
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    node_id TEXT NOT NULL,
+    version_id TEXT NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class DownloadResult:
+    node_id: uuid.UUID
+    path: Path | None = None
+    # bytes received in this run (resumed files count only the rest)
+    received: int = 0
+    # file was already downloaded and is complete
+    skipped: bool = False
+    # None if download succeeded
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class DownloadStats:
+    files: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    def add(self, result: DownloadResult) -> None:
+        if not result.ok:
+            self.failed += 1
+        elif result.skipped:
+            self.skipped += 1
+        else:
+            self.files += 1
+            self.bytes += result.received
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def mb_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.bytes / 1024 / 1024 / elapsed if elapsed else 0.0
+
+
+def latest_version(document: Document) -> DocumentVersion:
+    if not document.versions:
+        raise ValueError(f"Document {document.id} has no versions")
+
+    return max(document.versions, key=lambda version: version.number)
+
+
+def version_file_name(document: Document, version: DocumentVersion) -> str:
+    # file names come from server; never let them point outside of
+    # the target directory
+    return Path(version.file_name or document.title).name
+
+
+def download_version(
+    host: str,
+    token: str,
+    version: DocumentVersion,
+    file_path: Path,
+    overwrite: bool = False
+) -> int | None:
+    """Downloads document version into `file_path`
+
+    Content goes first to `<file_path>.part` which is renamed once
+    complete; `.part` file left by interrupted download is resumed.
+    Returns number of received bytes or None if `file_path` already
+    has the whole version (same size) - unless `overwrite` is set, in
+    which case nothing on disk is reused.
+    """
+    if version.download_url is None:
+        raise ValueError(f"Document version {version.id} has no download URL")
+
+    if not overwrite and version.size and file_path.exists() \
+            and file_path.stat().st_size == version.size:
+        return None
+
+    part_path = file_path.with_name(file_path.name + PART_SUFFIX)
+    if overwrite:
+        part_path.unlink(missing_ok=True)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    received = rest.download_file(
+        host=host,
+        token=token,
+        url=version.download_url,
+        file_path=part_path
+    )
+    size = part_path.stat().st_size if part_path.exists() else 0
+    if version.size and size != version.size:
+        part_path.unlink(missing_ok=True)
+        raise ValueError(
+            f"Downloaded {size} bytes, expected {version.size}"
+        )
+    part_path.replace(file_path)
+
+    return received
+
+
+class DownloadManifest:
+    """Which document version each file in the target directory holds
+
+    Kept in the target directory itself. Content on disk (complete or
+    `.part` file) is reused only for the document version which claimed
+    the file; any other file with the same name is downloaded again.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_database(path, MANIFEST_SCHEMA)
+
+    def owner(self, name: str) -> tuple[str, str] | None:
+        """Returns (node id, version id) which claimed file `name`"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT node_id, version_id FROM files WHERE name = ?',
+                (name,)
+            ).fetchone()
+
+        return tuple(row) if row else None
+
+    def claim(
+        self,
+        name: str,
+        node_id: uuid.UUID,
+        version_id: uuid.UUID
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?)',
+                (name, str(node_id), str(version_id))
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def perform_bulk_download(
+    host: str,
+    token: str,
+    node_ids: Iterable[uuid.UUID],
+    target_dir: Path,
+    workers: int = 4
+) -> Iterator[DownloadResult]:
+    """Downloads latest version of many documents concurrently
+
+    Each document is saved in `target_dir` under the file name of its
+    version. File names are assigned in `node_ids` order, so that
+    repeated runs give every document the same file: when several
+    documents have the same file name, or the file was downloaded for
+    another document before (see `DownloadManifest`), the document
+    UUID is added to the name. Documents are fetched and downloaded by
+    `workers` threads each; result of each document is yielded as soon
+    as its download completes.
+    """
+    node_ids = list(dict.fromkeys(node_ids))
+    manifest = DownloadManifest(target_dir / MANIFEST_FILE)
+    assigned: set[str] = set()
+
+    def fetch(node_id: uuid.UUID) -> Document | Exception:
+        try:
+            return rest.get_document(
+                host=host,
+                token=token,
+                document_id=node_id
+            )
+        except Exception as ex:
+            return ex
+
+    def claim(
+        document: Document,
+        version: DocumentVersion
+    ) -> tuple[Path, bool]:
+        """Returns file path of the document version and whether
+        content on disk at that path belongs to the same version"""
+        name = Path(version_file_name(document, version))
+        candidates = (name.name, f"{name.stem}-{document.id}{name.suffix}")
+        for candidate in candidates:
+            owner = manifest.owner(candidate)
+            if candidate in assigned \
+                    or (owner and owner[0] != str(document.id)):
+                continue
+            assigned.add(candidate)
+            manifest.claim(candidate, document.id, version.id)
+            same_version = owner == (str(document.id), str(version.id))
+
+            return target_dir / candidate, same_version
+
+        raise ValueError(f"No free file name for {name.name}")
+
+    def run(
+        node_id: uuid.UUID,
+        version: DocumentVersion,
+        file_path: Path,
+        same_version: bool
+    ) -> DownloadResult:
+        try:
+            received = download_version(
+                host=host,
+                token=token,
+                version=version,
+                file_path=file_path,
+                overwrite=not same_version
+            )
+        except Exception as ex:
+            return DownloadResult(
+                node_id=node_id,
+                path=file_path,
+                error=str(ex)
+            )
+
+        return DownloadResult(
+            node_id=node_id,
+            path=file_path,
+            received=received or 0,
+            skipped=received is None
+        )
+
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as fetcher, \
+                ThreadPoolExecutor(max_workers=workers) as downloader:
+            # documents come in `node_ids` order, names are assigned
+            # in that order too
+            documents = fetcher.map(fetch, node_ids)
+            for node_id, document in zip(node_ids, documents):
+                try:
+                    if isinstance(document, Exception):
+                        raise document
+                    version = latest_version(document)
+                    file_path, same_version = claim(document, version)
+                except Exception as ex:
+                    yield DownloadResult(node_id=node_id, error=str(ex))
+                    continue
+
+                pending.add(downloader.submit(
+                    run, node_id, version, file_path, same_version
+                ))
+                done = {future for future in pending if future.done()}
+                pending -= done
+                for future in done:
+                    yield future.result()
+
+            for future in as_completed(pending):
+                yield future.result()
+    finally:
+        manifest.close()
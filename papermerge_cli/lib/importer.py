@@ -1,13 +1,550 @@
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterator
+from uuid import UUID
 
 from rich.console import Console
 
-from papermerge_cli.rest import create_folder, get_me, upload_document
-from papermerge_cli.schema import Folder, User
+from papermerge_cli import tracing
+from papermerge_cli.lib.db import delete_database
+from papermerge_cli.lib.dedup import (PROCESS_MIN_SIZE, Duplicate, Hasher,
+                                      HashStore, file_sha256, hash_store_path)
+from papermerge_cli.lib.journal import Journal, journal_path
+from papermerge_cli.lib.nodes import iter_nodes
+from papermerge_cli.rest import (create_document, create_folder, get_document,
+                                 get_me, upload_document_file)
+from papermerge_cli.schema import Document, Folder, User
+from papermerge_cli.schema.nodes import NodeType
 
 console = Console()
 
+# found files and folders waiting for upload; when the queue is full,
+# scanning waits for uploads to catch up
+QUEUE_SIZE = 1000
+# page size used to list child folders of remote folders
+LIST_PAGE_SIZE = 1000
+
+
+@dataclass
+class ImportStats:
+    """Aggregate numbers of one import run"""
+    files: int = 0
+    bytes: int = 0
+    folders: int = 0
+    # remote folders which already existed and were reused
+    existing_folders: int = 0
+    # files and folders which were imported by previous (interrupted) run
+    skipped: int = 0
+    # files with same content as another file of this run or as
+    # document uploaded before (only with deduplication)
+    duplicates: list[Duplicate] = field(default_factory=list)
+    # UUID of uploaded document -> UUID of its folder (only if import
+    # tracks uploads)
+    uploaded: dict[UUID, UUID] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        finished_at = self.finished_at or time.monotonic()
+        return finished_at - self.started_at
+
+    @property
+    def files_per_second(self) -> float:
+        if self.elapsed == 0:
+            return 0.0
+        return self.files / self.elapsed
+
+    @property
+    def mb_per_second(self) -> float:
+        if self.elapsed == 0:
+            return 0.0
+        return self.bytes / self.elapsed / 1024 / 1024
+
+
+@dataclass(frozen=True)
+class ImportEntry:
+    """File or folder found by the walker"""
+    path: Path
+    is_dir: bool = False
+    # content hash being computed, for large files with deduplication
+    digest: Future | None = None
+
+
+def walk(file_or_folder: Path) -> Iterator[Path | os.DirEntry]:
+    """Yields entries of the folder tree, without recursion
+
+    Entries of each folder are yielded as they are read from disk;
+    sub-folders are yielded before their own entries. Memory used
+    depends only on the number of folders waiting to be scanned.
+    """
+    if not file_or_folder.is_dir():
+        yield file_or_folder
+        return
+
+    stack = [file_or_folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                yield entry
+                if entry.is_dir():
+                    stack.append(Path(entry.path))
+
+
+@dataclass(frozen=True)
+class PendingUpload:
+    """File whose document node is created; content not uploaded yet"""
+    path: Path
+    document_id: UUID
+    parent_id: UUID
+    stat: os.stat_result
+    sha256: str | None = None
+    # content is a duplicate (with `dedup` 'report')
+    duplicate: bool = False
+
+
+class Importer:
+    """Imports local files and folders in a scan/create/upload pipeline
+
+    A walker thread scans the local tree and feeds a bounded queue,
+    from which `workers` threads take files and folders as soon as they
+    are found, and create remote folders and document nodes. Created
+    documents go, through another short queue, to `workers` upload
+    threads which upload their content. This way the node of the next
+    file is usually created while content of the previous one is being
+    uploaded, and latency of node creation does not add up to upload
+    time. When a queue is full, the stage feeding it waits, so memory
+    stays bounded regardless of the size of the tree. Remote
+    folders are resolved on demand, parents before their children, each
+    one exactly once: a folder with the same title in the remote parent
+    is reused, only missing folders are created. Child folders of each
+    remote parent are listed at most once per import.
+
+    If `journal` is provided, files and folders recorded in it are not
+    imported again and everything imported is recorded in it.
+
+    With `dedup` ('skip' or 'report') content of each file is hashed.
+    Large files are handed to `Hasher` processes by the walker, so that
+    they are hashed while earlier files are uploaded. Files with the
+    same content as another file of this import, or as a document in
+    `hash_store`, are reported in `stats.duplicates`; with 'skip' they
+    are not uploaded.
+
+    With `track_uploads` every uploaded document is recorded, together
+    with its folder, in `stats.uploaded` - e.g. to wait for their OCR.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        workers: int = 1,
+        delete: bool = False,
+        skip_ocr: bool = False,
+        journal: Journal | None = None,
+        dedup: str | None = None,
+        hash_store: HashStore | None = None,
+        queue_size: int = QUEUE_SIZE,
+        track_uploads: bool = False,
+    ):
+        self.host = host
+        self.token = token
+        self.workers = workers
+        self.delete = delete
+        self.skip_ocr = skip_ocr
+        self.journal = journal
+        self.dedup = dedup
+        self.hash_store = hash_store
+        self.track_uploads = track_uploads
+        self.hasher = Hasher() if dedup else None
+        self.stats = ImportStats()
+        self._queue: queue.Queue[ImportEntry | None] = queue.Queue(
+            maxsize=queue_size
+        )
+        # short, so that few nodes are created ahead of their upload
+        self._uploads: queue.Queue[PendingUpload | None] = queue.Queue(
+            maxsize=workers * 2
+        )
+        self._creators_running = workers
+        self._lock = threading.Lock()
+        # set on first error or interrupt; remaining work is dropped
+        self._stopped = threading.Event()
+        self._errors: list[Exception] = []
+        # local folder -> UUID of the remote folder
+        self._folders: dict[Path, UUID] = {}
+        # held while remote folder for the local folder is resolved
+        self._folder_locks: dict[Path, threading.Lock] = {}
+        # remote folder UUID -> (titles -> UUIDs) of its child folders
+        self._child_folders: dict[UUID, Future] = {}
+        # local folders which were imported, removed at the end of
+        # import if `delete` is True
+        self._imported_folders: list[Path] = []
+        # content hash -> first file of this import with that content
+        self._claimed: dict[str, Path] = {}
+
+    def run(self, file_or_folder: Path, parent_id: UUID) -> ImportStats:
+        # content of the imported folder goes straight into `parent_id`
+        root = file_or_folder if file_or_folder.is_dir() \
+            else file_or_folder.parent
+        self._folders[root] = parent_id
+
+        threads = [
+            threading.Thread(
+                target=self._walk,
+                args=(file_or_folder,),
+                name='import-walk'
+            )
+        ]
+        for number in range(self.workers):
+            threads.append(threading.Thread(
+                target=self._create_documents,
+                name=f'import-create-{number}'
+            ))
+            threads.append(threading.Thread(
+                target=self._upload_documents,
+                name=f'import-upload-{number}'
+            ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            for thread in threads:
+                thread.join()
+        except BaseException:
+            # uploads in progress complete, nothing new is started
+            self._stopped.set()
+            if self.hasher:
+                self.hasher.shutdown(cancel_futures=True)
+            raise
+
+        if self.hasher:
+            self.hasher.shutdown()
+        self.stats.finished_at = time.monotonic()
+
+        if self.delete and not self._errors:
+            # deepest folders first, so that parents are empty by
+            # the time they are removed
+            for path in sorted(
+                self._imported_folders,
+                key=lambda item: len(item.parts),
+                reverse=True
+            ):
+                remove(path)
+
+        if self._errors:
+            raise self._errors[0]
+
+        return self.stats
+
+    def _fail(self, ex: Exception) -> None:
+        with self._lock:
+            self._errors.append(ex)
+        # import stops on first error
+        self._stopped.set()
+
+    def _walk(self, file_or_folder: Path) -> None:
+        """First stage: feeds the queue with entries of the local tree"""
+        try:
+            with tracing.span('scan', 'scan', path=file_or_folder) as span:
+                entries = 0
+                for entry in walk(file_or_folder):
+                    if self._stopped.is_set():
+                        break
+                    path = Path(entry)
+                    if isinstance(entry, os.DirEntry) and entry.is_dir():
+                        item = ImportEntry(path, is_dir=True)
+                    else:
+                        item = ImportEntry(
+                            path,
+                            digest=self._hash_ahead(path)
+                        )
+                    entries += 1
+                    # blocks while the queue is full; next stage keeps
+                    # draining it even after import stopped
+                    if self._queue.full():
+                        with tracing.span('queue full', 'scan'):
+                            self._queue.put(item)
+                    else:
+                        self._queue.put(item)
+                span.set(entries=entries)
+        except Exception as ex:
+            self._fail(ex)
+        finally:
+            # one end marker for each thread of the next stage
+            for _ in range(self.workers):
+                self._queue.put(None)
+
+    def _hash_ahead(self, file_path: Path) -> Future | None:
+        if self.hasher is None:
+            return None
+
+        stat = file_path.stat()
+        if stat.st_size < PROCESS_MIN_SIZE \
+                or self._is_journaled(file_path, stat):
+            return None
+
+        return self.hasher.submit(file_path)
+
+    def _create_documents(self) -> None:
+        """Second stage: creates remote folders and document nodes"""
+        try:
+            while (entry := self._queue.get()) is not None:
+                if self._stopped.is_set():
+                    continue
+                try:
+                    if entry.is_dir:
+                        self._folder_id(entry.path)
+                    elif upload := self._create_document(entry):
+                        self._uploads.put(upload)
+                except Exception as ex:
+                    self._fail(ex)
+        finally:
+            with self._lock:
+                self._creators_running -= 1
+                last = self._creators_running == 0
+            if last:
+                for _ in range(self.workers):
+                    self._uploads.put(None)
+
+    def _upload_documents(self) -> None:
+        """Last stage: uploads content of created documents"""
+        while (upload := self._uploads.get()) is not None:
+            if self._stopped.is_set():
+                continue
+            try:
+                self._upload_file(upload)
+            except Exception as ex:
+                self._fail(ex)
+
+    def _is_journaled(self, file_path: Path, stat: os.stat_result) -> bool:
+        if self.journal is None:
+            return False
+
+        return self.journal.document_id(
+            file_path, size=stat.st_size, mtime=stat.st_mtime
+        ) is not None
+
+    def _create_document(self, entry: ImportEntry) -> PendingUpload | None:
+        """Creates document node for the file
+
+        Returns None if file is not to be uploaded.
+        """
+        file_path = entry.path
+        stat = file_path.stat()
+        if self._is_journaled(file_path, stat):
+            with self._lock:
+                self.stats.skipped += 1
+            return None
+
+        sha256 = duplicate = None
+        if self.dedup:
+            if entry.digest is not None:
+                sha256 = entry.digest.result()
+            else:
+                # small files are cheaper to hash right here
+                sha256 = file_sha256(str(file_path))
+            duplicate = self._find_duplicate(file_path, sha256)
+            if duplicate:
+                with self._lock:
+                    self.stats.duplicates.append(duplicate)
+                if self.dedup == 'skip':
+                    # content is on server already
+                    if self.delete:
+                        remove(file_path)
+                    return None
+
+        parent_id = self._folder_id(file_path.parent)
+        document_id = None
+        if self.journal:
+            # created by interrupted import, content was not uploaded
+            document_id = self.journal.created_document_id(file_path)
+        if document_id is None:
+            document: Document = create_document(
+                host=self.host,
+                token=self.token,
+                title=file_path.name,
+                parent_id=parent_id,
+                skip_ocr=self.skip_ocr
+            )
+            document_id = document.id
+            if self.journal:
+                self.journal.add_created_document(file_path, document_id)
+
+        return PendingUpload(
+            path=file_path,
+            document_id=document_id,
+            parent_id=parent_id,
+            stat=stat,
+            sha256=sha256,
+            duplicate=duplicate is not None
+        )
+
+    def _upload_file(self, upload: PendingUpload) -> None:
+        file_path, stat = upload.path, upload.stat
+        upload_document_file(
+            host=self.host,
+            token=self.token,
+            document_id=upload.document_id,
+            file_path=file_path
+        )
+        if self.journal:
+            self.journal.add_document(
+                file_path,
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                node_id=upload.document_id,
+                sha256=upload.sha256
+            )
+        if self.hash_store and upload.sha256 and not upload.duplicate:
+            self.hash_store.add_document(
+                upload.sha256,
+                node_id=upload.document_id
+            )
+        with self._lock:
+            self.stats.files += 1
+            self.stats.bytes += stat.st_size
+            if self.track_uploads:
+                self.stats.uploaded[upload.document_id] = upload.parent_id
+
+        if self.delete:
+            remove(file_path)
+
+    def _find_duplicate(self, file_path: Path, sha256: str) -> Duplicate | None:
+        with self._lock:
+            original = self._claimed.setdefault(sha256, file_path)
+        if original != file_path:
+            return Duplicate(file_path, sha256, original_path=original)
+
+        if self.hash_store is None:
+            return None
+
+        document_id = self.hash_store.document_id(sha256)
+        if document_id is None:
+            return None
+        try:
+            get_document(
+                host=self.host,
+                token=self.token,
+                document_id=document_id
+            )
+        except ValueError:
+            # document was deleted since; better upload it again
+            self.hash_store.remove_document(sha256)
+            return None
+
+        return Duplicate(file_path, sha256, document_id=document_id)
+
+    def _folder_id(self, folder_path: Path) -> UUID:
+        """Returns UUID of the remote folder for given local folder
+
+        Remote folders of the local folder and of its ancestors are
+        created if they were not yet.
+        """
+        missing = []
+        with self._lock:
+            while folder_path not in self._folders:
+                missing.append(folder_path)
+                folder_path = folder_path.parent
+            folder_id = self._folders[folder_path]
+
+        # parents first, iteratively - trees can be arbitrarily deep
+        for path in reversed(missing):
+            folder_id = self._resolve_folder(path, parent_id=folder_id)
+
+        return folder_id
+
+    def _resolve_folder(self, folder_path: Path, parent_id: UUID) -> UUID:
+        with self._lock:
+            folder_lock = self._folder_locks.setdefault(
+                folder_path,
+                threading.Lock()
+            )
+
+        # another worker may be creating the same folder right now
+        with folder_lock:
+            with self._lock:
+                folder_id = self._folders.get(folder_path)
+            if folder_id is None:
+                folder_id = self._create_folder(folder_path, parent_id)
+                with self._lock:
+                    self._folders[folder_path] = folder_id
+                    self._imported_folders.append(folder_path)
+                    self._folder_locks.pop(folder_path, None)
+
+        return folder_id
+
+    def _create_folder(self, folder_path: Path, parent_id: UUID) -> UUID:
+        """Returns UUID of existing remote folder or of the created one"""
+        if self.journal:
+            folder_id = self.journal.folder_id(folder_path)
+            if folder_id:
+                with self._lock:
+                    self.stats.skipped += 1
+                return folder_id
+
+        folder_id = self._child_folders_of(parent_id).get(folder_path.name)
+        if folder_id:
+            with self._lock:
+                self.stats.existing_folders += 1
+        else:
+            folder: Folder = create_folder(
+                host=self.host,
+                token=self.token,
+                title=folder_path.name,
+                parent_id=parent_id
+            )
+            folder_id = folder.id
+            # new folder has no children; no need to list it
+            listed: Future = Future()
+            listed.set_result({})
+            with self._lock:
+                self.stats.folders += 1
+                self._child_folders[folder_id] = listed
+
+        if self.journal:
+            self.journal.add_folder(folder_path, node_id=folder_id)
+
+        return folder_id
+
+    def _child_folders_of(self, parent_id: UUID) -> dict[str, UUID]:
+        """Returns titles and UUIDs of child folders of remote folder
+
+        First worker asking for given parent lists it; others wait for
+        its result.
+        """
+        with self._lock:
+            listed = self._child_folders.get(parent_id)
+            owner = listed is None
+            if owner:
+                listed = self._child_folders[parent_id] = Future()
+
+        if not owner:
+            return listed.result()
+
+        try:
+            folders = {}
+            for node in iter_nodes(
+                host=self.host,
+                token=self.token,
+                node_id=str(parent_id),
+                page_size=LIST_PAGE_SIZE,
+                order_by='title'
+            ):
+                if node.ctype == NodeType.folder:
+                    folders.setdefault(node.title, node.id)
+        except Exception as ex:
+            listed.set_exception(ex)
+            raise
+
+        listed.set_result(folders)
+
+        return folders
+
 
 def upload_file_or_folder(
     host: str,
@@ -16,56 +553,65 @@ def upload_file_or_folder(
     parent_id=None,
     delete: bool = False,
     skip_ocr: bool = False,
-) -> None:
+    workers: int = 1,
+    resume: bool = True,
+    dedup: str | None = None,
+    track_uploads: bool = False,
+) -> ImportStats:
+    """Imports local file or folder
+
+    With `resume` import progress is journaled, and an interrupted
+    import, when re-run, will continue where it stopped. Journal is
+    removed once import completes successfully.
+
+    With `dedup` ('skip' or 'report') files with the same content as
+    another file of the import, or as a document uploaded by earlier
+    import with deduplication, are skipped or only reported.
+    """
     user: User = get_me(host=host, token=token)
 
     # by default, upload will be uploded to the user home folder
     if parent_id is None:
         parent_id = user.inbox_folder_id
 
-    if file_or_folder.is_file():
-        upload_document(
-            host=host,
-            token=token,
-            file_path=file_or_folder,
-            skip_ocr=skip_ocr,
-            parent_id=parent_id
-        )
-        if delete:
-            remove(file_or_folder)
+    journal = None
+    path = journal_path(host, source=file_or_folder, target_id=parent_id)
+    if resume:
+        journal = Journal(path)
+    else:
+        # start from scratch
+        delete_database(path)
 
-        return
+    hash_store = None
+    if dedup:
+        hash_store = HashStore(hash_store_path(host, user_id=user.id))
 
-    for entry in os.scandir(file_or_folder):
-        if entry.is_file():
-            upload_document(
-                host=host,
-                token=token,
-                file_path=Path(entry.path),
-                skip_ocr=skip_ocr,
-                parent_id=parent_id
-            )
+    importer = Importer(
+        host=host,
+        token=token,
+        workers=workers,
+        delete=delete,
+        skip_ocr=skip_ocr,
+        journal=journal,
+        dedup=dedup,
+        hash_store=hash_store,
+        track_uploads=track_uploads
+    )
 
-            if delete:
-                remove(Path(entry.path))
-        else:
-            folder_title = Path(entry.path).name
+    try:
+        stats = importer.run(file_or_folder, parent_id=parent_id)
+    except BaseException:
+        if journal:
+            journal.close()
+        raise
+    finally:
+        if hash_store:
+            hash_store.close()
 
-            folder: Folder = create_folder(
-                host=host,
-                token=token,
-                title=folder_title,
-                parent_id=parent_id
-            )
-            upload_file_or_folder(
-                host=host,
-                token=token,
-                parent_id=folder.id,
-                file_or_folder=Path(entry.path),
-                delete=delete
-            )
-            if delete:
-                remove(Path(entry.path))
+    if journal:
+        journal.remove()
+
+    return stats
 
 
 def remove(path: Path):
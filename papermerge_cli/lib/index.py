@@ -0,0 +1,602 @@
+import hashlib
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+from uuid import UUID
+
+from papermerge_cli import rest
+from papermerge_cli.lib.db import open_database
+from papermerge_cli.lib.tree import TreeEntry, walk_tree
+from papermerge_cli.schema import Node, Paginator, User
+from papermerge_cli.schema.adapters import parse_json
+from papermerge_cli.schema.nodes import NodeType
+from papermerge_cli.utils import cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    title TEXT NOT NULL,
+    ctype TEXT NOT NULL,
+    ocr_status TEXT,
+    user_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    -- folders only: `updated_at` of the folder when its children
+    -- were indexed
+    children_synced_at TEXT
+);
+CREATE INDEX IF NOT EXISTS nodes_parent_id_title
+    ON nodes (parent_id, title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS nodes_title ON nodes (title COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS tags (
+    node_id TEXT NOT NULL REFERENCES nodes (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    bg_color TEXT NOT NULL,
+    fg_color TEXT NOT NULL,
+    PRIMARY KEY (node_id, name)
+);
+CREATE INDEX IF NOT EXISTS tags_name ON tags (name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# every node as JSON object, in the same shape as REST API returns it
+SELECT_NODES = """
+SELECT json_object(
+    'id', n.id,
+    'parent_id', n.parent_id,
+    'title', n.title,
+    'ctype', n.ctype,
+    'user_id', n.user_id,
+    'created_at', n.created_at,
+    'updated_at', n.updated_at,
+    'document', CASE WHEN n.ocr_status IS NULL THEN NULL
+        ELSE json_object('ocr_status', n.ocr_status) END,
+    'tags', (
+        SELECT json_group_array(json_object(
+            'name', t.name, 'bg_color', t.bg_color, 'fg_color', t.fg_color
+        ))
+        FROM tags t WHERE t.node_id = n.id
+    )
+)
+FROM nodes n
+"""
+
+UPSERT_NODE = """
+INSERT INTO nodes (
+    id, parent_id, title, ctype, ocr_status, user_id, created_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    parent_id = excluded.parent_id,
+    title = excluded.title,
+    ctype = excluded.ctype,
+    ocr_status = excluded.ocr_status,
+    user_id = excluded.user_id,
+    created_at = excluded.created_at,
+    updated_at = excluded.updated_at
+"""
+
+SUBTREE = """
+WITH RECURSIVE subtree (id) AS (
+    SELECT ?
+    UNION ALL
+    SELECT n.id FROM nodes n JOIN subtree s ON n.parent_id = s.id
+)
+"""
+
+# `order_by` values accepted by REST API -> index columns
+ORDER_BY_COLUMNS = {
+    'title': 'title COLLATE NOCASE',
+    'ctype': 'ctype',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+
+def index_path(host: str, user_id: UUID | str) -> Path:
+    """Returns location of the index of given account"""
+    key = hashlib.sha256(f"{host}|{user_id}".encode()).hexdigest()[:32]
+
+    return cache_dir() / 'indexes' / f'{key}.sqlite'
+
+
+def account_index_path(host: str, token: str) -> Path:
+    """Returns location of the index of the account of `token`
+
+    Index is keyed by user id, thus it outlives rotation of the token.
+    User id of each token is remembered next to the indexes; current
+    user is fetched from REST API only for a token seen the first time.
+    """
+    key = hashlib.sha256(f"{host}|{token}".encode()).hexdigest()[:32]
+    user_path = cache_dir() / 'indexes' / 'users' / key
+    try:
+        user_id = user_path.read_text()
+    except OSError:
+        user: User = rest.get_me(host=host, token=token)
+        user_id = str(user.id)
+        user_path.parent.mkdir(parents=True, exist_ok=True)
+        user_path.write_text(user_id)
+
+    return index_path(host, user_id)
+
+
+def escape_like(value: str) -> str:
+    """Escapes LIKE wildcards, so that `value` matches literally"""
+    for char in ('\\', '%', '_'):
+        value = value.replace(char, f'\\{char}')
+
+    return value
+
+
+def order_by_clause(order_by: str) -> str:
+    """Translates REST API `order_by` (e.g. '-title') to SQL"""
+    column = ORDER_BY_COLUMNS.get(order_by.removeprefix('-'))
+    if column is None:
+        raise ValueError(f'Unsupported order by: {order_by}')
+    direction = 'DESC' if order_by.startswith('-') else 'ASC'
+
+    return f'ORDER BY n.{column} {direction}, n.id'
+
+
+class Index:
+    """Local copy of nodes metadata of one account
+
+    Keeps, in a SQLite database, id, parent, title, type, tags, OCR
+    status and timestamps of every node in user's home and inbox
+    folders. Listing a folder or searching nodes by title/tags is then
+    answered locally, without any REST API call.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn = open_database(path, SCHEMA, foreign_keys=True)
+
+    def get_meta(self, key: str) -> str | None:
+        row = self._conn.execute(
+            'SELECT value FROM meta WHERE key = ?',
+            (key,)
+        ).fetchone()
+
+        return row[0] if row else None
+
+    def set_meta(self, **values: str) -> None:
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                values.items()
+            )
+
+    @property
+    def home_folder_id(self) -> str | None:
+        return self.get_meta('home_folder_id')
+
+    @property
+    def inbox_folder_id(self) -> str | None:
+        return self.get_meta('inbox_folder_id')
+
+    @property
+    def synced_at(self) -> float | None:
+        value = self.get_meta('synced_at')
+
+        return float(value) if value is not None else None
+
+    def count(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM nodes').fetchone()[0]
+
+    def children_indexed(self, folder_id: str) -> bool:
+        """Were children of the folder indexed by a sync?
+
+        Folders created after the last sync or outside of home and
+        inbox folders are not in the index; listing them from it would
+        wrongly show them empty.
+        """
+        if folder_id in (self.home_folder_id, self.inbox_folder_id):
+            return True
+        row = self._conn.execute(
+            'SELECT children_synced_at FROM nodes WHERE id = ?',
+            (folder_id,)
+        ).fetchone()
+
+        return row is not None and row[0] is not None
+
+    def children_synced(self, node: Node) -> bool:
+        """Were children of the folder indexed since it was last updated?"""
+        row = self._conn.execute(
+            'SELECT children_synced_at FROM nodes WHERE id = ?',
+            (str(node.id),)
+        ).fetchone()
+
+        return row is not None and row[0] == node.updated_at.isoformat()
+
+    def replace_children(self, folder_id: str, nodes: list[Node]) -> int:
+        """Makes `nodes` the only children of the folder
+
+        Children which are not in `nodes` anymore are removed from the
+        index, together with their whole subtree. Returns number of
+        removed nodes.
+        """
+        node_ids = {str(node.id) for node in nodes}
+        with self._conn:
+            removed_ids = [
+                node_id for (node_id,) in self._conn.execute(
+                    'SELECT id FROM nodes WHERE parent_id = ?',
+                    (folder_id,)
+                )
+                if node_id not in node_ids
+            ]
+            removed = 0
+            for node_id in removed_ids:
+                (count,) = self._conn.execute(
+                    f'{SUBTREE} SELECT COUNT(*) FROM subtree',
+                    (node_id,)
+                ).fetchone()
+                self._conn.execute(
+                    f'{SUBTREE} DELETE FROM nodes WHERE id IN subtree',
+                    (node_id,)
+                )
+                removed += count
+
+            self._conn.executemany(UPSERT_NODE, map(_node_row, nodes))
+            self._conn.executemany(
+                'DELETE FROM tags WHERE node_id = ?',
+                ((node_id,) for node_id in node_ids)
+            )
+            self._conn.executemany(
+                'INSERT INTO tags VALUES (?, ?, ?, ?)',
+                (
+                    (str(node.id), tag.name, tag.bg_color, tag.fg_color)
+                    for node in nodes
+                    for tag in node.tags
+                )
+            )
+
+        return removed
+
+    def mark_children_synced(self, node: Node) -> None:
+        with self._conn:
+            self._conn.execute(
+                'UPDATE nodes SET children_synced_at = ? WHERE id = ?',
+                (node.updated_at.isoformat(), str(node.id))
+            )
+
+    def children(
+        self,
+        folder_id: str,
+        order_by: str = '-title',
+        limit: int = -1,
+        offset: int = 0
+    ) -> list[Node]:
+        order_by = order_by_clause(order_by)
+        # page is selected first, so that tags are aggregated only for
+        # nodes of that page
+        rows = self._conn.execute(
+            f'{SELECT_NODES} WHERE n.id IN ('
+            f' SELECT n.id FROM nodes n WHERE n.parent_id = ?'
+            f' {order_by} LIMIT ? OFFSET ?'
+            f') {order_by}',
+            (str(folder_id), limit, offset)
+        )
+
+        return _parse_nodes(rows)
+
+    def page(
+        self,
+        folder_id: str,
+        page_number: int = 1,
+        page_size: int = 15,
+        order_by: str = '-title'
+    ) -> Paginator[Node]:
+        """Returns one page of folder's children, same as REST API does"""
+        (count,) = self._conn.execute(
+            'SELECT COUNT(*) FROM nodes WHERE parent_id = ?',
+            (str(folder_id),)
+        ).fetchone()
+        items = self.children(
+            folder_id,
+            order_by=order_by,
+            limit=page_size,
+            offset=(page_number - 1) * page_size
+        )
+
+        return Paginator[Node](
+            page_size=page_size,
+            page_number=page_number,
+            num_pages=max(1, -(-count // page_size)),
+            items=items
+        )
+
+    def find(
+        self,
+        title: str | None = None,
+        tags: Iterable[str] = (),
+        tags_op: str = 'all',
+        ctype: str | None = None
+    ) -> Iterator[TreeEntry]:
+        """Yields indexed nodes matching all given criteria, with paths
+
+        `title` matches any part of node's title (case insensitive);
+        with `tags_op` 'all' nodes must have all `tags`, with 'any' at
+        least one of them. Paths start with title of the home
+        ('.home') or inbox ('.inbox') folder.
+        """
+        conditions, params = [], []
+        if title:
+            conditions.append("n.title LIKE ? ESCAPE '\\'")
+            params.append(f'%{escape_like(title)}%')
+        tags = list(tags)
+        if tags:
+            placeholders = ', '.join('?' * len(tags))
+            subquery = (
+                f'SELECT node_id FROM tags WHERE name IN ({placeholders})'
+            )
+            if tags_op == 'all':
+                subquery += ' GROUP BY node_id HAVING COUNT(*) = ?'
+                params.extend([*tags, len(set(tags))])
+            else:
+                params.extend(tags)
+            conditions.append(f'n.id IN ({subquery})')
+        if ctype is not None:
+            conditions.append('n.ctype = ?')
+            params.append(ctype)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self._conn.execute(
+            f'{SELECT_NODES} {where} ORDER BY n.title COLLATE NOCASE',
+            params
+        )
+        paths = self._folder_paths()
+        for node in _parse_nodes(rows):
+            parent_path = paths.get(str(node.parent_id), '')
+            path = f'{parent_path}/{node.title}'
+            yield TreeEntry(node=node, path=path, depth=path.count('/') - 1)
+
+    def _folder_paths(self) -> dict[str, str]:
+        """Returns paths of all indexed folders, by folder id"""
+        paths = {
+            self.home_folder_id: '/.home',
+            self.inbox_folder_id: '/.inbox',
+        }
+        rows = self._conn.execute(
+            """
+            WITH RECURSIVE folder_paths (id, path) AS (
+                SELECT id, ? || '/' || title FROM nodes
+                WHERE parent_id = ? AND ctype = 'folder'
+                UNION ALL
+                SELECT id, ? || '/' || title FROM nodes
+                WHERE parent_id = ? AND ctype = 'folder'
+                UNION ALL
+                SELECT n.id, p.path || '/' || n.title
+                FROM nodes n JOIN folder_paths p ON n.parent_id = p.id
+                WHERE n.ctype = 'folder'
+            )
+            SELECT id, path FROM folder_paths
+            """,
+            (
+                paths[self.home_folder_id], self.home_folder_id,
+                paths[self.inbox_folder_id], self.inbox_folder_id,
+            )
+        )
+        paths.update(rows)
+
+        return paths
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_index(host: str, token: str) -> Index | None:
+    """Returns index of the account, if it was ever synced"""
+    if not any((cache_dir() / 'indexes').glob('*.sqlite')):
+        # no index at all; spare asking server who the user is
+        return None
+
+    try:
+        path = account_index_path(host, token)
+    except Exception:
+        # user is unknown e.g. server is down; caller queries server
+        # instead and reports the error
+        return None
+    if not path.exists():
+        return None
+
+    index = Index(path)
+    if index.synced_at is None:
+        index.close()
+        return None
+
+    return index
+
+
+def _node_row(node: Node) -> tuple:
+    return (
+        str(node.id),
+        str(node.parent_id) if node.parent_id else None,
+        node.title,
+        node.ctype.value,
+        node.document.ocr_status.value if node.document else None,
+        str(node.user_id),
+        node.created_at.isoformat(),
+        node.updated_at.isoformat(),
+    )
+
+
+def _parse_nodes(rows: Iterable[tuple[str]]) -> list[Node]:
+    """Validates JSON objects of SELECT_NODES rows in one go"""
+    data = f"[{','.join(row for (row,) in rows)}]"
+
+    return parse_json(list[Node], data)
+
+
+def node_matches(
+    node: Node,
+    title: str | None = None,
+    tags: Iterable[str] = (),
+    tags_op: str = 'all',
+    ctype: str | None = None
+) -> bool:
+    """Same criteria as `Index.find`, applied to one node"""
+    if title and title.lower() not in node.title.lower():
+        return False
+    if ctype is not None and node.ctype.value != ctype:
+        return False
+
+    tags = set(tags)
+    if tags:
+        node_tags = {tag.name for tag in node.tags}
+        if tags_op == 'all' and not tags <= node_tags:
+            return False
+        if tags_op == 'any' and not tags & node_tags:
+            return False
+
+    return True
+
+
+def find_nodes_live(
+    host: str,
+    token: str,
+    title: str | None = None,
+    tags: Iterable[str] = (),
+    tags_op: str = 'all',
+    ctype: str | None = None,
+    workers: int = 8
+) -> Iterator[TreeEntry]:
+    """Same as `Index.find`, but walks the folder trees on server"""
+    user: User = rest.get_me(host=host, token=token)
+    tags = list(tags)
+    roots = (
+        ('/.home', user.home_folder_id),
+        ('/.inbox', user.inbox_folder_id),
+    )
+    for root_path, folder_id in roots:
+        entries = walk_tree(
+            host=host,
+            token=token,
+            folder_id=str(folder_id),
+            workers=workers
+        )
+        for entry in entries:
+            if node_matches(entry.node, title, tags, tags_op, ctype):
+                yield TreeEntry(
+                    node=entry.node,
+                    path=f'{root_path}{entry.path}',
+                    depth=entry.depth
+                )
+
+
+@dataclass
+class SyncStats:
+    # folders whose children were fetched from REST API
+    listed: int = 0
+    # folders skipped because they did not change since last sync
+    skipped: int = 0
+    # nodes (re-)written to the index
+    nodes: int = 0
+    # nodes removed from the index (deleted on server)
+    removed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+def sync_index(
+    host: str,
+    token: str,
+    index: Index,
+    workers: int = 8,
+    page_size: int = 1000,
+    full: bool = False
+) -> SyncStats:
+    """Brings index up to date with the server
+
+    Home and inbox folders are always listed. Below them, a folder is
+    listed only if it changed (its `updated_at` differs from the
+    indexed one) or if its children were never indexed; otherwise its
+    whole subtree is kept as it is. With `full` every folder is
+    listed. Up to `workers` folders are listed concurrently, while all
+    writes to the index happen in the calling thread.
+
+    Skipping relies on server bumping `updated_at` of a folder when
+    anything below it changes; when it does not, changes deep in
+    unchanged folders are picked up only by a `full` sync.
+    """
+    stats = SyncStats()
+    user: User = rest.get_me(host=host, token=token)
+    index.set_meta(
+        home_folder_id=str(user.home_folder_id),
+        inbox_folder_id=str(user.inbox_folder_id)
+    )
+
+    executor = ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix='index'
+    )
+    # future -> (folder id, folder node or None for home/inbox)
+    pending = {
+        executor.submit(
+            _list_children, host, token, str(folder_id), page_size
+        ): (str(folder_id), None)
+        for folder_id in (user.home_folder_id, user.inbox_folder_id)
+    }
+
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder_id, folder = pending.pop(future)
+                nodes = future.result()
+                stats.listed += 1
+                stats.nodes += len(nodes)
+                stats.removed += index.replace_children(folder_id, nodes)
+                if folder is not None:
+                    index.mark_children_synced(folder)
+
+                for node in nodes:
+                    if node.ctype != NodeType.folder:
+                        continue
+                    if not full and index.children_synced(node):
+                        stats.skipped += 1
+                        continue
+                    future = executor.submit(
+                        _list_children, host, token, str(node.id), page_size
+                    )
+                    pending[future] = (str(node.id), node)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    index.set_meta(synced_at=str(time.time()))
+    stats.finished_at = time.monotonic()
+
+    return stats
+
+
+def _list_children(
+    host: str,
+    token: str,
+    folder_id: str,
+    page_size: int
+) -> list[Node]:
+    nodes = []
+    page_number, num_pages = 1, 1
+    while page_number <= num_pages:
+        page: Paginator[Node] = rest.get_nodes(
+            node_id=folder_id,
+            host=host,
+            token=token,
+            query_params={
+                'page_number': page_number,
+                'page_size': page_size,
+                'order_by': 'title'
+            }
+        )
+        nodes.extend(page.items)
+        page_number, num_pages = page_number + 1, page.num_pages
+
+    return nodes
@@ -0,0 +1,138 @@
+import hashlib
+import threading
+from pathlib import Path
+from uuid import UUID
+
+from papermerge_cli.lib.db import delete_database, open_database
+from papermerge_cli.utils import cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY,
+    node_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT,
+    node_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS created_documents (
+    path TEXT PRIMARY KEY,
+    node_id TEXT NOT NULL
+);
+"""
+
+
+def journal_path(
+    host: str,
+    source: Path,
+    target_id: UUID,
+    namespace: str = 'journals'
+) -> Path:
+    """Returns location of the journal of given import
+
+    Same source path imported into same target folder on the same host
+    is always journaled in the same file. Journals of `watch` are kept
+    in their own `namespace`: import removes its journal once done,
+    which must not make watch upload everything again.
+    """
+    key = f"{host}|{source}|{target_id}".encode()
+    name = hashlib.sha256(key).hexdigest()[:32]
+
+    return cache_dir() / namespace / f'{name}.sqlite'
+
+
+class Journal:
+    """Local record of the import progress
+
+    Keeps, in a SQLite database, every uploaded file (with its size,
+    modification time and optionally content hash) and every created
+    folder together with the UUID of the corresponding node on server.
+    Document nodes created ahead of their upload are recorded too, so
+    that content can be uploaded into them later. When import is
+    interrupted, re-running it will skip everything which was already
+    recorded.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_database(path, SCHEMA)
+
+    def folder_id(self, path: Path) -> UUID | None:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT node_id FROM folders WHERE path = ?',
+                (str(path),)
+            ).fetchone()
+
+        return UUID(row[0]) if row else None
+
+    def add_folder(self, path: Path, node_id: UUID) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO folders VALUES (?, ?)',
+                (str(path), str(node_id))
+            )
+
+    def document_id(
+        self,
+        path: Path,
+        size: int,
+        mtime: float
+    ) -> UUID | None:
+        """Returns UUID of the already uploaded document
+
+        Returns None if file was not uploaded yet or if it changed
+        (in size or modification time) since it was uploaded.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT node_id FROM documents'
+                ' WHERE path = ? AND size = ? AND mtime = ?',
+                (str(path), size, mtime)
+            ).fetchone()
+
+        return UUID(row[0]) if row else None
+
+    def add_document(
+        self,
+        path: Path,
+        size: int,
+        mtime: float,
+        node_id: UUID,
+        sha256: str | None = None
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)',
+                (str(path), size, mtime, sha256, str(node_id))
+            )
+
+    def created_document_id(self, path: Path) -> UUID | None:
+        """Returns UUID of document node created for the file"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT node_id FROM created_documents WHERE path = ?',
+                (str(path),)
+            ).fetchone()
+
+        return UUID(row[0]) if row else None
+
+    def add_created_document(self, path: Path, node_id: UUID) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO created_documents VALUES (?, ?)',
+                (str(path), str(node_id))
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def remove(self) -> None:
+        """Closes and deletes the journal"""
+        self.close()
+        delete_database(self.path)
@@ -1,5 +1,7 @@
 import uuid
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, TextIO
 
 from papermerge_cli import rest
 from papermerge_cli.schema import Node, Paginator, User
@@ -15,20 +17,12 @@ def list_nodes(
     page_size: int = 15,
     order_by: str = '-title'
 ) -> Paginator[Node]:
-
-    user: User = rest.get_me(host=host, token=token)
-
-    if parent_id is None:
-        # in case no specific parent uuid is requested
-        # will list the content of user home's folder
-        if inbox is True:
-            # however, if flag `--inbox` is provided, will
-            # list content of user's inbox folder
-            node_id = str(user.inbox_folder_id)
-        else:
-            node_id = str(user.home_folder_id)
-    else:
-        node_id = parent_id
+    node_id = resolve_folder_id(
+        host=host,
+        token=token,
+        inbox=inbox,
+        parent_id=parent_id
+    )
 
     query_params = {
         'page_number': page_number,
@@ -47,6 +41,65 @@ def list_nodes(
     return data
 
 
+def resolve_folder_id(
+    host: str,
+    token: str,
+    inbox: bool = False,
+    parent_id: uuid.UUID | None = None
+) -> str:
+    """Returns ID of the folder to list"""
+    if parent_id is not None:
+        return parent_id
+
+    user: User = rest.get_me(host=host, token=token)
+    # in case no specific parent uuid is requested
+    # will list the content of user home's folder
+    if inbox is True:
+        # however, if flag `--inbox` is provided, will
+        # list content of user's inbox folder
+        return str(user.inbox_folder_id)
+
+    return str(user.home_folder_id)
+
+
+def iter_nodes(
+    host: str,
+    token: str,
+    node_id: str,
+    page_size: int = 100,
+    order_by: str = '-title'
+) -> Iterator[Node]:
+    """Yields all children nodes of the folder, one at a time
+
+    Pages are fetched one after another; while nodes of the current page
+    are consumed, next page is already being fetched in the background.
+    Thus the first node is available as soon as the first page arrives,
+    regardless of how many nodes the folder has.
+    """
+    def fetch(page_number: int) -> Paginator[Node]:
+        return rest.get_nodes(
+            node_id=node_id,
+            host=host,
+            token=token,
+            query_params={
+                'page_number': page_number,
+                'page_size': page_size,
+                'order_by': order_by
+            }
+        )
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(fetch, 1)
+        while next_page is not None:
+            page = next_page.result()
+            if page.page_number < page.num_pages:
+                next_page = executor.submit(fetch, page.page_number + 1)
+            else:
+                next_page = None
+
+            yield from page.items
+
+
 def perform_node_command(
     host: str,
     token: str,
@@ -77,3 +130,55 @@ def perform_node_command(
         )
     else:
         raise ValueError("Invalid node action")
+
+
+@dataclass(frozen=True)
+class NodeCommandResult:
+    node_id: uuid.UUID
+    # None if command succeeded
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def read_node_ids(lines: TextIO) -> Iterator[uuid.UUID]:
+    """Yields node UUIDs, one per line; blank lines and # comments are
+    skipped"""
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            yield uuid.UUID(line)
+
+
+def perform_bulk_node_command(
+    host: str,
+    token: str,
+    node_ids: Iterable[uuid.UUID],
+    action: NodeActionEnum,
+    tags: List[str],
+    workers: int = 8
+) -> Iterator[NodeCommandResult]:
+    """Performs same node command on many nodes concurrently
+
+    Yields result of each node as soon as its command completes.
+    """
+    def run(node_id: uuid.UUID) -> NodeCommandResult:
+        try:
+            perform_node_command(
+                host=host,
+                token=token,
+                node_id=node_id,
+                action=action,
+                tags=tags
+            )
+        except Exception as ex:
+            return NodeCommandResult(node_id=node_id, error=str(ex))
+
+        return NodeCommandResult(node_id=node_id)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run, node_id) for node_id in node_ids]
+        for future in as_completed(futures):
+            yield future.result()
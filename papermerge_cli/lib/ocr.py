@@ -0,0 +1,119 @@
+import time
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from papermerge_cli.lib.nodes import iter_nodes
+from papermerge_cli.schema.nodes import NodeType
+from papermerge_cli.types import OCRStatusEnum
+
+# seconds between polls; interval doubles (up to maximum) with each
+# poll and drops back to initial once documents finish
+INITIAL_INTERVAL = 1.0
+MAX_INTERVAL = 30.0
+LIST_PAGE_SIZE = 1000
+
+
+@dataclass
+class OCRWaitStats:
+    success: int = 0
+    failed: list[UUID] = field(default_factory=list)
+    # documents whose OCR did not finish before timeout
+    pending: list[UUID] = field(default_factory=list)
+    # documents which are not in their folder anymore
+    missing: list[UUID] = field(default_factory=list)
+    # number of times the folders were listed
+    polls: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def timed_out(self) -> bool:
+        return bool(self.pending)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+def ocr_statuses(
+    host: str,
+    token: str,
+    folder_id: UUID,
+    document_ids: set[UUID]
+) -> dict[UUID, OCRStatusEnum]:
+    """Returns OCR status of given documents of the folder
+
+    Status of all documents is read from one listing of the folder,
+    instead of requesting every document. Documents which are not in
+    the folder are left out.
+    """
+    statuses = {}
+    for node in iter_nodes(
+        host=host,
+        token=token,
+        node_id=str(folder_id),
+        page_size=LIST_PAGE_SIZE,
+        order_by='title'
+    ):
+        if node.ctype == NodeType.document and node.id in document_ids:
+            statuses[node.id] = node.document.ocr_status \
+                if node.document else OCRStatusEnum.unknown
+
+    return statuses
+
+
+def wait_for_ocr(
+    host: str,
+    token: str,
+    documents: dict[UUID, UUID],
+    timeout: float,
+    initial_interval: float = INITIAL_INTERVAL,
+    max_interval: float = MAX_INTERVAL
+) -> OCRWaitStats:
+    """Waits until OCR of all `documents` is done or `timeout` expires
+
+    `documents` maps document UUID to UUID of its folder. Every poll
+    lists each folder which still has documents with OCR in progress,
+    i.e. costs one request per folder (and page), not per document.
+    """
+    stats = OCRWaitStats()
+    pending: dict[UUID, set[UUID]] = {}
+    for document_id, folder_id in documents.items():
+        pending.setdefault(folder_id, set()).add(document_id)
+
+    deadline = stats.started_at + timeout
+    interval = initial_interval
+    while pending:
+        finished = 0
+        for folder_id, document_ids in list(pending.items()):
+            statuses = ocr_statuses(host, token, folder_id, document_ids)
+            for document_id in list(document_ids):
+                status = statuses.get(document_id)
+                if status is None:
+                    stats.missing.append(document_id)
+                elif status == OCRStatusEnum.success:
+                    stats.success += 1
+                elif status == OCRStatusEnum.failed:
+                    stats.failed.append(document_id)
+                else:
+                    continue
+                document_ids.discard(document_id)
+                finished += 1
+            if not document_ids:
+                del pending[folder_id]
+        stats.polls += 1
+
+        remaining = deadline - time.monotonic()
+        if not pending or remaining <= 0:
+            break
+        if finished:
+            # OCR is progressing; check again soon
+            interval = initial_interval
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
+
+    for document_ids in pending.values():
+        stats.pending.extend(document_ids)
+    stats.finished_at = time.monotonic()
+
+    return stats
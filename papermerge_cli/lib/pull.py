@@ -0,0 +1,380 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from uuid import UUID
+
+from papermerge_cli import rest
+from papermerge_cli.lib.db import open_database
+from papermerge_cli.lib.download import download_version, latest_version
+from papermerge_cli.lib.tree import TreeEntry, walk_tree
+from papermerge_cli.schema.nodes import NodeType
+
+# state of the mirror is kept in the mirror (target directory) itself
+STATE_FILE = '.papermerge-cli-pull.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    node_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version_id TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class PulledDocument:
+    node_id: str
+    # path relative to the target directory
+    path: str
+    updated_at: str
+    version_id: str
+    size: int
+
+
+class PullState:
+    """What was pulled into the target directory, and from where
+
+    For every pulled document keeps its local path, `updated_at` and
+    the version (id and size) whose content is on disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_database(path, SCHEMA)
+
+    def get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM meta WHERE key = ?',
+                (key,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                (key, value)
+            )
+
+    def documents(self) -> dict[str, PulledDocument]:
+        """Returns all pulled documents, by node id"""
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM documents').fetchall()
+
+        return {row[0]: PulledDocument(*row) for row in rows}
+
+    def add_document(self, document: PulledDocument) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)',
+                (
+                    document.node_id,
+                    document.path,
+                    document.updated_at,
+                    document.version_id,
+                    document.size
+                )
+            )
+
+    def remove_document(self, node_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM documents WHERE node_id = ?',
+                (node_id,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class PullStats:
+    # documents whose content was transferred
+    downloaded: int = 0
+    bytes: int = 0
+    # documents moved/renamed locally, without transfer
+    moved: int = 0
+    # changed on server (`updated_at`) but with same content
+    unchanged: int = 0
+    # not changed since last pull; not even requested
+    skipped: int = 0
+    # deleted locally because they are not on server anymore
+    removed: int = 0
+    # (path, error message) of documents which failed
+    errors: list[tuple[str, str]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+def relative_path(entry: TreeEntry) -> str:
+    """Returns local path of the node, relative to the target directory
+
+    Path follows titles of node's ancestors up to the pulled folder.
+    Components which could point outside the target directory are
+    dropped.
+    """
+    parts = [
+        part for part in entry.path.split('/')
+        if part not in ('', '.', '..')
+    ]
+
+    return '/'.join(parts)
+
+
+def claim_path(
+    path: str,
+    node_id: str,
+    previous: PulledDocument | None,
+    owners: dict[str, str],
+    claimed: set[str]
+) -> str:
+    """Returns local path of the document, given its path by titles
+
+    Document pulled before keeps its path as long as its title and
+    folder stay the same. Otherwise it gets `path`, unless the path
+    was claimed by another document in this pull or belongs (`owners`)
+    to a document pulled before; then the document UUID is added to
+    the name. Documents with the same title thus never swap their
+    files, whatever order the walk yields them in.
+    """
+    name = PurePosixPath(path)
+    unique_path = str(name.with_stem(f'{name.stem}-{node_id}'))
+    if previous is not None and previous.path in (path, unique_path):
+        path = previous.path
+    elif path in claimed or owners.get(path, node_id) != node_id:
+        path = unique_path
+    claimed.add(path)
+
+    return path
+
+
+class Puller:
+    """Mirrors remote folder tree into local directory
+
+    Folder tree is walked concurrently; each document changed since the
+    last pull (or never pulled) is handed over to a pool of `workers`
+    which fetch its details and download its latest version, unless
+    content on disk is already the same version. Documents which were
+    only moved or renamed on server are moved locally. Unchanged
+    documents cost no request at all, besides listing their folder.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        target_dir: Path,
+        workers: int = 8,
+        delete: bool = False
+    ):
+        self.host = host
+        self.token = token
+        self.target_dir = target_dir
+        self.workers = workers
+        self.delete = delete
+        self.stats = PullStats()
+        self._stats_lock = threading.Lock()
+        # limits documents waiting for a worker, memory stays bounded
+        # no matter how many documents changed
+        self._slots = threading.BoundedSemaphore(workers * 4)
+
+    def run(self, folder_id: UUID) -> PullStats:
+        state = PullState(self.target_dir / STATE_FILE)
+        try:
+            pulled_from = state.get_meta('folder_id')
+            if pulled_from not in (None, str(folder_id)):
+                raise ValueError(
+                    f"{self.target_dir} is a mirror of folder {pulled_from}"
+                )
+            state.set_meta('folder_id', str(folder_id))
+            self._pull(state, folder_id)
+        finally:
+            state.close()
+
+        self.stats.finished_at = time.monotonic()
+
+        return self.stats
+
+    def _pull(self, state: PullState, folder_id: UUID) -> None:
+        pulled = state.documents()
+        # local paths of documents pulled before, they keep them
+        owners = {
+            document.path: node_id for node_id, document in pulled.items()
+        }
+        seen: set[str] = set()
+        claimed: set[str] = set()
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix='pull'
+        )
+
+        try:
+            for entry in walk_tree(
+                host=self.host,
+                token=self.token,
+                folder_id=folder_id,
+                workers=self.workers
+            ):
+                path = relative_path(entry)
+                if entry.node.ctype == NodeType.folder:
+                    (self.target_dir / path).mkdir(parents=True, exist_ok=True)
+                    continue
+
+                node_id = str(entry.node.id)
+                seen.add(node_id)
+                previous = pulled.get(node_id)
+                path = claim_path(path, node_id, previous, owners, claimed)
+                if self._is_up_to_date(previous, entry, path):
+                    self.stats.skipped += 1
+                    continue
+
+                self._slots.acquire()
+                future = executor.submit(
+                    self._pull_document, state, entry, path, previous
+                )
+                future.add_done_callback(self._release_slot)
+        except BaseException:
+            # walk failed; documents not started yet are not pulled
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+        executor.shutdown(wait=True)
+
+        if self.delete:
+            for node_id in pulled.keys() - seen:
+                (self.target_dir / pulled[node_id].path).unlink(
+                    missing_ok=True
+                )
+                state.remove_document(node_id)
+                self.stats.removed += 1
+
+    def _release_slot(self, future: Future) -> None:
+        self._slots.release()
+
+    def _is_up_to_date(
+        self,
+        previous: PulledDocument | None,
+        entry: TreeEntry,
+        path: str
+    ) -> bool:
+        if previous is None:
+            return False
+        if previous.updated_at != entry.node.updated_at.isoformat():
+            return False
+        if previous.path != path:
+            return False
+
+        try:
+            size = (self.target_dir / path).stat().st_size
+        except OSError:
+            return False
+
+        return size == previous.size
+
+    def _pull_document(
+        self,
+        state: PullState,
+        entry: TreeEntry,
+        path: str,
+        previous: PulledDocument | None
+    ) -> None:
+        try:
+            document = rest.get_document(
+                host=self.host,
+                token=self.token,
+                document_id=entry.node.id
+            )
+            version = latest_version(document)
+            file_path = self.target_dir / path
+            same_version = previous is not None \
+                and previous.version_id == str(version.id) \
+                and previous.size == version.size
+            outcome = None
+
+            if same_version and previous.path != path:
+                old_path = self.target_dir / previous.path
+                if old_path.exists():
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    old_path.replace(file_path)
+                    outcome = 'moved'
+
+            received = download_version(
+                host=self.host,
+                token=self.token,
+                version=version,
+                file_path=file_path,
+                # content on disk of a document never pulled before
+                # may be anything, e.g. file of another document
+                overwrite=not same_version
+            )
+            if received is not None:
+                outcome = 'downloaded'
+                if previous is not None and previous.path != path:
+                    (self.target_dir / previous.path).unlink(missing_ok=True)
+
+            state.add_document(PulledDocument(
+                node_id=str(entry.node.id),
+                path=path,
+                updated_at=entry.node.updated_at.isoformat(),
+                version_id=str(version.id),
+                size=version.size
+            ))
+        except Exception as ex:
+            with self._stats_lock:
+                self.stats.errors.append((path, str(ex)))
+            return
+
+        with self._stats_lock:
+            if outcome == 'downloaded':
+                self.stats.downloaded += 1
+                self.stats.bytes += received
+            elif outcome == 'moved':
+                self.stats.moved += 1
+            else:
+                self.stats.unchanged += 1
+
+
+def pull_folder(
+    host: str,
+    token: str,
+    folder_id: UUID,
+    target_dir: Path,
+    workers: int = 8,
+    delete: bool = False
+) -> PullStats:
+    """Mirrors folder (recursively) into `target_dir`
+
+    Repeated pulls into same directory transfer only documents changed
+    since the last pull. With `delete` local files of documents which
+    are no longer in the folder are deleted; files which were never
+    pulled are not touched.
+    """
+    puller = Puller(
+        host=host,
+        token=token,
+        target_dir=target_dir,
+        workers=workers,
+        delete=delete
+    )
+
+    return puller.run(folder_id)
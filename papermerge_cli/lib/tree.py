@@ -0,0 +1,151 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator
+
+from papermerge_cli import rest
+from papermerge_cli.schema import Node, Paginator
+from papermerge_cli.schema.nodes import NodeType
+
+# how long worker waits for consumer to make room in results queue
+# before checking if walk was stopped
+PUT_TIMEOUT = 0.5
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    node: Node
+    # full path of the node, relative to the walked folder
+    path: str
+    # 1 for direct children of the walked folder
+    depth: int
+
+
+class _FolderDone:
+    """Marks that all pages of one folder were listed"""
+
+
+class TreeWalker:
+    """Breadth-first walk over a folder tree with bounded concurrency
+
+    Up to `workers` folders are listed concurrently; nodes are yielded
+    as soon as their page arrives. Results are passed through a bounded
+    queue, thus workers pause when consumer falls behind. Discovered
+    folders wait in a frontier (id, path and depth of each) and are
+    handed to workers only as they free up, so neither nodes nor
+    executor work items pile up; the frontier itself grows with the
+    number of discovered, not yet listed folders.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        workers: int = 8,
+        max_depth: int | None = None,
+        page_size: int = 1000,
+        order_by: str = 'title'
+    ):
+        self.host = host
+        self.token = token
+        self.workers = workers
+        self.max_depth = max_depth
+        self.page_size = page_size
+        self.order_by = order_by
+        self._results: queue.Queue = queue.Queue(maxsize=workers * 2)
+        self._stopped = threading.Event()
+
+    def walk(self, folder_id: str) -> Iterator[TreeEntry]:
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix='tree'
+        )
+        # folders discovered but not yet handed to a worker
+        frontier = deque([(folder_id, '', 1)])
+        listing = 0
+
+        def schedule():
+            nonlocal listing
+            while frontier and listing < self.workers:
+                executor.submit(self._list_folder, *frontier.popleft())
+                listing += 1
+
+        schedule()
+        try:
+            while listing:
+                item = self._results.get()
+                if isinstance(item, _FolderDone):
+                    listing -= 1
+                    schedule()
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+
+                parent_path, depth, nodes = item
+                for node in nodes:
+                    entry = TreeEntry(
+                        node=node,
+                        path=f'{parent_path}/{node.title}',
+                        depth=depth
+                    )
+                    if node.ctype == NodeType.folder and self._descend(depth):
+                        frontier.append((node.id, entry.path, depth + 1))
+                        schedule()
+                    yield entry
+        finally:
+            self._stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _descend(self, depth: int) -> bool:
+        return self.max_depth is None or depth < self.max_depth
+
+    def _list_folder(self, folder_id, path: str, depth: int) -> None:
+        try:
+            page_number, num_pages = 1, 1
+            while page_number <= num_pages and not self._stopped.is_set():
+                page: Paginator[Node] = rest.get_nodes(
+                    node_id=folder_id,
+                    host=self.host,
+                    token=self.token,
+                    query_params={
+                        'page_number': page_number,
+                        'page_size': self.page_size,
+                        'order_by': self.order_by
+                    }
+                )
+                self._put((path, depth, page.items))
+                page_number, num_pages = page_number + 1, page.num_pages
+        except Exception as ex:
+            self._put(ex)
+        finally:
+            self._put(_FolderDone())
+
+    def _put(self, item) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._results.put(item, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+
+def walk_tree(
+    host: str,
+    token: str,
+    folder_id: str,
+    workers: int = 8,
+    max_depth: int | None = None,
+    page_size: int = 1000
+) -> Iterator[TreeEntry]:
+    """Yields all nodes in the tree of given folder, with their paths"""
+    walker = TreeWalker(
+        host=host,
+        token=token,
+        workers=workers,
+        max_depth=max_depth,
+        page_size=page_size
+    )
+
+    return walker.walk(folder_id)
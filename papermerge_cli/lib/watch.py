@@ -0,0 +1,357 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+from uuid import UUID
+
+from watchdog.events import (FileSystemEvent, FileSystemEventHandler,
+                             FileSystemMovedEvent)
+from watchdog.observers import Observer
+
+from papermerge_cli.lib.importer import remove
+from papermerge_cli.lib.journal import Journal, journal_path
+from papermerge_cli.rest import create_folder, get_me, upload_document
+from papermerge_cli.schema import Document, Folder, User
+
+# seconds without any write after which file is considered complete
+DEFAULT_SETTLE = 0.5
+# files closed after writing are complete, they wait only for this
+# many seconds so that files dropped together are uploaded together
+BATCH_WINDOW = 0.1
+
+
+@dataclass(frozen=True)
+class WatchResult:
+    path: Path
+    size: int = 0
+    document_id: UUID | None = None
+    # None if upload succeeded
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class WatchStats:
+    files: int = 0
+    bytes: int = 0
+    failed: int = 0
+    batches: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    def add(self, result: WatchResult) -> None:
+        if result.ok:
+            self.files += 1
+            self.bytes += result.size
+        else:
+            self.failed += 1
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+def is_ignored(path: Path) -> bool:
+    # hidden files are usually temporary files of the program which
+    # writes the document, renamed once document is complete
+    return path.name.startswith('.')
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: 'Watcher'):
+        self.watcher = watcher
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        if event.is_directory:
+            self.watcher.add_tree(Path(event.src_path))
+        else:
+            self.watcher.touch(Path(event.src_path))
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self.watcher.touch(Path(event.src_path))
+
+    def on_closed(self, event: FileSystemEvent) -> None:
+        self.watcher.touch(Path(event.src_path), complete=True)
+
+    def on_moved(self, event: FileSystemMovedEvent) -> None:
+        self.watcher.forget(Path(event.src_path))
+        if event.is_directory:
+            self.watcher.add_tree(Path(event.dest_path))
+        else:
+            # renamed files are complete (rename is atomic)
+            self.watcher.touch(Path(event.dest_path), complete=True)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        self.watcher.forget(Path(event.src_path))
+
+
+class Watcher:
+    """Uploads files as they appear in the watched folder
+
+    File system events (inotify on Linux) tell which files are being
+    written. A file is uploaded once it is complete: when it was closed
+    after writing, or renamed into the folder, or - on platforms which
+    do not report closing - when it was not written to for `settle`
+    seconds. Complete files are uploaded in batches, concurrently by a
+    pool of `workers`, all over the same connection pool. Sub-folders
+    of the watched folder are created as folders on server.
+
+    Nothing is polled: between events the watcher sleeps until the
+    next pending file is due.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        watch_dir: Path,
+        parent_id: UUID,
+        workers: int = 4,
+        delete: bool = False,
+        skip_ocr: bool = False,
+        settle: float = DEFAULT_SETTLE,
+        journal: Journal | None = None,
+        on_result: Callable[[WatchResult], None] | None = None
+    ):
+        self.host = host
+        self.token = token
+        self.watch_dir = watch_dir
+        self.parent_id = parent_id
+        self.workers = workers
+        self.delete = delete
+        self.skip_ocr = skip_ocr
+        self.settle = settle
+        self.journal = journal
+        self.on_result = on_result
+        self.stats = WatchStats()
+        self._cond = threading.Condition()
+        # path -> monotonic time at which file is considered complete
+        self._pending: dict[Path, float] = {}
+        self._stopped = False
+        # local folder -> UUID of the corresponding folder on server
+        self._folders: dict[Path, UUID] = {watch_dir: parent_id}
+
+    def touch(self, path: Path, complete: bool = False) -> None:
+        """Records that file was written to (or completed)"""
+        if is_ignored(path):
+            return
+        delay = BATCH_WINDOW if complete else self.settle
+        with self._cond:
+            self._pending[path] = time.monotonic() + delay
+            self._cond.notify()
+
+    def forget(self, path: Path) -> None:
+        with self._cond:
+            self._pending.pop(path, None)
+
+    def add_tree(self, folder: Path) -> None:
+        """Schedules all files of the folder, recursively"""
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for name in files:
+                self.touch(Path(root) / name)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def run(self) -> WatchStats:
+        """Watches the folder until `stop` is called
+
+        Files which are in the folder when watch starts are uploaded
+        as well.
+        """
+        observer = Observer()
+        observer.schedule(
+            _EventHandler(self),
+            str(self.watch_dir),
+            recursive=True
+        )
+        observer.start()
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix='watch'
+        )
+        try:
+            self.add_tree(self.watch_dir)
+            while batch := self._next_batch():
+                self._submit_batch(executor, batch)
+        finally:
+            observer.stop()
+            executor.shutdown(wait=True)
+            observer.join()
+
+        self.stats.finished_at = time.monotonic()
+
+        return self.stats
+
+    def _next_batch(self) -> list[Path]:
+        """Waits for complete files; returns empty list once stopped"""
+        with self._cond:
+            while not self._stopped:
+                now = time.monotonic()
+                batch = [
+                    path for path, due in self._pending.items() if due <= now
+                ]
+                if batch:
+                    for path in batch:
+                        del self._pending[path]
+                    return sorted(batch)
+
+                timeout = None
+                if self._pending:
+                    timeout = min(self._pending.values()) - now
+                self._cond.wait(timeout)
+
+        return []
+
+    def _submit_batch(
+        self,
+        executor: ThreadPoolExecutor,
+        batch: list[Path]
+    ) -> None:
+        self.stats.batches += 1
+        for path in batch:
+            if not path.is_file():
+                # removed or renamed meanwhile
+                continue
+            try:
+                # folders are resolved here, one at a time, so that two
+                # files of a new sub-folder do not both create it
+                parent_id = self._folder_id(path.parent)
+            except Exception as ex:
+                self._report(WatchResult(path=path, error=str(ex)))
+                continue
+            executor.submit(self._upload, path, parent_id)
+
+    def _folder_id(self, folder: Path) -> UUID:
+        """Returns UUID of the remote folder for given local folder"""
+        folder_id = self._folders.get(folder)
+        if folder_id:
+            return folder_id
+
+        parent_id = self._folder_id(folder.parent)
+        if self.journal:
+            folder_id = self.journal.folder_id(folder)
+
+        if folder_id is None:
+            created: Folder = create_folder(
+                host=self.host,
+                token=self.token,
+                title=folder.name,
+                parent_id=parent_id
+            )
+            folder_id = created.id
+            if self.journal:
+                self.journal.add_folder(folder, node_id=folder_id)
+
+        self._folders[folder] = folder_id
+
+        return folder_id
+
+    def _upload(self, path: Path, parent_id: UUID) -> None:
+        try:
+            stat = path.stat()
+            if self.journal and self.journal.document_id(
+                path, size=stat.st_size, mtime=stat.st_mtime
+            ):
+                # already uploaded, e.g. by previous watch
+                return
+
+            doc: Document = upload_document(
+                host=self.host,
+                token=self.token,
+                file_path=path,
+                skip_ocr=self.skip_ocr,
+                parent_id=parent_id
+            )
+        except FileNotFoundError:
+            # removed before it was uploaded
+            return
+        except Exception as ex:
+            self._report(WatchResult(path=path, error=str(ex)))
+            return
+
+        if self.journal:
+            self.journal.add_document(
+                path,
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                node_id=doc.id
+            )
+        if self.delete:
+            remove(path)
+
+        self._report(
+            WatchResult(path=path, size=stat.st_size, document_id=doc.id)
+        )
+
+    def _report(self, result: WatchResult) -> None:
+        with self._cond:
+            self.stats.add(result)
+        if self.on_result:
+            self.on_result(result)
+
+
+def watch_folder(
+    host: str,
+    token: str,
+    watch_dir: Path,
+    parent_id: UUID | None = None,
+    workers: int = 4,
+    delete: bool = False,
+    skip_ocr: bool = False,
+    settle: float = DEFAULT_SETTLE,
+    on_start: Callable[[Watcher], None] | None = None,
+    on_result: Callable[[WatchResult], None] | None = None
+) -> WatchStats:
+    """Uploads files dropped into `watch_dir` until watcher is stopped
+
+    By default files are uploaded into the user's inbox. Unless
+    `delete` is set, uploaded files are journaled so that they are not
+    uploaded again when watch is restarted. `on_start` receives the
+    watcher before it starts, e.g. to stop it on signal.
+    """
+    if parent_id is None:
+        user: User = get_me(host=host, token=token)
+        parent_id = user.inbox_folder_id
+
+    journal = None
+    if not delete:
+        journal = Journal(
+            journal_path(
+                host,
+                source=watch_dir,
+                target_id=parent_id,
+                namespace='watch'
+            )
+        )
+
+    watcher = Watcher(
+        host=host,
+        token=token,
+        watch_dir=watch_dir,
+        parent_id=parent_id,
+        workers=workers,
+        delete=delete,
+        skip_ocr=skip_ocr,
+        settle=settle,
+        journal=journal,
+        on_result=on_result
+    )
+    if on_start:
+        on_start(watcher)
+
+    try:
+        return watcher.run()
+    finally:
+        if journal:
+            journal.close()
@@ -1,29 +1,43 @@
+"""Command line interface
+
+Only typer and light modules are imported at module level. Each command
+imports what it needs (HTTP clients, pydantic schemas, rich etc.) when
+it runs; this keeps start up time of the CLI short - important as CLI
+may be invoked thousands of times a day e.g. from cron jobs or scanner
+hooks.
+"""
+import functools
 import importlib.metadata
+import sys
 import uuid
 from pathlib import Path
-from typing import List
+from typing import Iterable, List
 
-import click
 import typer
-from rich.console import Console
-from rich.table import Table
 from typing_extensions import Annotated
 
-import papermerge_cli.format.nodes as format_nodes
-import papermerge_cli.format.users as format_users
-from papermerge_cli.lib.importer import upload_file_or_folder
-from papermerge_cli.lib.nodes import list_nodes, perform_node_command
-from papermerge_cli.lib.users import me as perform_me
-from papermerge_cli.lib.version import perform_server_version_command
-from papermerge_cli.schema import Node, Paginator, User
-from papermerge_cli.types import NodeActionEnum
+from papermerge_cli.constants import (DEFAULT_CONNECT_TIMEOUT,
+                                      DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE,
+                                      DEFAULT_READ_TIMEOUT)
+from papermerge_cli.types import (DedupEnum, NodeActionEnum, NodeTypeEnum,
+                                  OutputFormatEnum, TagsOpEnum)
 
 from .utils import sanitize_host
 
 PREFIX = 'PAPERMERGE_CLI'
 
-console = Console()
 app = typer.Typer()
+index_app = typer.Typer(
+    help='Local index of nodes metadata, used by ls and find'
+)
+app.add_typer(index_app, name='index')
+
+
+@functools.cache
+def get_console():
+    from rich.console import Console
+
+    return Console()
 
 
 HostEnvVar = Annotated[
@@ -41,15 +55,97 @@ TokenEnvVar = Annotated[
         help='JWT authorization token'
     ),
 ]
+PoolSizeEnvVar = Annotated[
+    int,
+    typer.Option(
+        min=1,
+        envvar=f"{PREFIX}__POOL_SIZE",
+        help="Maximum number of keep-alive HTTP connections to REST API host"
+    ),
+]
+ConnectTimeoutEnvVar = Annotated[
+    float,
+    typer.Option(
+        min=0.1,
+        envvar=f"{PREFIX}__CONNECT_TIMEOUT",
+        help="Seconds to wait for connection to REST API host"
+    ),
+]
+ReadTimeoutEnvVar = Annotated[
+    float,
+    typer.Option(
+        min=0.1,
+        envvar=f"{PREFIX}__READ_TIMEOUT",
+        help="Seconds to wait for REST API response"
+    ),
+]
+MaxRetriesEnvVar = Annotated[
+    int,
+    typer.Option(
+        min=0,
+        envvar=f"{PREFIX}__MAX_RETRIES",
+        help="How many times failed REST API request is retried"
+    ),
+]
+UserCacheTTLEnvVar = Annotated[
+    int,
+    typer.Option(
+        min=0,
+        envvar=f"{PREFIX}__USER_CACHE_TTL",
+        help="Number of seconds for which current user details are cached"
+             " on disk. By default (0) they are fetched on each invocation"
+    ),
+]
+StatsFlag = Annotated[
+    bool,
+    typer.Option(
+        '--stats',
+        is_flag=True,
+        help="At exit, print latency histogram, percentiles, throughput"
+             " and error counts of REST API calls (to stderr)"
+    ),
+]
+StatsFile = Annotated[
+    Path | None,
+    typer.Option(
+        envvar=f"{PREFIX}__STATS_FILE",
+        dir_okay=False,
+        help="At exit, write REST API call metrics to this file:"
+             " Prometheus text format for .prom files (e.g. for node"
+             " exporter textfile collector), JSON otherwise"
+    ),
+]
+TraceFile = Annotated[
+    Path | None,
+    typer.Option(
+        '--trace',
+        envvar=f"{PREFIX}__TRACE",
+        dir_okay=False,
+        help="Write trace of the execution (directory scan, file reads,"
+             " REST API calls, validation, output formatting; per thread)"
+             " to this file, in Chrome trace event format. Open it in"
+             " chrome://tracing or https://ui.perfetto.dev"
+    ),
+]
 NodeAction = Annotated[
     NodeActionEnum,
     typer.Argument(
         help='add/removes/assign tags to the node'
     )
 ]
-NodeID = Annotated[
-    uuid.UUID,
-    typer.Option(help='Node UUID')
+NodeIDs = Annotated[
+    List[uuid.UUID],
+    typer.Option(
+        '--node-id',
+        help='Node UUID. Can be used multiple times'
+    )
+]
+NodeIDsFile = Annotated[
+    typer.FileText,
+    typer.Option(
+        '--node-ids-from',
+        help='File with node UUIDs, one per line. Use - to read from stdin'
+    )
 ]
 ParentFolderID = Annotated[
     uuid.UUID,
@@ -59,6 +155,29 @@ InboxFlag = Annotated[
     bool,
     typer.Option(is_flag=True, help='List nodes from Inbox folder')
 ]
+AllPagesFlag = Annotated[
+    bool,
+    typer.Option(
+        '--all',
+        is_flag=True,
+        help='List all nodes (from all pages), printing them as they arrive'
+    )
+]
+Output = Annotated[
+    OutputFormatEnum,
+    typer.Option(
+        '--output', '-o',
+        help='Output format. Machine-readable formats (json, jsonl, csv,'
+             ' tsv) are written node by node as soon as nodes are received'
+    )
+]
+MaxDepth = Annotated[
+    int,
+    typer.Option(
+        min=1,
+        help='Descend at most this many levels below the folder'
+    )
+]
 PageSize = Annotated[
     int,
     typer.Option(
@@ -85,6 +204,17 @@ FileOrFolderPath = Annotated[
         help="Local path to file or folder to import"
     )
 ]
+WatchFolderPath = Annotated[
+    Path,
+    typer.Argument(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+        help="Local folder to watch for new files"
+    )
+]
 DeleteAfterImport = Annotated[
     bool,
     typer.Option(
@@ -100,6 +230,55 @@ SkipOCR = Annotated[
              ' Works only with REST API >= 3.1'
     )
 ]
+Workers = Annotated[
+    int,
+    typer.Option(
+        min=1,
+        max=64,
+        help='Number of documents uploaded concurrently'
+    )
+]
+Resume = Annotated[
+    bool,
+    typer.Option(
+        '--resume/--no-resume',
+        help='Continue interrupted import of the same path where it stopped.'
+             ' With --no-resume import starts from scratch'
+    )
+]
+Dedup = Annotated[
+    DedupEnum | None,
+    typer.Option(
+        help='Find files whose content was already imported (in this'
+             ' import or by earlier import with --dedup) and skip them or'
+             ' only report them'
+    )
+]
+WaitOCR = Annotated[
+    bool,
+    typer.Option(
+        is_flag=True,
+        help='After import, wait until OCR of all uploaded documents is'
+             ' done. Exits with code 1 if OCR of any document failed or'
+             ' did not finish in time'
+    )
+]
+OCRTimeout = Annotated[
+    float,
+    typer.Option(
+        min=0,
+        help='Seconds to wait for OCR (with --wait-ocr)'
+    )
+]
+Settle = Annotated[
+    float,
+    typer.Option(
+        min=0.05,
+        help='Seconds without writes after which a file is considered'
+             ' complete. Files closed after writing (reported by inotify'
+             ' on Linux) are uploaded without waiting'
+    )
+]
 TargetNodeID = Annotated[
     uuid.UUID,
     typer.Option(
@@ -107,6 +286,60 @@ TargetNodeID = Annotated[
         help="Trigger OCR"
     )
 ]
+TargetDir = Annotated[
+    Path,
+    typer.Option(
+        '--target-dir', '-d',
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        help='Local directory where documents are saved'
+    )
+]
+FolderID = Annotated[
+    uuid.UUID,
+    typer.Argument(help='Folder UUID')
+]
+DeleteRemoved = Annotated[
+    bool,
+    typer.Option(
+        is_flag=True,
+        help='Delete local files of documents which are no longer in'
+             ' the folder (only files created by previous pulls)'
+    )
+]
+Live = Annotated[
+    bool,
+    typer.Option(
+        is_flag=True,
+        help='Query REST API even if local index exists'
+    )
+]
+FullSync = Annotated[
+    bool,
+    typer.Option(
+        is_flag=True,
+        help='List every folder, not only the ones changed since last sync'
+    )
+]
+TitleFilter = Annotated[
+    str | None,
+    typer.Option(help='Text which node title contains (case insensitive)')
+]
+TagsFilter = Annotated[
+    str | None,
+    typer.Option(help='Comma separated list of tags')
+]
+TagsOp = Annotated[
+    TagsOpEnum,
+    typer.Option(
+        help='Should node have all or any of the provided tags?'
+    )
+]
+NodeTypeFilter = Annotated[
+    NodeTypeEnum | None,
+    typer.Option('--type', help='Find only folders or only documents')
+]
 OrderBy = Annotated[
     str,
     typer.Option(
@@ -123,22 +356,105 @@ def main(
     ctx: typer.Context,
     host: HostEnvVar,
     token: TokenEnvVar,
+    pool_size: PoolSizeEnvVar = DEFAULT_POOL_SIZE,
+    user_cache_ttl: UserCacheTTLEnvVar = 0,
+    connect_timeout: ConnectTimeoutEnvVar = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: ReadTimeoutEnvVar = DEFAULT_READ_TIMEOUT,
+    max_retries: MaxRetriesEnvVar = DEFAULT_MAX_RETRIES,
+    stats: StatsFlag = False,
+    stats_file: StatsFile = None,
+    trace: TraceFile = None,
     version: Annotated[bool, typer.Option(is_flag=True)] = False
 ):
+    if ctx.invoked_subcommand is None and version:
+        papermerge_cli_version = importlib.metadata.version(
+            "papermerge-cli"
+        )
+        typer.echo(papermerge_cli_version)
+        return
+
+    import papermerge_cli.api_client as api_client
+    import papermerge_cli.retry as retry
+    from papermerge_cli.rest.users import set_user_cache_ttl
+
     # run sub-command
     ctx.ensure_object(dict)
     ctx.obj['HOST'] = sanitize_host(host)
     ctx.obj['TOKEN'] = token
+    ctx.obj['POOL_SIZE'] = pool_size
+    # all REST API calls of this invocation share one connection pool
+    api_client.configure(
+        pool_size=pool_size,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout
+    )
+    retry.configure(max_retries=max_retries)
+    set_user_cache_ttl(user_cache_ttl)
+    if stats or stats_file:
+        collect_metrics(ctx, print_stats=stats, stats_file=stats_file)
+    if trace:
+        record_trace(ctx, trace_file=trace)
 
     if ctx.invoked_subcommand is None:
         # invoked without sub-command
-        if version:
-            papermerge_cli_version = importlib.metadata.version(
-                "papermerge-cli"
-            )
-            click.echo(papermerge_cli_version)
-        else:
-            list_nodes_command(ctx)
+        list_nodes_command(ctx)
+
+
+def collect_metrics(
+    ctx: typer.Context,
+    print_stats: bool,
+    stats_file: Path | None
+) -> None:
+    """Records metrics of all REST API calls; reports them at exit"""
+    import papermerge_cli.metrics as metrics
+
+    collected = metrics.enable()
+
+    def report():
+        if print_stats:
+            from rich.console import Console
+
+            from papermerge_cli.format.metrics import (latency_histogram,
+                                                       metrics_summary,
+                                                       metrics_table)
+
+            console = Console(stderr=True)
+            console.print(metrics_table(collected))
+            total = collected.total()
+            if total.count:
+                console.print("Latency of all REST API calls:")
+                console.print(latency_histogram(total), highlight=False)
+            console.print(metrics_summary(collected))
+        if stats_file:
+            metrics.write(collected, stats_file)
+
+    ctx.call_on_close(report)
+
+
+def record_trace(ctx: typer.Context, trace_file: Path) -> None:
+    """Records spans of the whole invocation; writes them at exit"""
+    import papermerge_cli.tracing as tracing
+
+    tracer = tracing.enable()
+    command = tracing.span(
+        f"papermerge-cli {ctx.invoked_subcommand or 'ls'}",
+        'cli'
+    )
+    command.__enter__()
+
+    def finish():
+        command.__exit__(None, None, None)
+        tracing.write(tracer, trace_file)
+
+    ctx.call_on_close(finish)
+
+
+def ensure_pool_size(ctx: typer.Context, workers: int) -> None:
+    """Makes sure that each worker can have its own connection"""
+    import papermerge_cli.api_client as api_client
+
+    if workers > ctx.obj['POOL_SIZE']:
+        api_client.configure(pool_size=workers)
 
 
 @app.command(name="import")
@@ -147,24 +463,142 @@ def import_command(
     file_or_folder: FileOrFolderPath,
     delete: DeleteAfterImport = False,
     skip_ocr: SkipOCR = False,
-    target_id: TargetNodeID | None = None
+    target_id: TargetNodeID | None = None,
+    workers: Workers = 1,
+    resume: Resume = True,
+    dedup: Dedup = None,
+    wait_ocr: WaitOCR = False,
+    ocr_timeout: OCRTimeout = 3600
 ):
     """Import recursively folders and documents from local filesystem
 
     If target UUID is not provided import will upload all documents to
     the user's inbox
     """
+    import papermerge_cli.format.imports as format_imports
+    from papermerge_cli.lib.importer import upload_file_or_folder
+
+    if wait_ocr and skip_ocr:
+        raise typer.BadParameter('--wait-ocr cannot be used with --skip-ocr')
+
+    # each worker creates document nodes ahead of another one which
+    # uploads their content
+    ensure_pool_size(ctx, workers * 2)
+
     try:
-        upload_file_or_folder(
+        stats = upload_file_or_folder(
             host=ctx.obj['HOST'],
             token=ctx.obj['TOKEN'],
             file_or_folder=Path(file_or_folder),
             skip_ocr=skip_ocr,
             parent_id=target_id,
-            delete=delete
+            delete=delete,
+            workers=workers,
+            resume=resume,
+            dedup=dedup.value if dedup else None,
+            track_uploads=wait_ocr
         )
     except Exception as ex:
-        console.print(ex)
+        get_console().print(ex)
+        if resume:
+            get_console().print(
+                "Import interrupted. Run same command again to resume it."
+            )
+        return
+
+    for item in stats.duplicates:
+        typer.echo(format_imports.duplicate(item))
+    get_console().print(format_imports.import_summary(stats))
+
+    if wait_ocr:
+        wait_for_ocr_command(ctx, stats.uploaded, timeout=ocr_timeout)
+
+
+def wait_for_ocr_command(
+    ctx: typer.Context,
+    documents: dict[uuid.UUID, uuid.UUID],
+    timeout: float
+) -> None:
+    import papermerge_cli.format.imports as format_imports
+    from papermerge_cli.lib.ocr import wait_for_ocr
+
+    get_console().print(
+        f"Waiting for OCR of {len(documents)} document(s)..."
+    )
+    stats = wait_for_ocr(
+        host=ctx.obj['HOST'],
+        token=ctx.obj['TOKEN'],
+        documents=documents,
+        timeout=timeout
+    )
+    for document_id in stats.failed:
+        typer.echo(f"FAILED  {document_id}")
+    for document_id in stats.pending:
+        typer.echo(f"PENDING {document_id}")
+    get_console().print(
+        format_imports.ocr_summary(stats),
+        style="red" if stats.failed or stats.timed_out else None
+    )
+    if stats.failed or stats.timed_out:
+        raise typer.Exit(code=1)
+
+
+@app.command(name="watch")
+def watch_command(
+    ctx: typer.Context,
+    folder: WatchFolderPath,
+    delete: DeleteAfterImport = False,
+    skip_ocr: SkipOCR = False,
+    target_id: TargetNodeID | None = None,
+    workers: Workers = 4,
+    settle: Settle = 0.5
+):
+    """Upload files as they are dropped into local folder (hot folder)
+
+    Runs until interrupted. Files already in the folder are uploaded
+    first. A file is uploaded once it is completely written; files
+    dropped together are uploaded together. Without --delete uploaded
+    files are remembered and not uploaded again on restart.
+    """
+    import signal
+
+    import papermerge_cli.format.watch as format_watch
+    from papermerge_cli.lib.watch import watch_folder
+
+    ensure_pool_size(ctx, workers)
+
+    def on_start(watcher):
+        def stop(signum, frame):
+            # uploads in progress are completed; second Ctrl+C
+            # interrupts them
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            watcher.stop()
+
+        # systemd stops services with SIGTERM
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        get_console().print(f"Watching {folder}. Press Ctrl+C to stop.")
+
+    try:
+        stats = watch_folder(
+            host=ctx.obj['HOST'],
+            token=ctx.obj['TOKEN'],
+            watch_dir=folder,
+            parent_id=target_id,
+            workers=workers,
+            delete=delete,
+            skip_ocr=skip_ocr,
+            settle=settle,
+            on_start=on_start,
+            on_result=lambda result: typer.echo(
+                format_watch.watch_result(result)
+            )
+        )
+    except Exception as ex:
+        get_console().print(ex, style="red")
+        raise typer.Exit(code=1)
+
+    get_console().print(format_watch.watch_summary(stats))
 
 
 @app.command(name="ls")
@@ -174,13 +608,54 @@ def list_nodes_command(
     inbox: InboxFlag = False,
     page_number: PageNumber = 1,
     page_size: PageSize = 15,
-    order_by: OrderBy = '-title'
+    order_by: OrderBy = '-title',
+    all_pages: AllPagesFlag = False,
+    output: Output = OutputFormatEnum.table,
+    live: Live = False
 ):
     """Lists documents and folders from your papermerge account
 
     If in case no specific node is requested - will list content
-    of the user's home folder
+    of the user's home folder. If local index exists (see `index sync`)
+    nodes are listed from it, unless --live is given.
     """
+    import papermerge_cli.format.nodes as format_nodes
+    import papermerge_cli.format.records as format_records
+    from papermerge_cli import tracing
+    from papermerge_cli.lib.index import open_index
+    from papermerge_cli.lib.nodes import list_nodes
+    from papermerge_cli.schema import Node, Paginator
+
+    index = None if live else open_index(ctx.obj['HOST'], ctx.obj['TOKEN'])
+    if index is not None:
+        try:
+            listed = list_indexed_nodes(
+                index,
+                parent_id=parent_id,
+                inbox=inbox,
+                page_number=page_number,
+                page_size=page_size,
+                order_by=order_by,
+                all_pages=all_pages,
+                output=output
+            )
+        finally:
+            index.close()
+        if listed:
+            return
+        # folder is not in the index, list it from REST API
+
+    if all_pages:
+        list_all_nodes(
+            ctx,
+            parent_id=parent_id,
+            inbox=inbox,
+            page_size=page_size,
+            order_by=order_by,
+            output=output
+        )
+        return
+
     try:
         data: Paginator[Node] = list_nodes(
             host=ctx.obj['HOST'],
@@ -192,56 +667,512 @@ def list_nodes_command(
             order_by=order_by
         )
     except Exception as ex:
-        console.print(ex, style="red")
+        get_console().print(ex, style="red")
+        return
+
+    if output != OutputFormatEnum.table:
+        write_records(
+            output,
+            map(format_records.node_record, data.items),
+            fields=format_records.NODE_FIELDS
+        )
         return
 
-    output: Table = format_nodes.list_nodes(data)
-    if len(output.rows):
-        console.print(output)
+    with tracing.span('render table', 'format', rows=len(data.items)):
+        table = format_nodes.list_nodes(data)
+        if len(table.rows):
+            get_console().print(table)
+        else:
+            get_console().print("Empty folder")
+
+
+def list_indexed_nodes(
+    index,
+    parent_id: uuid.UUID | None,
+    inbox: bool,
+    page_number: int,
+    page_size: int,
+    order_by: str,
+    all_pages: bool,
+    output: OutputFormatEnum
+) -> bool:
+    """Same as `ls`, but nodes are taken from the local index
+
+    Returns False, without any output, if children of the folder are
+    not in the index.
+    """
+    import papermerge_cli.format.index as format_index
+    import papermerge_cli.format.nodes as format_nodes
+    import papermerge_cli.format.records as format_records
+    from papermerge_cli import tracing
+
+    if parent_id is not None:
+        folder_id = str(parent_id)
+    elif inbox:
+        folder_id = index.inbox_folder_id
     else:
-        console.print("Empty folder")
+        folder_id = index.home_folder_id
+
+    if not index.children_indexed(folder_id):
+        return False
+
+    try:
+        if all_pages:
+            nodes = index.children(folder_id, order_by=order_by)
+        else:
+            data = index.page(
+                folder_id,
+                page_number=page_number,
+                page_size=page_size,
+                order_by=order_by
+            )
+            nodes = data.items
+    except ValueError as ex:
+        get_console().print(ex, style="red")
+        return True
+
+    if output != OutputFormatEnum.table:
+        synced_at = index.synced_at
+        write_records(
+            output,
+            (
+                format_records.indexed_node_record(node, synced_at)
+                for node in nodes
+            ),
+            fields=format_records.INDEXED_NODE_FIELDS
+        )
+        return True
+
+    if not nodes:
+        get_console().print("Empty folder")
+    elif all_pages:
+        for node in nodes:
+            typer.echo(format_records.node_line(node))
+    else:
+        with tracing.span('render table', 'format', rows=len(nodes)):
+            table = format_nodes.list_nodes(data)
+            table.caption = \
+                f"Local index: {format_index.index_status(index)}"
+            get_console().print(table)
+
+    return True
+
+
+def list_all_nodes(
+    ctx: typer.Context,
+    parent_id: uuid.UUID | None,
+    inbox: bool,
+    page_size: int,
+    order_by: str,
+    output: OutputFormatEnum
+):
+    """Streams all nodes of the folder, one line/record per node"""
+    import papermerge_cli.format.records as format_records
+    from papermerge_cli.lib.nodes import iter_nodes, resolve_folder_id
+
+    count = 0
+    try:
+        node_id = resolve_folder_id(
+            host=ctx.obj['HOST'],
+            token=ctx.obj['TOKEN'],
+            inbox=inbox,
+            parent_id=parent_id
+        )
+        nodes = iter_nodes(
+            host=ctx.obj['HOST'],
+            token=ctx.obj['TOKEN'],
+            node_id=node_id,
+            page_size=page_size,
+            order_by=order_by
+        )
+        if output != OutputFormatEnum.table:
+            write_records(
+                output,
+                map(format_records.node_record, nodes),
+                fields=format_records.NODE_FIELDS
+            )
+            return
+
+        for node in nodes:
+            typer.echo(format_records.node_line(node))
+            count += 1
+    except Exception as ex:
+        get_console().print(ex, style="red")
+        return
+
+    if count == 0:
+        get_console().print("Empty folder")
+
+
+def collect_node_ids(
+    node_id: list[uuid.UUID] | None,
+    node_ids_from: typer.FileText | None
+) -> list[uuid.UUID]:
+    """Returns node UUIDs given with --node-id and --node-ids-from"""
+    from papermerge_cli.lib.nodes import read_node_ids
+
+    node_ids = list(node_id or [])
+    if node_ids_from is not None:
+        try:
+            node_ids.extend(read_node_ids(node_ids_from))
+        except ValueError as ex:
+            get_console().print(f"Invalid node UUID: {ex}", style="red")
+            raise typer.Exit(code=1)
+
+    if not node_ids:
+        get_console().print("No node UUID provided", style="red")
+        raise typer.Exit(code=1)
+
+    return node_ids
+
+
+def write_records(
+    output: OutputFormatEnum,
+    records: Iterable[dict],
+    fields: list[str]
+) -> None:
+    """Writes records to stdout, one by one, in given format"""
+    from papermerge_cli import tracing
+    from papermerge_cli.format.stream import make_writer
+
+    with tracing.span('write records', 'format', output=output.value), \
+            make_writer(output, sys.stdout, fields=fields) as writer:
+        for record in records:
+            writer.write(record)
+
+
+@app.command(name="tree")
+def tree_command(
+    ctx: typer.Context,
+    parent_id: ParentFolderID | None = None,
+    inbox: InboxFlag = False,
+    max_depth: MaxDepth | None = None,
+    workers: Workers = 8,
+    page_size: PageSize = 1000,
+    output: Output = OutputFormatEnum.table
+):
+    """Lists recursively all documents and folders of the folder
+
+    Each node is printed, with its full path, as soon as it is received.
+    If in case no specific node is requested - will list the tree of
+    the user's home folder
+    """
+    import papermerge_cli.format.records as format_records
+    from papermerge_cli.lib.nodes import resolve_folder_id
+    from papermerge_cli.lib.tree import walk_tree
+
+    ensure_pool_size(ctx, workers)
+
+    try:
+        node_id = resolve_folder_id(
+            host=ctx.obj['HOST'],
+            token=ctx.obj['TOKEN'],
+            inbox=inbox,
+            parent_id=parent_id
+        )
+        entries = walk_tree(
+            host=ctx.obj['HOST'],
+            token=ctx.obj['TOKEN'],
+            folder_id=node_id,
+            workers=workers,
+            max_depth=max_depth,
+            page_size=page_size
+        )
+        if output != OutputFormatEnum.table:
+            write_records(
+                output,
+                map(format_records.tree_record, entries),
+                fields=format_records.TREE_FIELDS
+            )
+            return
+
+        for entry in entries:
+            typer.echo(format_records.tree_line(entry))
+    except Exception as ex:
+        get_console().print(ex, style="red")
+
+
+@app.command(name="find")
+def find_command(
+    ctx: typer.Context,
+    title: TitleFilter = None,
+    tags: TagsFilter = None,
+    tags_op: TagsOp = TagsOpEnum.all,
+    node_type: NodeTypeFilter = None,
+    live: Live = False,
+    workers: Workers = 8,
+    output: Output = OutputFormatEnum.table
+):
+    """Finds documents and folders by title and/or tags
+
+    Nodes are searched for in the local index (see `index sync`). When
+    there is no index, or with --live, whole home and inbox folder
+    trees are walked on server instead.
+    """
+    import papermerge_cli.format.records as format_records
+    from papermerge_cli.lib.index import find_nodes_live, open_index
+
+    criteria = {
+        'title': title,
+        'tags': [tag.strip() for tag in (tags or '').split(',')
+                 if tag.strip()],
+        'tags_op': tags_op.value,
+        'ctype': node_type.value if node_type else None,
+    }
+    index = None if live else open_index(ctx.obj['HOST'], ctx.obj['TOKEN'])
+
+    try:
+        if index is not None:
+            entries = index.find(**criteria)
+        else:
+            ensure_pool_size(ctx, workers)
+            entries = find_nodes_live(
+                host=ctx.obj['HOST'],
+                token=ctx.obj['TOKEN'],
+                workers=workers,
+                **criteria
+            )
+        if output != OutputFormatEnum.table:
+            write_records(
+                output,
+                map(format_records.tree_record, entries),
+                fields=format_records.TREE_FIELDS
+            )
+            return
+
+        for entry in entries:
+            typer.echo(format_records.tree_line(entry))
+    except Exception as ex:
+        get_console().print(ex, style="red")
+    finally:
+        if index is not None:
+            index.close()
+
+
+@index_app.command(name="sync")
+def index_sync_command(
+    ctx: typer.Context,
+    full: FullSync = False,
+    workers: Workers = 8
+):
+    """Creates or updates local index of home and inbox folders
+
+    Only folders changed since the last sync are listed again; their
+    unchanged subfolders are skipped. Use --full to list every folder.
+    """
+    import papermerge_cli.format.index as format_index
+    from papermerge_cli.lib.index import Index, account_index_path, sync_index
+
+    ensure_pool_size(ctx, workers)
+    try:
+        index = Index(account_index_path(ctx.obj['HOST'], ctx.obj['TOKEN']))
+    except Exception as ex:
+        get_console().print(ex, style="red")
+        raise typer.Exit(code=1)
+
+    try:
+        stats = sync_index(
+            host=ctx.obj['HOST'],
+            token=ctx.obj['TOKEN'],
+            index=index,
+            workers=workers,
+            full=full
+        )
+    except Exception as ex:
+        get_console().print(ex, style="red")
+        raise typer.Exit(code=1)
+    finally:
+        index.close()
+
+    get_console().print(format_index.sync_summary(stats))
+
+
+@index_app.command(name="status")
+def index_status_command(ctx: typer.Context):
+    """Shows size and age of local index"""
+    import papermerge_cli.format.index as format_index
+    from papermerge_cli.lib.index import open_index
+
+    index = open_index(ctx.obj['HOST'], ctx.obj['TOKEN'])
+    if index is None:
+        get_console().print("No local index. Run `index sync` to create it")
+        return
+
+    get_console().print(format_index.index_status(index))
+    get_console().print(index.path)
+    index.close()
+
+
+@index_app.command(name="drop")
+def index_drop_command(ctx: typer.Context):
+    """Deletes local index; ls and find query REST API again"""
+    from papermerge_cli.lib.db import delete_database
+    from papermerge_cli.lib.index import account_index_path
+
+    try:
+        path = account_index_path(ctx.obj['HOST'], ctx.obj['TOKEN'])
+    except Exception as ex:
+        get_console().print(ex, style="red")
+        raise typer.Exit(code=1)
+
+    delete_database(path)
 
 
 @app.command(name="me")
 def current_user_command(ctx: typer.Context):
     """Show details of current user"""
+    import papermerge_cli.format.users as format_users
+    from papermerge_cli.lib.users import me as perform_me
+    from papermerge_cli.schema import User
+
     try:
         user: User = perform_me(
             host=ctx.obj['HOST'],
             token=ctx.obj['TOKEN'],
         )
         output = format_users.current_user(user)
-        console.print(output)
+        get_console().print(output)
     except Exception as ex:
-        console.print(ex)
+        get_console().print(ex)
 
 
 @app.command(name="node")
 def node_command(
     ctx: typer.Context,
-    node_id: NodeID,
     action: NodeAction,
-    tags: List[str]
+    tags: List[str],
+    node_id: NodeIDs | None = None,
+    node_ids_from: NodeIDsFile | None = None,
+    workers: Workers = 8
 ):
-    """Perform actions on specific node"""
-    perform_node_command(
+    """Perform actions on specific nodes
+
+    Nodes are specified with (one or multiple) --node-id options and/or
+    with --node-ids-from file. Action is performed on all of them
+    concurrently and result of each one is printed.
+    """
+    import papermerge_cli.format.nodes as format_nodes
+    from papermerge_cli.lib.nodes import perform_bulk_node_command
+
+    node_ids = collect_node_ids(node_id, node_ids_from)
+
+    ensure_pool_size(ctx, workers)
+    failed = 0
+    for result in perform_bulk_node_command(
         host=ctx.obj['HOST'],
         token=ctx.obj['TOKEN'],
-        node_id=node_id,
+        node_ids=node_ids,
         action=action,
-        tags=tags
+        tags=tags,
+        workers=workers
+    ):
+        typer.echo(format_nodes.node_command_result(result))
+        if not result.ok:
+            failed += 1
+
+    get_console().print(
+        f"{len(node_ids) - failed} succeeded, {failed} failed",
+        style="red" if failed else None
     )
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command(name="download")
+def download_command(
+    ctx: typer.Context,
+    node_id: NodeIDs | None = None,
+    node_ids_from: NodeIDsFile | None = None,
+    target_dir: TargetDir = Path('.'),
+    workers: Workers = 4
+):
+    """Download documents (their latest version) to local directory
+
+    Documents are specified with (one or multiple) --node-id options
+    and/or with --node-ids-from file. They are downloaded concurrently
+    and streamed to disk; interrupted downloads are resumed when the
+    same command runs again.
+    """
+    import papermerge_cli.format.downloads as format_downloads
+    from papermerge_cli.lib.download import (DownloadStats,
+                                             perform_bulk_download)
+
+    node_ids = collect_node_ids(node_id, node_ids_from)
+
+    # documents are fetched and downloaded by `workers` threads each
+    ensure_pool_size(ctx, workers * 2)
+    stats = DownloadStats()
+    for result in perform_bulk_download(
+        host=ctx.obj['HOST'],
+        token=ctx.obj['TOKEN'],
+        node_ids=node_ids,
+        target_dir=target_dir,
+        workers=workers
+    ):
+        typer.echo(format_downloads.download_result(result))
+        stats.add(result)
+
+    get_console().print(
+        format_downloads.download_summary(stats),
+        style="red" if stats.failed else None
+    )
+    if stats.failed:
+        raise typer.Exit(code=1)
+
+
+@app.command(name="pull")
+def pull_command(
+    ctx: typer.Context,
+    folder_id: FolderID,
+    target_dir: TargetDir = Path('.'),
+    delete: DeleteRemoved = False,
+    workers: Workers = 8
+):
+    """Mirror folder (recursively) into local directory
+
+    Local directory tree follows the folder tree. Pulling again into
+    the same directory transfers only documents changed since the last
+    pull; documents moved or renamed on server are moved locally.
+    """
+    import papermerge_cli.format.downloads as format_downloads
+    from papermerge_cli.lib.pull import pull_folder
+
+    ensure_pool_size(ctx, workers)
+
+    try:
+        stats = pull_folder(
+            host=ctx.obj['HOST'],
+            token=ctx.obj['TOKEN'],
+            folder_id=folder_id,
+            target_dir=target_dir,
+            workers=workers,
+            delete=delete
+        )
+    except Exception as ex:
+        get_console().print(ex, style="red")
+        raise typer.Exit(code=1)
+
+    for path, error in stats.errors:
+        typer.echo(f"FAILED  {path} {error}")
+    get_console().print(
+        format_downloads.pull_summary(stats),
+        style="red" if stats.failed else None
+    )
+    if stats.failed:
+        raise typer.Exit(code=1)
 
 
 @app.command(name="server-version")
 def server_version_command(ctx: typer.Context):
     """Get REST API version used on server side"""
+    from papermerge_cli.lib.version import perform_server_version_command
+
     output = perform_server_version_command(
         host=ctx.obj['HOST'],
         token=ctx.obj['TOKEN'],
     )
 
-    console.print(output)
+    get_console().print(output)
 
 
 """
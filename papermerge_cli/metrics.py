@@ -0,0 +1,310 @@
+"""Metrics of REST API calls
+
+When enabled (`enable`), every API call made by `ApiClient` and
+`AsyncApiClient` is recorded: method, endpoint template, status,
+latency, bytes sent and received and number of retries. Metrics are
+aggregated per method and endpoint; latencies are kept as compact
+arrays of floats, so that percentiles are exact. When not enabled,
+recording costs a single check.
+"""
+import bisect
+import json
+import math
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlparse
+
+# upper bounds (seconds) of latency histogram buckets; same as default
+# buckets of Prometheus client libraries
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+PROMETHEUS_PREFIX = 'papermerge_cli'
+
+# path segments which identify a resource: UUIDs and numbers
+ID_SEGMENT = re.compile(
+    r'^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+)$',
+    re.IGNORECASE
+)
+
+
+def endpoint_template(url: str) -> str:
+    """Returns path of the URL with resource ids replaced by `{id}`
+
+    For example `/api/nodes/<uuid>?page_number=2` -> `/api/nodes/{id}`
+    """
+    segments = [
+        '{id}' if ID_SEGMENT.match(segment) else segment
+        for segment in urlparse(url).path.split('/')
+    ]
+
+    return '/'.join(segments)
+
+
+@dataclass
+class EndpointMetrics:
+    method: str
+    endpoint: str
+    latencies: array = field(default_factory=lambda: array('d'))
+    # status code (None for connection errors) -> number of calls
+    statuses: Counter = field(default_factory=Counter)
+    retries: int = 0
+    sent: int = 0
+    received: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def errors(self) -> int:
+        return sum(
+            count for status, count in self.statuses.items()
+            if status is None or status >= 400
+        )
+
+    def percentile(self, percent: float) -> float:
+        """Returns latency percentile (nearest rank), in seconds"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = math.ceil(percent / 100 * len(ordered))
+
+        return ordered[max(rank, 1) - 1]
+
+    def histogram(self) -> list[tuple[float, int]]:
+        """Returns (upper bound, count) of each latency bucket
+
+        Counts are not cumulative; last bucket (`inf`) holds latencies
+        above the largest bound.
+        """
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for latency in self.latencies:
+            counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+        return list(zip((*LATENCY_BUCKETS, math.inf), counts))
+
+
+class Metrics:
+    """Metrics of API calls, aggregated per method and endpoint"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.started_at_wall = time.time()
+        self._lock = threading.Lock()
+        self._endpoints: dict[tuple[str, str], EndpointMetrics] = {}
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: int | None,
+        seconds: float,
+        sent: int = 0,
+        received: int = 0,
+        retries: int = 0
+    ) -> None:
+        key = (method.upper(), endpoint_template(url))
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = EndpointMetrics(*key)
+            endpoint.latencies.append(seconds)
+            endpoint.statuses[status] += 1
+            endpoint.retries += retries
+            endpoint.sent += sent
+            endpoint.received += received
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def endpoints(self) -> list[EndpointMetrics]:
+        """Returns metrics of each endpoint, most called first"""
+        with self._lock:
+            endpoints = list(self._endpoints.values())
+
+        return sorted(endpoints, key=lambda item: (-item.count, item.endpoint))
+
+    def total(self) -> EndpointMetrics:
+        """Returns metrics of all calls together"""
+        total = EndpointMetrics(method='*', endpoint='*')
+        for endpoint in self.endpoints():
+            total.latencies.extend(endpoint.latencies)
+            total.statuses.update(endpoint.statuses)
+            total.retries += endpoint.retries
+            total.sent += endpoint.sent
+            total.received += endpoint.received
+
+        return total
+
+
+def to_json(metrics: Metrics) -> dict:
+    def endpoint_record(endpoint: EndpointMetrics) -> dict:
+        return {
+            'method': endpoint.method,
+            'endpoint': endpoint.endpoint,
+            'requests': endpoint.count,
+            'errors': endpoint.errors,
+            'retries': endpoint.retries,
+            'statuses': {
+                str(status or 'error'): count
+                for status, count in endpoint.statuses.items()
+            },
+            'sent_bytes': endpoint.sent,
+            'received_bytes': endpoint.received,
+            'latency_seconds': {
+                'p50': endpoint.percentile(50),
+                'p90': endpoint.percentile(90),
+                'p99': endpoint.percentile(99),
+                'max': max(endpoint.latencies, default=0.0),
+            },
+            'histogram': [
+                {'le': bound if bound != math.inf else '+Inf', 'count': count}
+                for bound, count in endpoint.histogram()
+            ],
+        }
+
+    return {
+        'started_at': metrics.started_at_wall,
+        'elapsed_seconds': metrics.elapsed,
+        'total': endpoint_record(metrics.total()),
+        'endpoints': [
+            endpoint_record(endpoint) for endpoint in metrics.endpoints()
+        ],
+    }
+
+
+def to_prometheus(metrics: Metrics) -> str:
+    """Returns metrics in Prometheus text exposition format"""
+    name = PROMETHEUS_PREFIX
+    lines = [
+        f'# HELP {name}_request_duration_seconds REST API call latency',
+        f'# TYPE {name}_request_duration_seconds histogram',
+    ]
+    endpoints = metrics.endpoints()
+    for endpoint in endpoints:
+        labels = f'method="{endpoint.method}",endpoint="{endpoint.endpoint}"'
+        cumulative = 0
+        for bound, count in endpoint.histogram():
+            cumulative += count
+            le = '+Inf' if bound == math.inf else repr(bound)
+            lines.append(
+                f'{name}_request_duration_seconds_bucket'
+                f'{{{labels},le="{le}"}} {cumulative}'
+            )
+        lines.append(
+            f'{name}_request_duration_seconds_sum{{{labels}}}'
+            f' {sum(endpoint.latencies)}'
+        )
+        lines.append(
+            f'{name}_request_duration_seconds_count{{{labels}}}'
+            f' {endpoint.count}'
+        )
+
+    lines += [
+        f'# HELP {name}_requests_total REST API calls by response status',
+        f'# TYPE {name}_requests_total counter',
+    ]
+    for endpoint in endpoints:
+        labels = f'method="{endpoint.method}",endpoint="{endpoint.endpoint}"'
+        for status, count in sorted(
+            endpoint.statuses.items(),
+            key=lambda item: item[0] or 0
+        ):
+            lines.append(
+                f'{name}_requests_total'
+                f'{{{labels},status="{status or "error"}"}} {count}'
+            )
+
+    counters = [
+        ('request_retries_total', 'Retried attempts', 'retries'),
+        ('request_sent_bytes_total', 'Bytes sent', 'sent'),
+        ('request_received_bytes_total', 'Bytes received', 'received'),
+    ]
+    for metric, help_text, attribute in counters:
+        lines.append(f'# HELP {name}_{metric} {help_text}')
+        lines.append(f'# TYPE {name}_{metric} counter')
+        for endpoint in endpoints:
+            labels = \
+                f'method="{endpoint.method}",endpoint="{endpoint.endpoint}"'
+            lines.append(
+                f'{name}_{metric}{{{labels}}} {getattr(endpoint, attribute)}'
+            )
+
+    lines += [
+        f'# HELP {name}_run_duration_seconds Duration of the invocation',
+        f'# TYPE {name}_run_duration_seconds gauge',
+        f'{name}_run_duration_seconds {metrics.elapsed}',
+        f'# HELP {name}_run_timestamp_seconds Start time of the invocation',
+        f'# TYPE {name}_run_timestamp_seconds gauge',
+        f'{name}_run_timestamp_seconds {metrics.started_at_wall}',
+    ]
+
+    return '\n'.join(lines) + '\n'
+
+
+def write(metrics: Metrics, path: Path) -> None:
+    """Writes metrics to `path`: Prometheus text format for `.prom`
+    files (e.g. for node exporter's textfile collector), JSON otherwise
+
+    File is replaced atomically, collector never reads a partial file.
+    """
+    if path.suffix == '.prom':
+        content = to_prometheus(metrics)
+    else:
+        content = json.dumps(to_json(metrics), indent=2)
+
+    temp_path = path.with_name(f'.{path.name}.tmp')
+    temp_path.write_text(content)
+    temp_path.replace(path)
+
+
+_metrics: Metrics | None = None
+
+
+def enable() -> Metrics:
+    """Starts recording of API calls; returns the recorded metrics"""
+    global _metrics
+    _metrics = Metrics()
+
+    return _metrics
+
+
+def disable() -> None:
+    global _metrics
+    _metrics = None
+
+
+def get_metrics() -> Metrics | None:
+    return _metrics
+
+
+def record(
+    method: str,
+    url: str,
+    status: int | None,
+    seconds: float,
+    sent: int = 0,
+    received: int = 0,
+    retries: int = 0
+) -> None:
+    """Records API call, if metrics are enabled"""
+    metrics = _metrics
+    if metrics is None:
+        return
+
+    metrics.record(
+        method,
+        url,
+        status=status,
+        seconds=seconds,
+        sent=sent,
+        received=received,
+        retries=retries
+    )
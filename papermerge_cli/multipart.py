@@ -0,0 +1,127 @@
+import os
+import time
+import uuid
+from pathlib import Path
+
+from urllib3.fields import format_multipart_header_param
+
+from papermerge_cli import tracing
+
+# Size of the chunks in which file content is read from disk
+CHUNK_SIZE = 64 * 1024
+
+
+class MultipartFile:
+    """File-like `multipart/form-data` body streamed from disk
+
+    The body is made of a small in-memory preamble (part headers), the
+    file content read from disk in `CHUNK_SIZE` chunks and an in-memory
+    epilogue (closing boundary). Its total length is known in advance,
+    so that request is sent with `Content-Length` header (instead of
+    chunked transfer encoding) while memory usage stays bounded
+    regardless of file size.
+
+    Reading of the file content is traced as one `read` span per pass
+    over the file (from its first to last chunk), with number of bytes
+    and total time spent in reads.
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        mime_type: str,
+        field_name: str = 'file',
+        chunk_size: int = CHUNK_SIZE
+    ):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        # quotes and line breaks in names are escaped the same way as
+        # in bodies encoded by requests/urllib3
+        name = format_multipart_header_param('name', field_name)
+        filename = format_multipart_header_param('filename', file_path.name)
+        self._preamble = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; {name}; {filename}\r\n'
+            f'Content-Type: {mime_type}\r\n\r\n'
+        ).encode()
+        self._epilogue = f'\r\n--{self.boundary}--\r\n'.encode()
+        self._file = open(file_path, 'rb')
+        self._file_size = os.fstat(self._file.fileno()).st_size
+        self._parts = [self._preamble, self._file, self._epilogue]
+        self._file_name = file_path.name
+        self._reset_read_stats()
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return len(self._preamble) + self._file_size + len(self._epilogue)
+
+    def __iter__(self):
+        while chunk := self.read(self.chunk_size):
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b''.join(self)
+
+        while self._parts:
+            part = self._parts[0]
+            if isinstance(part, bytes):
+                chunk, rest = part[:size], part[size:]
+                if rest:
+                    self._parts[0] = rest
+                else:
+                    self._parts.pop(0)
+            else:
+                started_at = time.perf_counter()
+                chunk = part.read(size)
+                finished_at = time.perf_counter()
+                if self._read_started_at is None:
+                    self._read_started_at = started_at
+                self._read_seconds += finished_at - started_at
+                self._read_bytes += len(chunk)
+                if len(chunk) < size:
+                    self._parts.pop(0)
+                    self._record_read()
+            if chunk:
+                return chunk
+
+        return b''
+
+    def rewind(self) -> None:
+        """Restarts the body from the beginning e.g. to resend it"""
+        self._record_read()
+        self._file.seek(0)
+        self._parts = [self._preamble, self._file, self._epilogue]
+
+    def close(self) -> None:
+        self._record_read()
+        self._file.close()
+
+    def _reset_read_stats(self) -> None:
+        self._read_started_at: float | None = None
+        self._read_seconds = 0.0
+        self._read_bytes = 0
+
+    def _record_read(self) -> None:
+        if self._read_started_at is None:
+            return
+
+        tracing.record(
+            'read',
+            'io',
+            started_at=self._read_started_at,
+            finished_at=time.perf_counter(),
+            file=self._file_name,
+            size=self._read_bytes,
+            read_ms=round(self._read_seconds * 1000, 3)
+        )
+        self._reset_read_stats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
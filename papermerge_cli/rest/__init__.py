@@ -1,6 +1,9 @@
+from .documents import download as download_file
+from .documents import get_document
 from .documents import upload as upload_document
-from .nodes import (create_folder, get_nodes, node_add_tags, node_assign_tags,
-                    node_remove_tags)
+from .documents import upload_file as upload_document_file
+from .nodes import (create_document, create_folder, get_nodes, node_add_tags,
+                    node_assign_tags, node_remove_tags)
 from .users import get_me
 from .version import get_server_version
 
@@ -11,6 +14,10 @@ __all__ = [
     node_remove_tags,
     node_assign_tags,
     upload_document,
+    upload_document_file,
+    get_document,
+    download_file,
     create_folder,
+    create_document,
     get_server_version
 ]
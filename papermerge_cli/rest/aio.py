@@ -0,0 +1,124 @@
+"""asyncio variants of the REST API calls
+
+Functions have same signatures and return same models as their
+counterparts from `papermerge_cli.rest`, but do not block the event
+loop. All of them share one connection pool per event loop, thus many
+calls can be in flight at once:
+
+    nodes = await asyncio.gather(*[
+        aio.get_nodes(node_id=node_id, host=host, token=token)
+        for node_id in folder_ids
+    ])
+"""
+from pathlib import Path
+from typing import List
+from uuid import UUID
+
+from papermerge_cli.async_api_client import AsyncApiClient
+from papermerge_cli.rest.users import cache_user, cached_user
+from papermerge_cli.schema import (CreateDocument, CreateFolder, Document,
+                                   Folder, Node, Paginator, User)
+
+
+async def get_me(host: str, token: str) -> User:
+    """Returns current user instance"""
+    user = cached_user(host, token)
+    if user is None:
+        api_client = AsyncApiClient[User](token=token, host=host)
+        user = await api_client.get('/api/users/me', response_model=User)
+        cache_user(host, token, user)
+
+    return user
+
+
+async def get_nodes(
+    node_id: str,
+    host: str,
+    token: str,
+    query_params=None
+) -> Paginator[Node]:
+    """Returns children nodes of the parent node specified by `node_id`"""
+    api_client = AsyncApiClient[Paginator[Node]](token=token, host=host)
+
+    return await api_client.get(
+        f'/api/nodes/{node_id}',
+        response_model=Paginator[Node],
+        query_params=query_params
+    )
+
+
+async def node_assign_tags(
+    node_id: UUID,
+    host: str,
+    token: str,
+    tags: List[str]
+):
+    """Assigns list of tags to the node, replacing current ones"""
+    api_client = AsyncApiClient(token=token, host=host)
+    await api_client.post(f'/api/nodes/{node_id}/tags', json=tags)
+
+
+async def node_add_tags(
+    node_id: UUID,
+    host: str,
+    token: str,
+    tags: List[str]
+):
+    """Appends list of tags to the current tags of the node"""
+    api_client = AsyncApiClient(token=token, host=host)
+    await api_client.patch(f'/api/nodes/{node_id}/tags', json=tags)
+
+
+async def node_remove_tags(
+    node_id: UUID,
+    host: str,
+    token: str,
+    tags: List[str]
+):
+    """Remove list of tags from the node"""
+    api_client = AsyncApiClient(token=token, host=host)
+    await api_client.delete(f'/api/nodes/{node_id}/tags', json=tags)
+
+
+async def create_folder(
+    host: str,
+    token: str,
+    title: str,
+    parent_id: UUID
+) -> Folder:
+    api_client = AsyncApiClient[Folder](token=token, host=host)
+    folder_to_create = CreateFolder(title=title, parent_id=parent_id)
+
+    return await api_client.post(
+        '/api/nodes/',
+        response_model=Folder,
+        json=folder_to_create.model_dump(mode='json')
+    )
+
+
+async def upload_document(
+    host: str,
+    token: str,
+    file_path: Path,
+    parent_id: UUID,
+    skip_ocr: bool = False,
+) -> Document:
+    api_client = AsyncApiClient[Document](token=token, host=host)
+
+    doc_to_create = CreateDocument(
+        title=file_path.name,
+        file_name=file_path.name,
+        parent_id=parent_id,
+        ocr=not skip_ocr
+    )
+    response_doc: Document = await api_client.post(
+        '/api/nodes/',
+        response_model=Document,
+        json=doc_to_create.model_dump(mode='json')
+    )
+
+    return await api_client.upload(
+        f'/api/documents/{response_doc.id}/upload',
+        file_path,
+        response_model=Document
+    )
@@ -2,7 +2,8 @@ from pathlib import Path
 from uuid import UUID
 
 from papermerge_cli.api_client import ApiClient
-from papermerge_cli.schema import CreateDocument, Document
+from papermerge_cli.rest.nodes import create_document
+from papermerge_cli.schema import Document
 
 
 def upload(
@@ -12,25 +13,62 @@ def upload(
     parent_id: UUID,
     skip_ocr: bool = False,
 ) -> Document:
-    api_client = ApiClient[Document](token=token, host=host)
-
-    doc_to_create = CreateDocument(
+    """Creates document node and uploads file content into it"""
+    document = create_document(
+        host=host,
+        token=token,
         title=file_path.name,
-        file_name=file_path.name,
         parent_id=parent_id,
-        ocr=not skip_ocr
+        skip_ocr=skip_ocr
     )
 
-    response_doc: Document = api_client.post(
-        '/api/nodes/',
-        response_model=Document,
-        json=doc_to_create.model_dump(mode='json')
+    return upload_file(
+        host=host,
+        token=token,
+        document_id=document.id,
+        file_path=file_path
     )
 
-    result_doc: Document = api_client.upload(
-        f'/api/documents/{response_doc.id}/upload',
+
+def upload_file(
+    host: str,
+    token: str,
+    document_id: UUID,
+    file_path: Path
+) -> Document:
+    """Uploads file content into already created document node"""
+    api_client = ApiClient[Document](token=token, host=host)
+
+    return api_client.upload(
+        f'/api/documents/{document_id}/upload',
         file_path,
         response_model=Document
     )
 
-    return result_doc
+
+def get_document(
+    host: str,
+    token: str,
+    document_id: UUID
+) -> Document:
+    api_client = ApiClient[Document](token=token, host=host)
+
+    return api_client.get(
+        f'/api/documents/{document_id}',
+        response_model=Document
+    )
+
+
+def download(
+    host: str,
+    token: str,
+    url: str,
+    file_path: Path
+) -> int:
+    """Streams file at `url` into `file_path`, resuming partial content
+
+    Returns number of received bytes.
+    """
+    api_client = ApiClient(token=token, host=host)
+
+    return api_client.download(url, file_path)
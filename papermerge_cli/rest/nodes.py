@@ -2,7 +2,8 @@ from typing import List
 from uuid import UUID
 
 from papermerge_cli.api_client import ApiClient
-from papermerge_cli.schema import CreateFolder, Folder, Node, Paginator
+from papermerge_cli.schema import (CreateDocument, CreateFolder, Document,
+                                   Folder, Node, Paginator)
 from papermerge_cli.utils import host_required, token_required
 
 
@@ -97,5 +98,30 @@ def create_folder(
     return response_folder
 
 
-def create_document():
-    pass
+def create_document(
+    host: str,
+    token: str,
+    title: str,
+    parent_id: UUID,
+    skip_ocr: bool = False
+) -> Document:
+    """Creates document node, without content
+
+    Content is uploaded separately, see `rest.documents.upload_file`.
+    """
+    api_client = ApiClient[Document](token=token, host=host)
+
+    doc_to_create = CreateDocument(
+        title=title,
+        file_name=title,
+        parent_id=parent_id,
+        ocr=not skip_ocr
+    )
+
+    response_doc: Document = api_client.post(
+        '/api/nodes/',
+        response_model=Document,
+        json=doc_to_create.model_dump(mode='json')
+    )
+
+    return response_doc
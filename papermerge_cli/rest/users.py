@@ -1,6 +1,78 @@
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
 from papermerge_cli.api_client import ApiClient
 from papermerge_cli.schema.users import User
-from papermerge_cli.utils import host_required, token_required
+from papermerge_cli.utils import cache_dir, host_required, token_required
+
+# current user is fetched only once per CLI invocation
+_users: dict[tuple[str, str], User] = {}
+_users_lock = threading.Lock()
+# for how many seconds current user is cached on disk (between CLI
+# invocations); 0 disables on-disk cache
+_disk_cache_ttl = 0
+
+
+def set_user_cache_ttl(ttl: int) -> None:
+    global _disk_cache_ttl
+    _disk_cache_ttl = ttl
+
+
+def clear_user_cache() -> None:
+    """Forgets current users cached in memory"""
+    with _users_lock:
+        _users.clear()
+
+
+def user_cache_path(host: str, token: str) -> Path:
+    key = hashlib.sha256(f"{host}|{token}".encode()).hexdigest()[:32]
+    return cache_dir() / 'users' / f'{key}.json'
+
+
+def _read_disk_cache(host: str, token: str) -> User | None:
+    path = user_cache_path(host, token)
+    try:
+        if time.time() - path.stat().st_mtime > _disk_cache_ttl:
+            return None
+        return User.model_validate_json(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_disk_cache(host: str, token: str, user: User) -> None:
+    path = user_cache_path(host, token)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # user's details are readable only by the owner
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(user.model_dump_json())
+
+
+def cached_user(host: str, token: str) -> User | None:
+    """Returns current user from cache (memory or disk) if present"""
+    with _users_lock:
+        if (host, token) in _users:
+            return _users[(host, token)]
+
+    if _disk_cache_ttl > 0:
+        user = _read_disk_cache(host, token)
+        if user is not None:
+            with _users_lock:
+                _users[(host, token)] = user
+        return user
+
+    return None
+
+
+def cache_user(host: str, token: str, user: User) -> None:
+    with _users_lock:
+        _users[(host, token)] = user
+
+    if _disk_cache_ttl > 0:
+        _write_disk_cache(host, token, user)
 
 
 @host_required
@@ -9,8 +81,16 @@ def get_me(
     host: str,
     token: str
 ) -> User:
-    """Returns current user instance"""
-    api_client = ApiClient[User](token=token, host=host)
-    user = api_client.get('/api/users/me', response_model=User)
+    """Returns current user instance
+
+    User is cached in memory for the rest of CLI invocation and, if
+    enabled with `set_user_cache_ttl`, on disk for given number of
+    seconds.
+    """
+    user = cached_user(host, token)
+    if user is None:
+        api_client = ApiClient[User](token=token, host=host)
+        user = api_client.get('/api/users/me', response_model=User)
+        cache_user(host, token, user)
 
     return user
@@ -0,0 +1,233 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import backoff
+
+from papermerge_cli.constants import DEFAULT_MAX_RETRIES
+from papermerge_cli.exceptions import ServerUnavailable
+
+# Methods which can be safely sent again i.e. they have same effect
+# no matter how many times they reach the server
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Responses which tell that server did not process the request, thus
+# request is retried regardless of its method
+RETRY_STATUSES = frozenset({429, 502, 503})
+# Additional responses for which idempotent requests are retried
+RETRY_IDEMPOTENT_STATUSES = frozenset({500, 504})
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Returns number of seconds from `Retry-After` header value
+
+    Header value is either number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    delta = retry_at - datetime.now(timezone.utc)
+
+    return max(0.0, delta.total_seconds())
+
+
+class CircuitBreaker:
+    """Stops sending requests to a server which is clearly down
+
+    After `failure_threshold` consecutive failed calls (connection
+    errors, timeouts, 5xx responses; each call counts once, however
+    many attempts failed) circuit "opens" and for `reset_timeout`
+    seconds new calls fail immediately with `ServerUnavailable`. Then
+    one trial call is let through: if it succeeds circuit closes again,
+    otherwise it stays open for another `reset_timeout` seconds.
+
+    Calls which were already in progress are not failed: their retries
+    wait until circuit lets requests through (see `RetryState`).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 10,
+        reset_timeout: float = 30.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_progress = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_request(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed >= self.reset_timeout and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return
+
+        raise ServerUnavailable(
+            f"{self._failures} calls to server failed in a row;"
+            f" not sending requests for {self.reset_timeout}s"
+        )
+
+    def remaining(self) -> float:
+        """Returns seconds until requests are let through again"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+
+            elapsed = time.monotonic() - self._opened_at
+
+        return max(0.0, self.reset_timeout - elapsed)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_progress or (
+                self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._trial_in_progress = False
+
+
+@dataclass
+class RetryPolicy:
+    """When and after how long failed requests are retried
+
+    Delays grow exponentially (`backoff_factor * 2 ** retry`, at most
+    `max_backoff` seconds) with full jitter, so that many clients do not
+    retry in lockstep. Delay requested by server with `Retry-After`
+    header is honoured (up to `max_retry_after` seconds).
+    """
+    max_retries: int = DEFAULT_MAX_RETRIES
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    max_retry_after: float = 300.0
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+
+    def begin(self) -> 'RetryState':
+        """Returns retry state of one API call"""
+        return RetryState(self)
+
+
+class RetryState:
+    """Retry bookkeeping of one API call
+
+    Before each attempt call `before_attempt` and wait the number of
+    seconds it returns; after attempt failed with connection
+    error/timeout call `on_error`, otherwise `on_response`. Both return
+    number of seconds to wait before next attempt or None if call
+    should not be retried.
+    """
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.retries = 0
+        self._failure_recorded = False
+        self._waits = backoff.expo(
+            factor=policy.backoff_factor,
+            max_value=policy.max_backoff
+        )
+        # advance past generator's initial yield
+        next(self._waits)
+
+    def before_attempt(self) -> float:
+        """Returns seconds to wait before the attempt
+
+        First attempt of the call fails with `ServerUnavailable` while
+        circuit is open. Retries, instead, wait until circuit lets
+        requests through, so that a short outage does not fail calls
+        which still have retries left.
+        """
+        if self.retries == 0:
+            self.policy.breaker.before_request()
+            return 0.0
+
+        return self.policy.breaker.remaining()
+
+    def on_error(self, method: str, connect_failed: bool) -> float | None:
+        """Decides on retry after connection error or timeout
+
+        `connect_failed` tells that request never reached the server,
+        which makes it safe to retry non-idempotent requests as well.
+        """
+        self._record_failure()
+        if method.upper() not in IDEMPOTENT_METHODS and not connect_failed:
+            return None
+
+        return self._next_delay()
+
+    def on_response(
+        self,
+        method: str,
+        status_code: int,
+        retry_after: str | None = None
+    ) -> float | None:
+        if status_code >= 500:
+            self._record_failure()
+        else:
+            self.policy.breaker.record_success()
+
+        retry = status_code in RETRY_STATUSES or (
+            method.upper() in IDEMPOTENT_METHODS
+            and status_code in RETRY_IDEMPOTENT_STATUSES
+        )
+        if not retry:
+            return None
+
+        return self._next_delay(parse_retry_after(retry_after))
+
+    def _record_failure(self) -> None:
+        # circuit counts failed calls, not failed attempts
+        if not self._failure_recorded:
+            self._failure_recorded = True
+            self.policy.breaker.record_failure()
+
+    def _next_delay(self, retry_after: float | None = None) -> float | None:
+        if self.retries >= self.policy.max_retries:
+            return None
+
+        self.retries += 1
+        delay = backoff.full_jitter(next(self._waits))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.policy.max_retry_after))
+
+        return delay
+
+
+_policy = RetryPolicy()
+
+
+def get_retry_policy() -> RetryPolicy:
+    return _policy
+
+
+def configure(max_retries: int) -> None:
+    """Sets retry policy used by all API clients"""
+    global _policy
+    _policy = RetryPolicy(max_retries=max_retries)
@@ -0,0 +1,25 @@
+import functools
+
+from pydantic import TypeAdapter
+
+from papermerge_cli import tracing
+
+
+@functools.cache
+def type_adapter(model) -> TypeAdapter:
+    """Returns (cached) type adapter of given model/type
+
+    Building validator of a type (e.g. of generic `Paginator[Node]`) is
+    expensive, thus it is done only once per type.
+    """
+    return TypeAdapter(model)
+
+
+def parse_json(model, data: bytes | str):
+    """Validates raw JSON straight into `model` instance
+
+    JSON is parsed and validated in one pass by pydantic-core, without
+    building intermediate python dictionaries.
+    """
+    with tracing.span('validate', 'validation', model=model, size=len(data)):
+        return type_adapter(model).validate_json(data)
@@ -48,12 +48,11 @@ class Node(BaseModel):
     document: DocumentNode | None = None
 
     @field_validator('document', mode='before')
-    def document_validator(cls, value, values):
-        if values.data['ctype'] == NodeType.document:
-            return DocumentNode(
-                ocr_status=value['ocr_status'],
-                ocr=value['ocr']
-            )
+    def document_validator(cls, value, info):
+        # only documents have `document` part; its fields are then
+        # validated by pydantic-core like any other nested model
+        if info.data.get('ctype') == NodeType.document:
+            return value
 
         return None
 
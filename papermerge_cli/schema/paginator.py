@@ -1,4 +1,3 @@
-from collections.abc import Sequence
 from typing import Generic, TypeVar
 
 from pydantic import BaseModel
@@ -10,4 +9,5 @@ class Paginator(BaseModel, Generic[T]):
     page_size: int
     page_number: int
     num_pages: int
-    items: Sequence[T]
+    # list (rather than Sequence) is validated directly by pydantic-core
+    items: list[T]
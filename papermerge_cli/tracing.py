@@ -0,0 +1,280 @@
+"""Trace of CLI execution, in Chrome trace event format
+
+When enabled (`enable`), stages of the CLI record spans: directory
+scan, file reads, REST API calls, validation of responses and output
+formatting. Each span is recorded with the thread it ran in, so that
+trace written by `write` shows what every worker was doing when opened
+in a trace viewer (chrome://tracing, https://ui.perfetto.dev).
+
+When not enabled, `span` returns a shared no-op span; instrumented
+code pays for one check and an empty `with` block.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+PROCESS_NAME = 'papermerge-cli'
+
+
+class Span:
+    """Timed stage of execution; recorded when its `with` block exits
+
+    Spans of one thread nest. Asynchronous spans (e.g. requests of
+    asyncio tasks, which overlap in the same thread) are recorded as
+    async events, which viewers show on their own tracks.
+    """
+    __slots__ = (
+        'tracer', 'name', 'category', 'args', 'asynchronous', 'started_at'
+    )
+
+    def __init__(
+        self,
+        tracer: 'Tracer',
+        name: str,
+        category: str,
+        args: dict,
+        asynchronous: bool = False
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.asynchronous = asynchronous
+        self.started_at = 0.0
+
+    def set(self, **args) -> None:
+        """Adds arguments shown with the span, e.g. response status"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.add(self, finished_at=time.perf_counter())
+
+
+class NoopSpan:
+    """Span used when tracing is not enabled"""
+    __slots__ = ()
+
+    def set(self, **args) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Tracer:
+    """Collects trace events of spans, from any thread"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+        self._events: list[dict] = []
+        # (process id, native thread id) -> thread name
+        self._threads: dict[tuple[int, int], str] = {}
+        # process id -> name, of other processes (e.g. hashing workers)
+        self._processes: dict[int, str] = {}
+        self._async_ids = itertools.count(1)
+
+    def _microseconds(self, timestamp: float) -> float:
+        return (timestamp - self.started_at) * 1_000_000
+
+    def add(self, span: Span, finished_at: float) -> None:
+        tid = threading.get_native_id()
+        event = {
+            'name': span.name,
+            'cat': span.category,
+            'pid': self.pid,
+            'tid': tid,
+            'ts': self._microseconds(span.started_at),
+            'args': span.args,
+        }
+        with self._lock:
+            if (self.pid, tid) not in self._threads:
+                self._threads[self.pid, tid] = \
+                    threading.current_thread().name
+            if span.asynchronous:
+                event_id = next(self._async_ids)
+                self._events.append({**event, 'ph': 'b', 'id': event_id})
+                self._events.append({
+                    **event,
+                    'ph': 'e',
+                    'id': event_id,
+                    'ts': self._microseconds(finished_at),
+                    'args': {},
+                })
+            else:
+                event['ph'] = 'X'
+                event['dur'] = self._microseconds(finished_at) - event['ts']
+                self._events.append(event)
+
+    def add_remote(
+        self,
+        name: str,
+        category: str,
+        started_at: float,
+        finished_at: float,
+        pid: int,
+        process_name: str,
+        args: dict
+    ) -> None:
+        """Records span which ran in another process
+
+        `started_at` and `finished_at` are `time.perf_counter` values of
+        that process; the clock is system-wide, so they are comparable
+        with those of this process. Each process gets its own track.
+        """
+        with self._lock:
+            self._processes[pid] = process_name
+            self._events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'pid': pid,
+                'tid': pid,
+                'ts': self._microseconds(started_at),
+                'dur': (finished_at - started_at) * 1_000_000,
+                'args': args,
+            })
+
+    def events(self) -> list[dict]:
+        """Returns recorded events, preceded by process/thread names"""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+            processes = {self.pid: PROCESS_NAME, **self._processes}
+
+        metadata = [
+            {
+                'name': 'process_name',
+                'ph': 'M',
+                'pid': pid,
+                'args': {'name': name},
+            }
+            for pid, name in processes.items()
+        ]
+        for (pid, tid), name in threads.items():
+            metadata.append({
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': tid,
+                'args': {'name': name},
+            })
+
+        return metadata + events
+
+
+def _json_default(value) -> str:
+    # span arguments may be paths, UUIDs or types (pydantic models)
+    return getattr(value, '__name__', None) or str(value)
+
+
+def write(tracer: Tracer, path: Path) -> None:
+    """Writes trace to `path` as Chrome trace event JSON"""
+    trace = {
+        'traceEvents': tracer.events(),
+        'displayTimeUnit': 'ms',
+    }
+    temp_path = path.with_name(f'.{path.name}.tmp')
+    with open(temp_path, 'w') as f:
+        json.dump(trace, f, default=_json_default)
+    temp_path.replace(path)
+
+
+_tracer: Tracer | None = None
+
+
+def enable() -> Tracer:
+    """Starts recording of spans; returns the tracer recording them"""
+    global _tracer
+    _tracer = Tracer()
+
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def get_tracer() -> Tracer | None:
+    return _tracer
+
+
+def span(
+    name: str,
+    category: str = '',
+    asynchronous: bool = False,
+    **args
+) -> Span | NoopSpan:
+    """Returns span of the stage, to be used as context manager
+
+        with tracing.span('scan', 'import', path=path):
+            ...
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+
+    return Span(tracer, name, category, args, asynchronous=asynchronous)
+
+
+def record(
+    name: str,
+    category: str,
+    started_at: float,
+    finished_at: float,
+    **args
+) -> None:
+    """Records span of the current thread which was timed by caller
+
+    For work done piecemeal (e.g. file read chunk by chunk), which is
+    recorded as one span instead of a span per piece.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return
+
+    span = Span(tracer, name, category, args)
+    span.started_at = started_at
+    tracer.add(span, finished_at=finished_at)
+
+
+def record_remote(
+    name: str,
+    category: str,
+    started_at: float,
+    finished_at: float,
+    pid: int,
+    process_name: str,
+    **args
+) -> None:
+    """Records span which ran in another process, if tracing is enabled"""
+    tracer = _tracer
+    if tracer is None:
+        return
+
+    tracer.add_remote(
+        name,
+        category,
+        started_at=started_at,
+        finished_at=finished_at,
+        pid=pid,
+        process_name=process_name,
+        args=args
+    )
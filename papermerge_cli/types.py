@@ -19,3 +19,26 @@ class NodeActionEnum(str, Enum):
     replace_tags = "replace-tags"  # same as "assign-tags"
     remove_tags = "remove-tags"
     delete_tags = "delete-tags"   # same as "remove-tags"
+
+
+class OutputFormatEnum(str, Enum):
+    table = "table"
+    json = "json"
+    jsonl = "jsonl"
+    csv = "csv"
+    tsv = "tsv"
+
+
+class NodeTypeEnum(str, Enum):
+    folder = "folder"
+    document = "document"
+
+
+class TagsOpEnum(str, Enum):
+    all = "all"
+    any = "any"
+
+
+class DedupEnum(str, Enum):
+    skip = "skip"
+    report = "report"
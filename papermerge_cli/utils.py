@@ -1,12 +1,25 @@
-from rich.console import Console
-
-console = Console()
+import os
+from pathlib import Path
 
 
 def pretty_breadcrumb(path: tuple) -> str:
     return f"/{'/'.join(path)}"
 
 
+def cache_dir() -> Path:
+    """Returns directory where papermerge-cli keeps its local data
+
+    Follows XDG base directory specification i.e. uses
+    `$XDG_CACHE_HOME/papermerge-cli` and falls back to
+    `~/.cache/papermerge-cli`.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    path = Path(base) / 'papermerge-cli'
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
 def sanitize_host(host: str) -> str | None:
     """Remove unnecessary characters from host name
 
@@ -30,7 +43,9 @@ def token_required(func):
         token = kwargs.get('token', None)
 
         if token is None:
-            console.print(
+            from rich.console import Console
+
+            Console().print(
                 "Neither [b]PAPERMERGE_CLI__TOKEN[/b] not set"
                 " nor [b]--token[/b] option was provided",
                 style="red"
@@ -46,7 +61,9 @@ def host_required(func):
         token = kwargs.get('host', None)
 
         if token is None:
-            console.print(
+            from rich.console import Console
+
+            Console().print(
                 "Neither [b]PAPERMERGE_CLI__HOST[/b] not set"
                 " nor [b]--host[/b] option was provided",
                 style="red"
@@ -0,0 +1,28 @@
+import pytest
+
+import papermerge_cli.retry as retry
+from papermerge_cli.constants import DEFAULT_MAX_RETRIES
+from papermerge_cli.rest.users import clear_user_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path_factory, monkeypatch):
+    """Keeps local data (journals, caches) of each test in its own dir"""
+    cache_home = tmp_path_factory.mktemp('cache')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(cache_home))
+
+    return cache_home
+
+
+@pytest.fixture(autouse=True)
+def user_cache():
+    """Each test starts with empty in-memory cache of current user"""
+    clear_user_cache()
+    yield
+    clear_user_cache()
+
+
+@pytest.fixture(autouse=True)
+def retry_policy():
+    """Each test starts with default retry policy and closed circuit"""
+    retry.configure(max_retries=DEFAULT_MAX_RETRIES)
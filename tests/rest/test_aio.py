@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import uuid
+
+import httpx
+import pytest
+from laconiq import make
+
+import papermerge_cli.async_api_client as async_api_client
+from papermerge_cli.multipart import MultipartFile
+from papermerge_cli.rest import aio
+from papermerge_cli.schema import Document, Node, Paginator, User
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Routes requests of async REST API client to `handlers`"""
+    handlers = {}
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        handler = handlers[(request.method, request.url.path)]
+        return handler(request)
+
+    def make_async_client(max_connections):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+    monkeypatch.setattr(
+        async_api_client,
+        'make_async_client',
+        make_async_client
+    )
+    handlers['requests'] = requests
+
+    return handlers
+
+
+def test_concurrent_get_nodes(transport):
+    folder_ids = [uuid.uuid4() for _ in range(5)]
+
+    def list_folder(request):
+        nodes = make(Node, _quantity=2, ctype='folder', document=None)
+        page = make(Paginator, page_number=1, items=nodes)
+        return httpx.Response(200, text=page.model_dump_json())
+
+    for folder_id in folder_ids:
+        transport[('GET', f'/api/nodes/{folder_id}')] = list_folder
+
+    async def list_all():
+        return await asyncio.gather(*[
+            aio.get_nodes(node_id=folder_id, host='http://test', token='abc')
+            for folder_id in folder_ids
+        ])
+
+    pages = asyncio.run(list_all())
+
+    assert len(pages) == 5
+    assert all(len(page.items) == 2 for page in pages)
+    assert all(isinstance(page.items[0], Node) for page in pages)
+
+
+def test_get_me_is_cached(transport):
+    user = make(User)
+    transport[('GET', '/api/users/me')] = lambda request: httpx.Response(
+        200, text=user.model_dump_json()
+    )
+
+    async def get_me_twice():
+        await aio.get_me(host='http://test', token='abc')
+        return await aio.get_me(host='http://test', token='abc')
+
+    assert asyncio.run(get_me_twice()) == user
+    assert len(transport['requests']) == 1
+
+
+def make_upload_handlers(transport) -> Document:
+    doc = make(
+        Document,
+        ctype='document',
+        parent_id=uuid.uuid4(),
+        breadcrumb=[],
+        versions=[]
+    )
+    doc_json = doc.model_dump_json()
+    transport[('POST', '/api/nodes/')] = \
+        lambda request: httpx.Response(201, text=doc_json)
+    transport[('POST', f'/api/documents/{doc.id}/upload')] = \
+        lambda request: httpx.Response(200, text=doc_json)
+
+    return doc
+
+
+def test_upload_reads_file_outside_event_loop(
+    tmp_path,
+    transport,
+    monkeypatch
+):
+    file_path = tmp_path / 'invoice.pdf'
+    file_path.write_bytes(b'x' * 200_000)
+    doc = make_upload_handlers(transport)
+    reading_threads = set()
+    read = MultipartFile.read
+
+    def traced_read(self, size=-1):
+        reading_threads.add(threading.current_thread())
+        return read(self, size)
+
+    monkeypatch.setattr(MultipartFile, 'read', traced_read)
+
+    asyncio.run(aio.upload_document(
+        host='http://test',
+        token='abc',
+        file_path=file_path,
+        parent_id=doc.parent_id
+    ))
+
+    assert reading_threads
+    # event loop runs in the main thread
+    assert threading.main_thread() not in reading_threads
+
+
+def test_upload_document(tmp_path, transport):
+    file_path = tmp_path / 'invoice.pdf'
+    file_path.write_bytes(b'invoice content')
+    doc = make(
+        Document,
+        ctype='document',
+        parent_id=uuid.uuid4(),
+        breadcrumb=[],
+        versions=[]
+    )
+    doc_json = doc.model_dump_json()
+
+    def create_node(request):
+        assert json.loads(request.content)['title'] == 'invoice.pdf'
+        return httpx.Response(201, text=doc_json)
+
+    def upload(request):
+        body = request.read()
+        assert int(request.headers['Content-Length']) == len(body)
+        assert b'invoice content' in body
+        return httpx.Response(200, text=doc_json)
+
+    transport[('POST', '/api/nodes/')] = create_node
+    transport[('POST', f'/api/documents/{doc.id}/upload')] = upload
+
+    result = asyncio.run(aio.upload_document(
+        host='http://test',
+        token='abc',
+        file_path=file_path,
+        parent_id=doc.parent_id
+    ))
+
+    assert result.id == doc.id
@@ -1,7 +1,12 @@
+import io
+import uuid
+
 from laconiq import make
 
-from papermerge_cli.lib.nodes import list_nodes
+from papermerge_cli.lib.nodes import (iter_nodes, list_nodes,
+                                      perform_bulk_node_command, read_node_ids)
 from papermerge_cli.schema import Node, Paginator, User
+from papermerge_cli.types import NodeActionEnum
 
 
 def titles_generator(items):
@@ -104,3 +109,74 @@ def test_list_nodes_returns_one_ocred_document(requests_mock):
     assert data.page_number == 1
     assert len(data.items) == 1
     assert data.items[0].title == 'brother_004813.pdf'
+
+
+def test_iter_nodes_yields_nodes_from_all_pages(requests_mock):
+    home_id = 'a82cbe8e-fa0e-4aec-8950-7fcbeaef186c'
+    titles = [f'doc-{index}' for index in range(5)]
+    for page_number in (1, 2, 3):
+        items = [
+            make(Node, ctype="folder", title=title, document=None)
+            for title in titles[(page_number - 1) * 2:page_number * 2]
+        ]
+        payload = make(
+            Paginator,
+            page_number=page_number,
+            num_pages=3,
+            page_size=2,
+            items=items
+        ).model_dump_json()
+        requests_mock.get(
+            f'http://test/api/nodes/{home_id}'
+            f'?page_number={page_number}&page_size=2',
+            text=payload
+        )
+
+    nodes = iter_nodes(
+        host="http://test",
+        token="abc",
+        node_id=home_id,
+        page_size=2
+    )
+
+    assert [node.title for node in nodes] == titles
+
+
+def test_bulk_node_command_reports_each_node(requests_mock):
+    ok_ids = [uuid.uuid4() for _ in range(3)]
+    failing_id = uuid.uuid4()
+    for node_id in ok_ids:
+        requests_mock.patch(f'http://test/api/nodes/{node_id}/tags', json={})
+    requests_mock.patch(
+        f'http://test/api/nodes/{failing_id}/tags',
+        status_code=404,
+        text='Not found'
+    )
+
+    results = list(perform_bulk_node_command(
+        host="http://test",
+        token="abc",
+        node_ids=[*ok_ids, failing_id],
+        action=NodeActionEnum.add_tags,
+        tags=['important'],
+        workers=4
+    ))
+
+    assert {r.node_id for r in results if r.ok} == set(ok_ids)
+    [failed] = [r for r in results if not r.ok]
+    assert failed.node_id == failing_id
+    assert failed.error == 'Not found'
+
+
+def test_read_node_ids():
+    lines = io.StringIO(
+        "a82cbe8e-fa0e-4aec-8950-7fcbeaef186c\n"
+        "\n"
+        "# comment\n"
+        "  b82cbe8e-fa0e-4aec-8950-7fcbeaef186c  # trailing comment\n"
+    )
+
+    assert list(read_node_ids(lines)) == [
+        uuid.UUID('a82cbe8e-fa0e-4aec-8950-7fcbeaef186c'),
+        uuid.UUID('b82cbe8e-fa0e-4aec-8950-7fcbeaef186c'),
+    ]
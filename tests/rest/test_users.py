@@ -0,0 +1,41 @@
+from laconiq import make
+
+from papermerge_cli.rest import get_me
+from papermerge_cli.rest.users import clear_user_cache, set_user_cache_ttl
+from papermerge_cli.schema import User
+
+
+def test_get_me_fetches_user_once(requests_mock):
+    user = make(User)
+    mocked = requests_mock.get(
+        'http://test/api/users/me',
+        text=user.model_dump_json()
+    )
+
+    for _ in range(3):
+        got_user = get_me(host='http://test', token='abc')
+
+    assert got_user == user
+    assert mocked.call_count == 1
+
+
+def test_get_me_uses_disk_cache(requests_mock):
+    user = make(User)
+    mocked = requests_mock.get(
+        'http://test/api/users/me',
+        text=user.model_dump_json()
+    )
+    set_user_cache_ttl(60)
+    try:
+        get_me(host='http://test', token='abc')
+        # i.e. next CLI invocation
+        clear_user_cache()
+        got_user = get_me(host='http://test', token='abc')
+        # different token means different user
+        clear_user_cache()
+        get_me(host='http://test', token='xyz')
+    finally:
+        set_user_cache_ttl(0)
+
+    assert got_user.home_folder_id == user.home_folder_id
+    assert mocked.call_count == 2
@@ -2,6 +2,7 @@ from uuid import UUID
 
 from laconiq import make
 
+import papermerge_cli.api_client as api_client
 from papermerge_cli.api_client import ApiClient
 from papermerge_cli.schema.users import User
 
@@ -20,3 +21,14 @@ def test_fetch_user(requests_mock):
     assert got_user.email == 'john@mail.com'
     expected_uuid = UUID('a82cbe8e-fa0e-4aec-8950-7fcbeaef186c')
     assert got_user.home_folder_id == expected_uuid
+
+
+def test_api_clients_share_session():
+    api_client.configure(pool_size=4)
+
+    client_1 = ApiClient[User](token='abc1', host='http://test')
+    client_2 = ApiClient[User](token='abc2', host='http://test')
+
+    assert client_1.session is client_2.session
+    adapter = client_1.session.get_adapter('http://test')
+    assert adapter._pool_maxsize == 4
@@ -0,0 +1,35 @@
+from benchmarks.__main__ import available, compare, load, save
+
+
+def report(revision: str, **metrics) -> dict:
+    return {
+        'started_at': f'2024-03-01T10:00:0{revision}',
+        'revision': revision,
+        'python': '3.11',
+        'platform': 'test',
+        'benchmarks': {'ls': metrics},
+    }
+
+
+def test_available_benchmarks():
+    assert {'import', 'ls', 'parse', 'startup'} <= set(available())
+
+
+def test_save_and_load(tmp_path):
+    original = report('1', fetch_ms=2.5)
+
+    path = save(original, results_dir=tmp_path)
+
+    assert path.parent == tmp_path
+    assert ':' not in path.name
+    assert load(path) == original
+
+
+def test_compare_common_metrics():
+    old = report('1', fetch_ms=2.0, render_ms=0.0)
+    new = report('2', fetch_ms=3.0, render_ms=1.0, new_ms=1.0)
+
+    assert compare(old, new) == [
+        ('ls.fetch_ms', 2.0, 3.0, 50.0),
+        ('ls.render_ms', 0.0, 1.0, 0.0),
+    ]
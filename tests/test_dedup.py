@@ -0,0 +1,62 @@
+import hashlib
+import os
+
+import papermerge_cli.tracing as tracing
+from papermerge_cli.lib.dedup import Hasher, file_sha256
+
+
+def test_file_sha256(tmp_path):
+    empty = tmp_path / 'empty.pdf'
+    empty.write_bytes(b'')
+    small = tmp_path / 'small.pdf'
+    small.write_bytes(b'%PDF-1.4 small')
+
+    assert file_sha256(str(empty)) == hashlib.sha256(b'').hexdigest()
+    assert file_sha256(str(small)) == hashlib.sha256(
+        b'%PDF-1.4 small'
+    ).hexdigest()
+
+
+def test_hasher_hashes_files_in_other_processes(tmp_path):
+    contents = [b'x' * 1024 * 1024, b'small']
+    paths = []
+    for index, content in enumerate(contents):
+        paths.append(tmp_path / f'{index}.pdf')
+        paths[-1].write_bytes(content)
+    hasher = Hasher(processes=2)
+
+    try:
+        futures = [hasher.submit(path) for path in paths]
+        digests = [future.result() for future in futures]
+    finally:
+        hasher.shutdown()
+
+    assert digests == [
+        hashlib.sha256(content).hexdigest() for content in contents
+    ]
+
+
+def test_hashing_in_other_processes_is_traced(tmp_path):
+    path = tmp_path / 'large.pdf'
+    path.write_bytes(b'x' * 1024 * 1024)
+    tracer = tracing.enable()
+    hasher = Hasher(processes=1)
+
+    try:
+        hasher.submit(path).result()
+    finally:
+        hasher.shutdown()
+        tracing.disable()
+
+    [span] = [
+        event for event in tracer.events()
+        if event['ph'] == 'X' and event['name'] == 'hash'
+    ]
+    # recorded on the track of the hashing process
+    assert span['pid'] != os.getpid()
+    assert span['dur'] > 0
+    assert span['args'] == {'path': path}
+    assert {'name': 'papermerge-cli hasher'} in [
+        event['args'] for event in tracer.events()
+        if event['name'] == 'process_name' and event['pid'] == span['pid']
+    ]
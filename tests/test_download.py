@@ -0,0 +1,197 @@
+import io
+import uuid
+
+import pytest
+import requests
+from laconiq import make
+
+import papermerge_cli.api_client as api_client
+from papermerge_cli.lib.download import (MANIFEST_FILE, PART_SUFFIX,
+                                         DownloadManifest,
+                                         perform_bulk_download)
+from papermerge_cli.schema import Document
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records delays instead of sleeping"""
+    delays = []
+    monkeypatch.setattr(api_client.time, 'sleep', delays.append)
+
+    return delays
+
+
+class BrokenBody(io.BytesIO):
+    """Body whose transfer breaks after `limit` bytes"""
+
+    def __init__(self, content: bytes, limit: int):
+        super().__init__(content)
+        self.limit = limit
+
+    def read(self, size=-1):
+        if self.tell() >= self.limit:
+            raise requests.exceptions.ChunkedEncodingError('broken')
+        return super().read(min(size, self.limit - self.tell()))
+
+
+def mock_document(
+    requests_mock,
+    file_name: str = 'invoice.pdf',
+    size: int = len(CONTENT),
+    download=None
+) -> Document:
+    document_id = uuid.uuid4()
+    version_id = uuid.uuid4()
+    download_url = f'/api/document-versions/{version_id}/download'
+    document = make(
+        Document,
+        id=document_id,
+        ctype='document',
+        parent_id=uuid.uuid4(),
+        breadcrumb=[],
+        versions=[{
+            'id': version_id,
+            'number': 1,
+            'lang': 'deu',
+            'file_name': file_name,
+            'size': size,
+            'short_description': '',
+            'document_id': document_id,
+            'download_url': download_url,
+        }]
+    )
+    requests_mock.get(
+        f'http://test/api/documents/{document_id}',
+        text=document.model_dump_json()
+    )
+    requests_mock.get(
+        f'http://test{download_url}',
+        download or [{'content': CONTENT}]
+    )
+
+    return document
+
+
+def downloaded_files(target_dir) -> list[str]:
+    return sorted(
+        path.name for path in target_dir.iterdir()
+        if not path.name.startswith(MANIFEST_FILE)
+    )
+
+
+def download(node_ids, target_dir):
+    return list(perform_bulk_download(
+        host='http://test',
+        token='abc',
+        node_ids=node_ids,
+        target_dir=target_dir,
+        workers=2
+    ))
+
+
+def test_download_documents(requests_mock, tmp_path):
+    invoice = mock_document(requests_mock, 'invoice.pdf')
+    # same file name as the first one
+    other = mock_document(requests_mock, 'invoice.pdf')
+
+    results = download([invoice.id, other.id], tmp_path)
+
+    assert all(result.ok for result in results)
+    # names are assigned in order of node ids: second document gets
+    # its UUID added to the file name
+    paths = {result.node_id: result.path.name for result in results}
+    assert paths == {
+        invoice.id: 'invoice.pdf',
+        other.id: f'invoice-{other.id}.pdf',
+    }
+    assert downloaded_files(tmp_path) == sorted(paths.values())
+    for result in results:
+        assert result.received == len(CONTENT)
+        assert result.path.read_bytes() == CONTENT
+
+
+def test_download_names_are_stable(requests_mock, tmp_path):
+    invoice = mock_document(requests_mock, 'invoice.pdf')
+    other = mock_document(requests_mock, 'invoice.pdf')
+    download([invoice.id, other.id], tmp_path)
+
+    # other order, and `other` alone: file of `invoice` stays its own
+    for node_ids in ([other.id, invoice.id], [other.id]):
+        results = download(node_ids, tmp_path)
+
+        assert all(result.ok and result.skipped for result in results)
+        assert {r.node_id: r.path.name for r in results}[other.id] == \
+            f'invoice-{other.id}.pdf'
+
+
+def test_download_skips_complete_files(requests_mock, tmp_path):
+    document = mock_document(requests_mock)
+    download([document.id], tmp_path)
+    requests_mock.reset_mock()
+
+    [result] = download([document.id], tmp_path)
+
+    assert result.ok and result.skipped
+    assert not any('download' in r.path for r in requests_mock.request_history)
+
+
+def test_download_replaces_file_of_other_origin(requests_mock, tmp_path):
+    document = mock_document(requests_mock)
+    # same name and size, but not downloaded for this document
+    (tmp_path / 'invoice.pdf').write_bytes(bytes(len(CONTENT)))
+    (tmp_path / f'invoice.pdf{PART_SUFFIX}').write_bytes(bytes(1000))
+
+    [result] = download([document.id], tmp_path)
+
+    assert result.ok and not result.skipped
+    assert 'Range' not in requests_mock.last_request.headers
+    assert (tmp_path / 'invoice.pdf').read_bytes() == CONTENT
+
+
+def test_download_resumes_partial_file(requests_mock, tmp_path):
+    document = mock_document(requests_mock, download=[
+        {'status_code': 206, 'content': CONTENT[1000:]}
+    ])
+    # left by interrupted download of the same document version
+    manifest = DownloadManifest(tmp_path / MANIFEST_FILE)
+    manifest.claim('invoice.pdf', document.id, document.versions[0].id)
+    manifest.close()
+    (tmp_path / f'invoice.pdf{PART_SUFFIX}').write_bytes(CONTENT[:1000])
+
+    [result] = download([document.id], tmp_path)
+
+    assert result.ok
+    assert result.received == len(CONTENT) - 1000
+    assert requests_mock.last_request.headers['Range'] == 'bytes=1000-'
+    assert (tmp_path / 'invoice.pdf').read_bytes() == CONTENT
+    assert not (tmp_path / f'invoice.pdf{PART_SUFFIX}').exists()
+
+
+def test_broken_transfer_is_resumed(requests_mock, tmp_path, sleeps):
+    def resume(request, context):
+        offset = int(request.headers.get('Range', 'bytes=0-')[6:-1])
+        context.status_code = 206 if offset else 200
+        return CONTENT[offset:]
+
+    document = mock_document(requests_mock, download=[
+        {'body': BrokenBody(CONTENT, limit=4000)},
+        {'content': resume},
+    ])
+
+    [result] = download([document.id], tmp_path)
+
+    assert result.ok
+    assert len(sleeps) == 1
+    assert (tmp_path / 'invoice.pdf').read_bytes() == CONTENT
+
+
+def test_incomplete_download_fails(requests_mock, tmp_path):
+    document = mock_document(requests_mock, size=len(CONTENT) + 1)
+
+    [result] = download([document.id], tmp_path)
+
+    assert not result.ok
+    assert 'expected' in result.error
+    assert downloaded_files(tmp_path) == []
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+from laconiq import make
+
+from papermerge_cli.format.records import NODE_FIELDS, node_record
+from papermerge_cli.format.stream import RecordWriter, make_writer
+from papermerge_cli.schema import Node
+from papermerge_cli.types import OutputFormatEnum
+
+
+def make_document() -> Node:
+    return make(
+        Node,
+        ctype='document',
+        title='invoice.pdf',
+        tags=[
+            {'name': 'paid', 'bg_color': '#fff', 'fg_color': '#000'},
+            {'name': 'important', 'bg_color': '#fff', 'fg_color': '#000'},
+        ],
+        document={'ocr': True, 'ocr_status': 'SUCCESS'}
+    )
+
+
+def test_node_record():
+    node = make_document()
+
+    record = node_record(node)
+
+    assert list(record) == NODE_FIELDS
+    assert record['id'] == str(node.id)
+    assert record['ctype'] == 'document'
+    assert record['tags'] == ['paid', 'important']
+    assert record['ocr_status'] == 'SUCCESS'
+    assert record['created_at'] == node.created_at.isoformat()
+
+
+@pytest.mark.parametrize('count', [0, 1, 3])
+def test_json_writer_writes_valid_array(count):
+    out = io.StringIO()
+
+    with make_writer(OutputFormatEnum.json, out, NODE_FIELDS) as writer:
+        for _ in range(count):
+            writer.write(node_record(make_document()))
+
+    assert len(json.loads(out.getvalue())) == count
+
+
+def test_jsonl_writer_writes_one_record_per_line():
+    out = io.StringIO()
+    nodes = [make_document() for _ in range(3)]
+
+    with make_writer(OutputFormatEnum.jsonl, out, NODE_FIELDS) as writer:
+        for node in nodes:
+            writer.write(node_record(node))
+
+    lines = out.getvalue().splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [
+        str(node.id) for node in nodes
+    ]
+
+
+@pytest.mark.parametrize(
+    'output, delimiter',
+    [(OutputFormatEnum.csv, ','), (OutputFormatEnum.tsv, '\t')]
+)
+def test_csv_writers(output, delimiter):
+    out = io.StringIO()
+    node = make_document()
+
+    with make_writer(output, out, NODE_FIELDS) as writer:
+        writer.write(node_record(node))
+
+    out.seek(0)
+    [row] = list(csv.DictReader(out, delimiter=delimiter))
+    assert row['id'] == str(node.id)
+    assert row['tags'] == 'paid,important'
+    assert row['parent_id'] == ''
+
+
+def test_record_writer_without_write_cannot_be_created():
+    class IncompleteWriter(RecordWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteWriter(io.StringIO(), NODE_FIELDS)
+
+
+def test_record_output_does_not_import_rich():
+    # rich is needed only by table output
+    code = (
+        'import sys\n'
+        'import papermerge_cli.format.nodes\n'
+        'import papermerge_cli.format.records\n'
+        'import papermerge_cli.format.stream\n'
+        'print("rich" in sys.modules)'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,384 @@
+import json
+import re
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from laconiq import make
+
+from papermerge_cli.exceptions import FileMimeTypeUnknown
+from papermerge_cli.lib.importer import Importer, upload_file_or_folder, walk
+from papermerge_cli.schema import Document, Folder, Node, Paginator, User
+
+
+def mock_server(requests_mock, user: User) -> list[dict]:
+    """Mocks REST API endpoints used by import
+
+    Returns list to which every created node is appended (in order of
+    creation).
+    """
+    created = []
+
+    def create_node(request, context):
+        data = json.loads(request.body)
+        model = Folder if data['ctype'] == 'folder' else Document
+        node = make(
+            model,
+            title=data['title'],
+            ctype=data['ctype'],
+            parent_id=data['parent_id'],
+            user_id=user.id,
+            breadcrumb=[],
+            versions=[]
+        )
+        created.append({**data, 'id': str(node.id)})
+        context.status_code = 201
+        return json.loads(node.model_dump_json())
+
+    def upload(request, context):
+        doc_id = request.path.split('/')[3]
+        node = make(
+            Document,
+            id=doc_id,
+            ctype='document',
+            parent_id=uuid.uuid4(),
+            breadcrumb=[],
+            versions=[]
+        )
+        return json.loads(node.model_dump_json())
+
+    def list_children(request, context):
+        parent_id = request.path.split('/')[3]
+        items = [
+            make(
+                Node,
+                id=node['id'],
+                title=node['title'],
+                ctype=node['ctype'],
+                parent_id=parent_id,
+                tags=[]
+            )
+            for node in created if node['parent_id'] == parent_id
+        ]
+        page = make(Paginator, page_number=1, num_pages=1, items=items)
+        return json.loads(page.model_dump_json())
+
+    requests_mock.get('http://test/api/users/me', text=user.model_dump_json())
+    requests_mock.get(
+        re.compile(r'http://test/api/nodes/[0-9a-f-]+(\?.*)?$'),
+        json=list_children
+    )
+    requests_mock.post('http://test/api/nodes/', json=create_node)
+    requests_mock.post(
+        re.compile('http://test/api/documents/.*/upload'),
+        json=upload
+    )
+
+    return created
+
+
+def test_parallel_import_creates_folders_before_children(
+    tmp_path,
+    requests_mock
+):
+    user = make(User)
+    created = mock_server(requests_mock, user)
+    for name in ('a.pdf', 'b.pdf'):
+        (tmp_path / name).write_bytes(b'top')
+    sub = tmp_path / 'sub'
+    sub.mkdir()
+    for name in ('c.pdf', 'd.pdf', 'e.pdf'):
+        (sub / name).write_bytes(b'nested')
+
+    stats = upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=tmp_path,
+        workers=4
+    )
+
+    assert stats.files == 5
+    assert stats.folders == 1
+    assert stats.bytes == 2 * 3 + 3 * 6
+
+    folder = next(node for node in created if node['ctype'] == 'folder')
+    sub_docs = [node for node in created if node['title'] in (
+        'c.pdf', 'd.pdf', 'e.pdf'
+    )]
+    assert folder['parent_id'] == str(user.inbox_folder_id)
+    assert all(doc['parent_id'] == folder['id'] for doc in sub_docs)
+    assert all(
+        created.index(folder) < created.index(doc) for doc in sub_docs
+    )
+
+
+def test_import_with_delete_removes_local_tree(tmp_path, requests_mock):
+    user = make(User)
+    mock_server(requests_mock, user)
+    source = tmp_path / 'source'
+    nested = source / 'x' / 'y'
+    nested.mkdir(parents=True)
+    (nested / 'doc.pdf').write_bytes(b'content')
+
+    upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=source,
+        parent_id=uuid.uuid4(),
+        delete=True,
+        workers=2
+    )
+
+    assert list(source.iterdir()) == []
+
+
+def test_interrupted_import_resumes_from_journal(
+    tmp_path,
+    requests_mock,
+    cache_home
+):
+    user = make(User)
+    created = mock_server(requests_mock, user)
+    source = tmp_path / 'source'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'sub' / 'a.pdf').write_bytes(b'a')
+    (source / 'sub' / 'b.txt').write_bytes(b'b')
+    # mime type of this one cannot be guessed, import will fail
+    (source / 'sub' / 'c.unknown-type').write_bytes(b'c')
+
+    with pytest.raises(FileMimeTypeUnknown):
+        upload_file_or_folder(
+            host='http://test',
+            token='abc',
+            file_or_folder=source
+        )
+    created_before = len(created)
+    (source / 'sub' / 'c.unknown-type').unlink()
+
+    stats = upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=source
+    )
+
+    # folder and documents uploaded by the first run are not re-created
+    assert stats.folders == 0
+    assert stats.files + stats.skipped == 3
+    assert len(created) == created_before + stats.files
+    # successful import removes its journal
+    assert list(cache_home.rglob('*.sqlite')) == []
+
+
+def test_dedup_skips_duplicates_within_run_and_across_runs(
+    tmp_path,
+    requests_mock
+):
+    user = make(User)
+    created = mock_server(requests_mock, user)
+    requests_mock.get(
+        re.compile('http://test/api/documents/.*'),
+        text=make(
+            Document,
+            ctype='document',
+            parent_id=uuid.uuid4(),
+            breadcrumb=[],
+            versions=[]
+        ).model_dump_json()
+    )
+    first = tmp_path / 'first'
+    (first / 'copy').mkdir(parents=True)
+    (first / 'scan.pdf').write_bytes(b'same content')
+    (first / 'copy' / 'scan.pdf').write_bytes(b'same content')
+    (first / 'other.pdf').write_bytes(b'other content')
+    second = tmp_path / 'second'
+    second.mkdir()
+    (second / 'rescan.pdf').write_bytes(b'same content')
+
+    stats = upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=first,
+        workers=2,
+        dedup='skip'
+    )
+    again = upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=second,
+        dedup='skip'
+    )
+
+    assert stats.files == 2
+    [duplicate] = stats.duplicates
+    assert {duplicate.path, duplicate.original_path} == {
+        first / 'scan.pdf', first / 'copy' / 'scan.pdf'
+    }
+    assert again.files == 0
+    [duplicate] = again.duplicates
+    assert duplicate.path == second / 'rescan.pdf'
+    assert duplicate.document_id is not None
+    documents = [node for node in created if node['ctype'] == 'document']
+    assert len(documents) == 2
+
+
+def test_dedup_uploads_again_when_document_was_deleted(
+    tmp_path,
+    requests_mock
+):
+    user = make(User)
+    created = mock_server(requests_mock, user)
+    requests_mock.get(
+        re.compile('http://test/api/documents/.*'),
+        status_code=404,
+        text='Not found'
+    )
+    (tmp_path / 'scan.pdf').write_bytes(b'content')
+
+    for _ in range(2):
+        stats = upload_file_or_folder(
+            host='http://test',
+            token='abc',
+            file_or_folder=tmp_path / 'scan.pdf',
+            resume=False,
+            dedup='skip'
+        )
+
+    assert stats.files == 1
+    assert stats.duplicates == []
+    assert len(created) == 2
+
+
+def test_walk_does_not_recurse(tmp_path):
+    folder = tmp_path
+    for _ in range(150):
+        folder = folder / 'd'
+    folder.mkdir(parents=True)
+    (folder / 'deep.pdf').write_bytes(b'deep')
+
+    limit = sys.getrecursionlimit()
+    # tree is deeper than the recursion limit
+    sys.setrecursionlimit(100)
+    try:
+        entries = list(walk(tmp_path))
+    finally:
+        sys.setrecursionlimit(limit)
+
+    assert len(entries) == 151
+    assert Path(entries[-1]) == folder / 'deep.pdf'
+
+
+def test_import_with_bounded_queue(tmp_path, requests_mock):
+    user = make(User)
+    created = mock_server(requests_mock, user)
+    for index in range(20):
+        folder = tmp_path / f'folder-{index % 3}'
+        folder.mkdir(exist_ok=True)
+        (folder / f'{index}.pdf').write_bytes(b'content')
+    importer = Importer(
+        host='http://test',
+        token='abc',
+        workers=2,
+        queue_size=2
+    )
+    queued = []
+    requests_mock.post(
+        re.compile('http://test/api/documents/.*/upload'),
+        json=lambda request, context: queued.append(
+            importer._queue.qsize()
+        ) or json.loads(make(
+            Document,
+            ctype='document',
+            parent_id=uuid.uuid4(),
+            breadcrumb=[],
+            versions=[]
+        ).model_dump_json())
+    )
+
+    stats = importer.run(tmp_path, parent_id=user.inbox_folder_id)
+
+    assert stats.files == 20
+    assert stats.folders == 3
+    assert len(created) == 23
+    assert max(queued) <= 2
+
+
+def test_import_reuses_existing_folders(tmp_path, requests_mock):
+    user = make(User)
+    created = mock_server(requests_mock, user)
+    for name in ('a', 'b'):
+        (tmp_path / name / 'nested').mkdir(parents=True)
+        (tmp_path / name / 'nested' / 'doc.pdf').write_bytes(b'content')
+
+    first = upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=tmp_path,
+        workers=4,
+        resume=False
+    )
+    listings_before = len([
+        request for request in requests_mock.request_history
+        if request.method == 'GET' and '/api/nodes/' in request.path
+    ])
+    second = upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=tmp_path,
+        workers=4,
+        resume=False
+    )
+    listings = [
+        request.path for request in requests_mock.request_history
+        if request.method == 'GET' and '/api/nodes/' in request.path
+    ][listings_before:]
+
+    folders = [node for node in created if node['ctype'] == 'folder']
+    assert (first.folders, first.existing_folders) == (4, 0)
+    assert (second.folders, second.existing_folders) == (0, 4)
+    assert len(folders) == 4
+    # target, a and b are listed once each; nested folders not needed
+    assert len(listings) == len(set(listings)) == 3
+    # first import listed only the target folder; it created the rest
+    assert listings_before == 1
+
+
+def test_resumed_import_uploads_into_node_created_before(
+    tmp_path,
+    requests_mock
+):
+    user = make(User)
+    created = mock_server(requests_mock, user)
+    (tmp_path / 'scan.pdf').write_bytes(b'content')
+    requests_mock.post(
+        re.compile('http://test/api/documents/.*/upload'),
+        status_code=400,
+        text='Upload failed'
+    )
+
+    with pytest.raises(ValueError):
+        upload_file_or_folder(
+            host='http://test',
+            token='abc',
+            file_or_folder=tmp_path
+        )
+    uploads = requests_mock.post(
+        re.compile('http://test/api/documents/.*/upload'),
+        json=json.loads(make(
+            Document,
+            ctype='document',
+            parent_id=uuid.uuid4(),
+            breadcrumb=[],
+            versions=[]
+        ).model_dump_json())
+    )
+    stats = upload_file_or_folder(
+        host='http://test',
+        token='abc',
+        file_or_folder=tmp_path
+    )
+
+    assert stats.files == 1
+    [document] = created
+    assert uploads.last_request.path == \
+        f"/api/documents/{document['id']}/upload"
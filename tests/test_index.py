@@ -0,0 +1,278 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from laconiq import make
+
+from papermerge_cli.lib.index import (Index, account_index_path,
+                                      find_nodes_live, open_index, sync_index)
+from papermerge_cli.main import list_indexed_nodes
+from papermerge_cli.schema import Node, Paginator, User
+from papermerge_cli.types import OutputFormatEnum
+
+
+def mock_folder(requests_mock, folder_id, children: list[Node]):
+    payload = make(
+        Paginator,
+        page_number=1,
+        num_pages=1,
+        items=children
+    ).model_dump_json()
+    requests_mock.get(f'http://test/api/nodes/{folder_id}', text=payload)
+
+
+def node(title: str, ctype: str = 'document', tags=()) -> Node:
+    return make(
+        Node,
+        ctype=ctype,
+        title=title,
+        parent_id=uuid.uuid4(),
+        tags=[
+            {'name': name, 'bg_color': '#fff', 'fg_color': '#000'}
+            for name in tags
+        ],
+        document={'ocr': True, 'ocr_status': 'SUCCESS'}
+        if ctype == 'document' else None
+    )
+
+
+class Account:
+    """
+    .home/
+    ├── A/
+    │   ├── B/
+    │   │   └── b.pdf
+    │   └── a.pdf    [x]
+    └── root.pdf     [x, y]
+    .inbox/
+    └── scan.pdf     [y]
+    """
+
+    def __init__(self, requests_mock):
+        self.requests_mock = requests_mock
+        self.user = make(User)
+        requests_mock.get(
+            'http://test/api/users/me',
+            text=self.user.model_dump_json()
+        )
+        self.folder_a = node('A', 'folder')
+        self.folder_b = node('B', 'folder')
+        self.a_pdf = node('a.pdf', tags=['x'])
+        self.mock(self.user.home_folder_id, [
+            self.folder_a, node('root.pdf', tags=['x', 'y'])
+        ])
+        self.mock(self.folder_a.id, [self.folder_b, self.a_pdf])
+        self.mock(self.folder_b.id, [node('b.pdf')])
+        self.mock(self.user.inbox_folder_id, [node('scan.pdf', tags=['y'])])
+
+    def mock(self, folder_id, children: list[Node]):
+        for child in children:
+            child.parent_id = folder_id
+        mock_folder(self.requests_mock, folder_id, children)
+
+    def listed_folders(self) -> list[str]:
+        """IDs of folders listed since the last call"""
+        listed = [
+            request.path.split('/')[3]
+            for request in self.requests_mock.request_history
+            if request.path.startswith('/api/nodes/')
+        ]
+        self.requests_mock.reset_mock()
+
+        return listed
+
+
+def sync(full: bool = False):
+    index = Index(account_index_path('http://test', 'abc'))
+    stats = sync_index(
+        host='http://test',
+        token='abc',
+        index=index,
+        workers=2,
+        full=full
+    )
+
+    return index, stats
+
+
+def test_sync_and_find(requests_mock):
+    Account(requests_mock)
+
+    index, stats = sync()
+
+    assert (stats.listed, stats.nodes, stats.removed) == (4, 6, 0)
+    assert sorted(entry.path for entry in index.find()) == [
+        '/.home/A', '/.home/A/B', '/.home/A/B/b.pdf', '/.home/A/a.pdf',
+        '/.home/root.pdf', '/.inbox/scan.pdf',
+    ]
+    assert [entry.path for entry in index.find(title='A.P')] == [
+        '/.home/A/a.pdf'
+    ]
+    assert [entry.path for entry in index.find(title='%')] == []
+    assert [e.path for e in index.find(tags=['x', 'y'])] == [
+        '/.home/root.pdf'
+    ]
+    assert [e.path for e in index.find(tags=['x', 'y'], tags_op='any')] == [
+        '/.home/A/a.pdf', '/.home/root.pdf', '/.inbox/scan.pdf'
+    ]
+    assert [e.path for e in index.find(ctype='folder')] == [
+        '/.home/A', '/.home/A/B'
+    ]
+
+
+def test_live_find_matches_index(requests_mock):
+    Account(requests_mock)
+    index, _ = sync()
+    criteria = {'tags': ['x', 'y'], 'tags_op': 'any', 'ctype': 'document'}
+
+    live = find_nodes_live(host='http://test', token='abc', **criteria)
+
+    assert sorted(e.path for e in live) == sorted(
+        e.path for e in index.find(**criteria)
+    )
+
+
+def test_page_from_index(requests_mock):
+    account = Account(requests_mock)
+    index, _ = sync()
+
+    page = index.page(
+        account.user.home_folder_id,
+        page_size=1,
+        order_by='-title'
+    )
+
+    assert page.num_pages == 2
+    assert [item.title for item in page.items] == ['root.pdf']
+    assert page.items[0].document.ocr_status == 'SUCCESS'
+    assert [tag.name for tag in page.items[0].tags] == ['x', 'y']
+
+
+def test_sync_skips_unchanged_folders(requests_mock):
+    account = Account(requests_mock)
+    sync()
+    account.listed_folders()
+
+    _, stats = sync()
+
+    assert set(account.listed_folders()) == {
+        str(account.user.home_folder_id), str(account.user.inbox_folder_id)
+    }
+    assert (stats.listed, stats.skipped) == (2, 1)
+
+    _, stats = sync(full=True)
+
+    assert (stats.listed, stats.skipped) == (4, 0)
+
+
+def test_sync_updates_changed_folders(requests_mock):
+    account = Account(requests_mock)
+    sync()
+    # a.pdf is deleted; folder A gets newer `updated_at`
+    account.folder_a.updated_at += timedelta(seconds=1)
+    account.mock(account.user.home_folder_id, [account.folder_a])
+    account.mock(account.folder_a.id, [account.folder_b])
+    account.listed_folders()
+
+    index, stats = sync()
+
+    assert str(account.folder_a.id) in account.listed_folders()
+    assert str(account.folder_b.id) not in account.listed_folders()
+    # root.pdf and a.pdf
+    assert stats.removed == 2
+    assert sorted(entry.path for entry in index.find()) == [
+        '/.home/A', '/.home/A/B', '/.home/A/B/b.pdf', '/.inbox/scan.pdf',
+    ]
+
+
+def test_sync_removes_deleted_subtree(requests_mock):
+    account = Account(requests_mock)
+    sync()
+    account.mock(account.user.home_folder_id, [])
+
+    index, stats = sync()
+
+    # A, B, a.pdf, b.pdf and root.pdf
+    assert stats.removed == 5
+    assert [entry.path for entry in index.find()] == ['/.inbox/scan.pdf']
+
+
+def test_open_index_requires_sync(requests_mock):
+    Account(requests_mock)
+    assert open_index('http://test', 'abc') is None
+
+    Index(account_index_path('http://test', 'abc')).close()
+    assert open_index('http://test', 'abc') is None
+
+    sync()
+    index = open_index('http://test', 'abc')
+    assert index is not None
+    assert index.synced_at <= datetime.now(timezone.utc).timestamp()
+
+
+def test_index_outlives_token_rotation(requests_mock):
+    Account(requests_mock)
+    assert open_index('http://test', 'abc') is None
+    # without any index, current user is not even requested
+    assert requests_mock.call_count == 0
+    index, _ = sync()
+    index.close()
+
+    rotated = open_index('http://test', 'rotated')
+    requests_mock.reset_mock()
+    again = open_index('http://test', 'rotated')
+
+    assert rotated.path == again.path == index.path
+    # user of the new token is remembered
+    assert requests_mock.call_count == 0
+    rotated.close()
+    again.close()
+
+
+def test_children_indexed(requests_mock):
+    account = Account(requests_mock)
+    index, _ = sync()
+
+    assert index.children_indexed(str(account.user.home_folder_id))
+    assert index.children_indexed(str(account.folder_b.id))
+    # created after the sync or outside of home and inbox folders
+    assert not index.children_indexed(str(uuid.uuid4()))
+
+
+def test_ls_lists_from_index_only_indexed_folders(requests_mock, capsys):
+    account = Account(requests_mock)
+    index, _ = sync()
+
+    listed = list_indexed_nodes(
+        index,
+        parent_id=account.folder_a.id,
+        inbox=False,
+        page_number=1,
+        page_size=15,
+        order_by='title',
+        all_pages=False,
+        output=OutputFormatEnum.jsonl
+    )
+
+    assert listed
+    output = capsys.readouterr().out
+    records = [json.loads(line) for line in output.splitlines()]
+    assert [record['title'] for record in records] == ['a.pdf', 'B']
+    # records tell that they come from the index, and how old it is
+    indexed_at = datetime.fromtimestamp(index.synced_at, timezone.utc)
+    assert {record['indexed_at'] for record in records} == \
+        {indexed_at.isoformat()}
+
+    listed = list_indexed_nodes(
+        index,
+        parent_id=uuid.uuid4(),
+        inbox=False,
+        page_number=1,
+        page_size=15,
+        order_by='title',
+        all_pages=False,
+        output=OutputFormatEnum.jsonl
+    )
+
+    assert not listed
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,134 @@
+import json
+import uuid
+
+import pytest
+import requests
+
+import papermerge_cli.api_client as api_client
+import papermerge_cli.metrics as metrics
+from papermerge_cli.api_client import ApiClient
+from papermerge_cli.format.metrics import latency_histogram, metrics_summary
+from papermerge_cli.metrics import Metrics, endpoint_template
+from papermerge_cli.retry import configure as configure_retry
+
+
+@pytest.fixture
+def collected():
+    yield metrics.enable()
+    metrics.disable()
+
+
+def test_endpoint_template():
+    node_id = uuid.uuid4()
+
+    assert endpoint_template(
+        f'http://test/api/nodes/{node_id}?page_number=2'
+    ) == '/api/nodes/{id}'
+    assert endpoint_template(
+        f'/api/documents/{node_id}/versions/3/download'
+    ) == '/api/documents/{id}/versions/{id}/download'
+    assert endpoint_template('/api/users/me') == '/api/users/me'
+
+
+def test_percentiles_and_histogram():
+    collected = Metrics()
+    for millis in range(1, 101):
+        collected.record('get', '/api/users/me', 200, millis / 1000)
+    collected.record('get', '/api/users/me', 503, 12.0)
+
+    [endpoint] = collected.endpoints()
+    assert endpoint.method == 'GET'
+    assert endpoint.count == 101
+    assert endpoint.errors == 1
+    assert endpoint.percentile(50) == 0.051
+    assert endpoint.percentile(99) == 0.1
+    assert endpoint.percentile(100) == 12.0
+    histogram = dict(endpoint.histogram())
+    # bucket bounds are inclusive
+    assert histogram[0.005] == 5
+    assert histogram[0.1] == 50
+    assert histogram[float('inf')] == 1
+    assert sum(histogram.values()) == 101
+    assert '#' in latency_histogram(endpoint)
+
+
+def test_api_client_records_calls(requests_mock, collected, monkeypatch):
+    monkeypatch.setattr(api_client.time, 'sleep', lambda delay: None)
+    node_id = uuid.uuid4()
+    requests_mock.get('http://test/api/users/me', text='{"id": 1}')
+    requests_mock.post(f'http://test/api/nodes/{node_id}', [
+        {'status_code': 503},
+        {'status_code': 201, 'text': '{}'},
+    ])
+    requests_mock.get(
+        'http://test/api/nodes/',
+        exc=requests.ConnectionError
+    )
+    configure_retry(max_retries=1)
+    client = ApiClient(token='abc', host='http://test')
+
+    client.request('GET', '/api/users/me')
+    client.request('GET', '/api/users/me')
+    client.post(f'/api/nodes/{node_id}', json={'title': 'x'})
+    with pytest.raises(requests.ConnectionError):
+        client.request('GET', '/api/nodes/')
+
+    endpoints = {
+        (item.method, item.endpoint): item
+        for item in collected.endpoints()
+    }
+    me = endpoints['GET', '/api/users/me']
+    assert me.count == 2
+    assert me.received == 2 * len('{"id": 1}')
+    created = endpoints['POST', '/api/nodes/{id}']
+    # retried attempts count into one call
+    assert created.count == 1
+    assert created.retries == 1
+    assert created.statuses == {201: 1}
+    assert created.sent == len('{"title": "x"}')
+    failed = endpoints['GET', '/api/nodes/']
+    assert failed.statuses == {None: 1}
+    assert failed.retries == 1
+    assert collected.total().errors == 1
+    assert '4 request(s)' in metrics_summary(collected)
+
+
+def test_api_client_records_nothing_when_disabled(requests_mock):
+    requests_mock.get('http://test/api/users/me', text='{}')
+    ApiClient(token='abc', host='http://test').request('GET', '/api/users/me')
+
+    assert metrics.get_metrics() is None
+
+
+def test_write_prometheus_and_json(tmp_path):
+    collected = Metrics()
+    collected.record('GET', '/api/users/me', 200, 0.02, received=100)
+    collected.record('GET', '/api/users/me', None, 0.3)
+
+    metrics.write(collected, tmp_path / 'cli.prom')
+    metrics.write(collected, tmp_path / 'cli.json')
+
+    prom = (tmp_path / 'cli.prom').read_text()
+    labels = 'method="GET",endpoint="/api/users/me"'
+    assert (
+        f'papermerge_cli_request_duration_seconds_bucket'
+        f'{{{labels},le="0.025"}} 1'
+    ) in prom
+    assert (
+        f'papermerge_cli_request_duration_seconds_bucket'
+        f'{{{labels},le="+Inf"}} 2'
+    ) in prom
+    assert f'papermerge_cli_requests_total{{{labels},status="error"}} 1' \
+        in prom
+    assert f'papermerge_cli_request_received_bytes_total{{{labels}}} 100' \
+        in prom
+
+    data = json.loads((tmp_path / 'cli.json').read_text())
+    assert data['total']['requests'] == 2
+    assert data['total']['errors'] == 1
+    [endpoint] = data['endpoints']
+    assert endpoint['statuses'] == {'200': 1, 'error': 1}
+    assert endpoint['latency_seconds']['max'] == 0.3
+    # no temporary files are left behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == \
+        ['cli.json', 'cli.prom']
@@ -0,0 +1,73 @@
+from email.parser import BytesParser
+
+import papermerge_cli.tracing as tracing
+from papermerge_cli.multipart import MultipartFile
+
+
+def parse(body: MultipartFile, data: bytes):
+    message = (
+        f'Content-Type: {body.content_type}\r\n\r\n'.encode() + data
+    )
+    return BytesParser().parsebytes(message)
+
+
+def test_multipart_file_body(tmp_path):
+    file_path = tmp_path / 'invoice.pdf'
+    content = bytes(range(256)) * 1000
+    file_path.write_bytes(content)
+
+    with MultipartFile(file_path, 'application/pdf', chunk_size=1000) as body:
+        expected_length = len(body)
+        data = b''.join(body)
+
+    assert len(data) == expected_length
+    message = parse(body, data)
+    [part] = message.get_payload()
+    assert part.get_filename() == 'invoice.pdf'
+    assert part.get_param('name', header='content-disposition') == 'file'
+    assert part.get_content_type() == 'application/pdf'
+    assert part.get_payload(decode=True) == content
+
+
+def test_multipart_file_name_is_escaped(tmp_path):
+    file_path = tmp_path / 'scan "1"\r\nX-Injected: yes.pdf'
+    file_path.write_bytes(b'content')
+
+    with MultipartFile(file_path, 'application/pdf') as body:
+        data = body.read()
+
+    [part] = parse(body, data).get_payload()
+    assert part.get_filename() == 'scan %221%22%0D%0AX-Injected: yes.pdf'
+    assert part['X-Injected'] is None
+    assert part.get_payload(decode=True) == b'content'
+
+
+def test_multipart_file_reads_in_bounded_chunks(tmp_path):
+    file_path = tmp_path / 'scan.pdf'
+    file_path.write_bytes(b'x' * 10_000)
+
+    with MultipartFile(file_path, 'application/pdf') as body:
+        chunks = iter(lambda: body.read(512), b'')
+        assert all(len(chunk) <= 512 for chunk in chunks)
+
+    assert body._file.closed
+
+
+def test_file_read_is_traced_once_per_pass(tmp_path):
+    file_path = tmp_path / 'scan.pdf'
+    file_path.write_bytes(b'x' * 100_000)
+    tracer = tracing.enable()
+    try:
+        with MultipartFile(file_path, 'application/pdf') as body:
+            while body.read(1024):
+                pass
+            # resent e.g. on retry, interrupted half way
+            body.rewind()
+            body.read(1024)  # preamble
+            body.read(50_000)
+    finally:
+        tracing.disable()
+
+    reads = [event for event in tracer.events() if event['name'] == 'read']
+    assert [read['args']['size'] for read in reads] == [100_000, 50_000]
+    assert reads[0]['args']['file'] == 'scan.pdf'
@@ -0,0 +1,76 @@
+import uuid
+
+from laconiq import make
+
+from papermerge_cli.lib.ocr import wait_for_ocr
+from papermerge_cli.schema import Node, Paginator
+
+
+def listing(statuses: dict[uuid.UUID, str]) -> dict:
+    """Response of folder listing with documents in given OCR status"""
+    items = [
+        make(
+            Node,
+            id=document_id,
+            ctype='document',
+            parent_id=uuid.uuid4(),
+            tags=[],
+            document={'ocr': True, 'ocr_status': status}
+        )
+        for document_id, status in statuses.items()
+    ]
+    page = make(Paginator, page_number=1, num_pages=1, items=items)
+
+    return {'text': page.model_dump_json()}
+
+
+def test_wait_for_ocr_polls_folders_until_all_done(requests_mock):
+    folder_a, folder_b = uuid.uuid4(), uuid.uuid4()
+    doc_1, doc_2, doc_3 = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    list_a = requests_mock.get(f'http://test/api/nodes/{folder_a}', [
+        listing({doc_1: 'STARTED', doc_2: 'RECEIVED'}),
+        listing({doc_1: 'SUCCESS', doc_2: 'STARTED'}),
+        listing({doc_1: 'SUCCESS', doc_2: 'FAILED'}),
+    ])
+    list_b = requests_mock.get(
+        f'http://test/api/nodes/{folder_b}',
+        **listing({doc_3: 'SUCCESS'})
+    )
+
+    stats = wait_for_ocr(
+        host='http://test',
+        token='abc',
+        documents={doc_1: folder_a, doc_2: folder_a, doc_3: folder_b},
+        timeout=10,
+        initial_interval=0.01
+    )
+
+    assert stats.success == 2
+    assert stats.failed == [doc_2]
+    assert stats.pending == stats.missing == []
+    assert stats.polls == 3
+    # one request per folder and poll; finished folder is not listed
+    assert list_a.call_count == 3
+    assert list_b.call_count == 1
+
+
+def test_wait_for_ocr_times_out(requests_mock):
+    folder_id, document_id, deleted_id = [uuid.uuid4() for _ in range(3)]
+    requests_mock.get(
+        f'http://test/api/nodes/{folder_id}',
+        **listing({document_id: 'STARTED'})
+    )
+
+    stats = wait_for_ocr(
+        host='http://test',
+        token='abc',
+        documents={document_id: folder_id, deleted_id: folder_id},
+        timeout=0.1,
+        initial_interval=0.01
+    )
+
+    assert stats.timed_out
+    assert stats.pending == [document_id]
+    assert stats.missing == [deleted_id]
+    # interval grows while nothing finishes
+    assert stats.polls < 10
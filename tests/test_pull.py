@@ -0,0 +1,208 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from laconiq import make
+
+from papermerge_cli.lib.pull import pull_folder
+from papermerge_cli.schema import Document, Node, Paginator
+
+
+class Server:
+    """Mocked folder tree with downloadable documents
+
+    /
+    ├── A/
+    │   └── a.pdf
+    └── root.pdf
+    """
+
+    def __init__(self, requests_mock):
+        self.requests_mock = requests_mock
+        self.root_id = uuid.uuid4()
+        self.folder_a = self.node('A', 'folder')
+        self.a_pdf = self.node('a.pdf')
+        self.root_pdf = self.node('root.pdf')
+        self.children = {
+            self.root_id: [self.folder_a, self.root_pdf],
+            self.folder_a.id: [self.a_pdf],
+        }
+        self.contents = {}
+        self.set_content(self.a_pdf, b'content of a')
+        self.set_content(self.root_pdf, b'content of root')
+        self.mock_folders()
+
+    def node(self, title: str, ctype: str = 'document') -> Node:
+        return make(
+            Node,
+            ctype=ctype,
+            title=title,
+            parent_id=uuid.uuid4(),
+            tags=[],
+            document={'ocr': True, 'ocr_status': 'SUCCESS'}
+            if ctype == 'document' else None
+        )
+
+    def mock_folders(self):
+        for folder_id, children in self.children.items():
+            payload = make(
+                Paginator,
+                page_number=1,
+                num_pages=1,
+                items=children
+            ).model_dump_json()
+            self.requests_mock.get(
+                f'http://test/api/nodes/{folder_id}',
+                text=payload
+            )
+
+    def set_content(self, node: Node, content: bytes):
+        """Uploads new version of the document"""
+        version_id = uuid.uuid4()
+        download_url = f'/api/document-versions/{version_id}/download'
+        node.updated_at += timedelta(seconds=1)
+        document = make(
+            Document,
+            id=node.id,
+            ctype='document',
+            parent_id=uuid.uuid4(),
+            breadcrumb=[],
+            versions=[{
+                'id': version_id,
+                'number': 1,
+                'lang': 'deu',
+                'file_name': node.title,
+                'size': len(content),
+                'short_description': '',
+                'document_id': node.id,
+                'download_url': download_url,
+            }]
+        )
+        self.requests_mock.get(
+            f'http://test/api/documents/{node.id}',
+            text=document.model_dump_json()
+        )
+        self.requests_mock.get(f'http://test{download_url}', content=content)
+
+    def requested(self) -> list[str]:
+        """Paths requested (other than folder listings) since last call"""
+        paths = [
+            request.path
+            for request in self.requests_mock.request_history
+            if not request.path.startswith('/api/nodes/')
+        ]
+        self.requests_mock.reset_mock()
+
+        return paths
+
+
+def pull(server: Server, target_dir, delete=False):
+    stats = pull_folder(
+        host='http://test',
+        token='abc',
+        folder_id=server.root_id,
+        target_dir=target_dir,
+        workers=2,
+        delete=delete
+    )
+    assert stats.errors == []
+
+    return stats
+
+
+def test_pull_mirrors_folder_tree(requests_mock, tmp_path):
+    server = Server(requests_mock)
+
+    stats = pull(server, tmp_path)
+
+    assert (stats.downloaded, stats.skipped) == (2, 0)
+    assert (tmp_path / 'A' / 'a.pdf').read_bytes() == b'content of a'
+    assert (tmp_path / 'root.pdf').read_bytes() == b'content of root'
+
+
+def test_repeated_pull_requests_nothing(requests_mock, tmp_path):
+    server = Server(requests_mock)
+    pull(server, tmp_path)
+    server.requested()
+
+    stats = pull(server, tmp_path)
+
+    assert (stats.downloaded, stats.skipped) == (0, 2)
+    assert server.requested() == []
+
+
+def test_pull_transfers_only_changed_documents(requests_mock, tmp_path):
+    server = Server(requests_mock)
+    pull(server, tmp_path)
+    server.set_content(server.a_pdf, b'new content of a')
+    # renamed on server; content stays the same
+    server.root_pdf.title = 'renamed.pdf'
+    server.root_pdf.updated_at += timedelta(seconds=1)
+    server.mock_folders()
+    server.requested()
+
+    stats = pull(server, tmp_path)
+
+    assert (stats.downloaded, stats.moved, stats.skipped) == (1, 1, 0)
+    assert len([p for p in server.requested() if 'download' in p]) == 1
+    assert (tmp_path / 'A' / 'a.pdf').read_bytes() == b'new content of a'
+    assert (tmp_path / 'renamed.pdf').read_bytes() == b'content of root'
+    assert not (tmp_path / 'root.pdf').exists()
+
+
+def test_pull_deletes_removed_documents(requests_mock, tmp_path):
+    server = Server(requests_mock)
+    pull(server, tmp_path)
+    (tmp_path / 'local.txt').write_text('not pulled')
+    server.children[server.root_id] = [server.folder_a]
+    server.mock_folders()
+
+    stats = pull(server, tmp_path, delete=True)
+
+    assert stats.removed == 1
+    assert not (tmp_path / 'root.pdf').exists()
+    assert (tmp_path / 'local.txt').exists()
+
+
+def test_same_titled_documents_keep_their_files(requests_mock, tmp_path):
+    server = Server(requests_mock)
+    twin = server.node('root.pdf')
+    server.set_content(twin, b'content of twin')
+    server.children[server.root_id].append(twin)
+    server.mock_folders()
+    pull(server, tmp_path)
+    files = {
+        path.name: path.read_bytes() for path in tmp_path.glob('root*.pdf')
+    }
+
+    # walk yields the twins in reverse order; twin changed meanwhile
+    server.children[server.root_id].reverse()
+    server.set_content(twin, b'new content of twin')
+    server.mock_folders()
+    stats = pull(server, tmp_path)
+
+    assert (stats.downloaded, stats.skipped) == (1, 2)
+    assert files['root.pdf'] == b'content of root'
+    assert (tmp_path / 'root.pdf').read_bytes() == b'content of root'
+    assert (tmp_path / f'root-{twin.id}.pdf').read_bytes() == \
+        b'new content of twin'
+
+
+def test_pull_does_not_trust_files_it_did_not_pull(requests_mock, tmp_path):
+    server = Server(requests_mock)
+    # same size as root.pdf, other content
+    (tmp_path / 'root.pdf').write_bytes(b'x' * len(b'content of root'))
+
+    stats = pull(server, tmp_path)
+
+    assert stats.downloaded == 2
+    assert (tmp_path / 'root.pdf').read_bytes() == b'content of root'
+
+
+def test_pull_refuses_mirror_of_other_folder(requests_mock, tmp_path):
+    server = Server(requests_mock)
+    pull(server, tmp_path)
+    server.root_id = server.folder_a.id
+
+    with pytest.raises(ValueError, match='is a mirror of folder'):
+        pull(server, tmp_path)
@@ -0,0 +1,179 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from laconiq import make
+
+import papermerge_cli.api_client as api_client
+import papermerge_cli.retry as retry
+from papermerge_cli.api_client import ApiClient
+from papermerge_cli.exceptions import ServerUnavailable
+from papermerge_cli.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+from papermerge_cli.schema.users import User
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records delays instead of sleeping"""
+    delays = []
+    monkeypatch.setattr(api_client.time, 'sleep', delays.append)
+
+    return delays
+
+
+def test_get_is_retried_on_bad_gateway(requests_mock, sleeps):
+    user = make(User)
+    requests_mock.get(
+        'http://test/api/users/me',
+        [
+            {'status_code': 502, 'text': 'Bad Gateway'},
+            {'status_code': 503, 'text': 'Unavailable'},
+            {'status_code': 200, 'text': user.model_dump_json()},
+        ]
+    )
+    client = ApiClient[User](token='abc', host='http://test')
+
+    got_user = client.get('/api/users/me', response_model=User)
+
+    assert got_user == user
+    assert len(sleeps) == 2
+
+
+def test_retry_after_is_honoured(requests_mock, sleeps):
+    requests_mock.post(
+        'http://test/api/nodes/',
+        [
+            {'status_code': 429, 'headers': {'Retry-After': '7'}},
+            {'status_code': 201, 'json': {}},
+        ]
+    )
+    client = ApiClient(token='abc', host='http://test')
+
+    client.post('/api/nodes/', json={})
+
+    assert sleeps == [7.0]
+
+
+def test_post_is_not_retried_on_server_error(requests_mock, sleeps):
+    mocked = requests_mock.post(
+        'http://test/api/nodes/',
+        status_code=500,
+        text='Internal Server Error'
+    )
+    client = ApiClient(token='abc', host='http://test')
+
+    with pytest.raises(ValueError):
+        client.post('/api/nodes/', json={})
+
+    assert mocked.call_count == 1
+
+
+def test_get_gives_up_after_max_retries(requests_mock, sleeps):
+    mocked = requests_mock.get(
+        'http://test/api/users/me',
+        exc=requests.ConnectionError
+    )
+    client = ApiClient[User](token='abc', host='http://test')
+
+    with pytest.raises(requests.ConnectionError):
+        client.get('/api/users/me', response_model=User)
+
+    assert mocked.call_count == RetryPolicy().max_retries + 1
+
+
+def test_backoff_delays_are_bounded():
+    policy = RetryPolicy(max_retries=20, backoff_factor=1, max_backoff=8)
+    retry = policy.begin()
+
+    delays = [retry.on_response('GET', 503) for _ in range(20)]
+
+    assert all(0 <= delay <= 8 for delay in delays)
+    assert retry.on_response('GET', 503) is None
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure()
+
+    with pytest.raises(ServerUnavailable):
+        breaker.before_request()
+
+
+def test_circuit_breaker_closes_after_successful_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    # trial request is let through
+    breaker.before_request()
+    breaker.record_success()
+
+    assert not breaker.is_open
+
+
+def test_calls_in_progress_outlast_open_circuit(requests_mock, monkeypatch):
+    user = make(User)
+    blip_ends_at = time.monotonic() + 0.3
+
+    def server(request, context):
+        if time.monotonic() < blip_ends_at:
+            context.status_code = 502
+            return 'Bad Gateway'
+        return user.model_dump_json()
+
+    class InProgressBreaker(CircuitBreaker):
+        """Lets all calls in before the first one fails"""
+        calls = itertools.count()
+        all_in = threading.Barrier(8)
+
+        def before_request(self):
+            super().before_request()
+            if next(self.calls) < 8:
+                self.all_in.wait(timeout=5)
+
+    requests_mock.get('http://test/api/users/me', text=server)
+    breaker = InProgressBreaker(failure_threshold=3, reset_timeout=0.5)
+    monkeypatch.setattr(
+        retry,
+        '_policy',
+        RetryPolicy(max_retries=3, backoff_factor=0.01, breaker=breaker)
+    )
+    client = ApiClient[User](token='abc', host='http://test')
+
+    def get_user(_):
+        return client.get('/api/users/me', response_model=User)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        users = list(executor.map(get_user, range(8)))
+
+    assert users == [user] * 8
+    assert not breaker.is_open
+    # new calls fail fast while circuit is open
+    for _ in range(3):
+        breaker.record_failure()
+    with pytest.raises(ServerUnavailable):
+        client.get('/api/users/me', response_model=User)
+
+
+def test_circuit_breaker_counts_failed_calls_not_attempts():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    retry = RetryPolicy(breaker=breaker).begin()
+
+    retry.before_attempt()
+    retry.on_response('GET', 502)
+    retry.before_attempt()
+    retry.on_response('GET', 502)
+
+    assert not breaker.is_open
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
@@ -0,0 +1,38 @@
+import json
+import uuid
+
+from laconiq import make
+
+from papermerge_cli.schema import Node, Paginator
+from papermerge_cli.schema.adapters import parse_json, type_adapter
+from papermerge_cli.types import OCRStatusEnum
+
+
+def node_payload(ctype: str) -> dict:
+    node = make(Node, ctype=ctype, document=None)
+    return {
+        **json.loads(node.model_dump_json()),
+        'document': {'ocr': False, 'ocr_status': 'STARTED'},
+    }
+
+
+def test_parse_paginated_nodes_from_raw_json():
+    body = json.dumps({
+        'page_size': 15,
+        'page_number': 1,
+        'num_pages': 1,
+        'items': [node_payload('document'), node_payload('folder')]
+    }).encode()
+
+    page = parse_json(Paginator[Node], body)
+
+    document, folder = page.items
+    assert document.document.ocr is False
+    assert document.document.ocr_status == OCRStatusEnum.started
+    # only documents keep their `document` part
+    assert folder.document is None
+    assert isinstance(document.id, uuid.UUID)
+
+
+def test_type_adapter_is_cached():
+    assert type_adapter(Paginator[Node]) is type_adapter(Paginator[Node])
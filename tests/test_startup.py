@@ -0,0 +1,68 @@
+"""Start up time of the CLI
+
+CLI is invoked many times a day from cron jobs/scanner hooks, thus
+importing `papermerge_cli.main` must stay cheap: heavy dependencies are
+imported only by commands which need them.
+"""
+import os
+import subprocess
+import sys
+
+# Modules which must not be imported just by loading the CLI
+HEAVY_MODULES = [
+    'requests',
+    'httpx',
+    'pydantic',
+    'email_validator',
+    'rich',
+    'sqlite3',
+    'papermerge_cli.api_client',
+    'papermerge_cli.rest',
+    'papermerge_cli.schema',
+    'papermerge_cli.lib.importer',
+]
+# Cumulative import time budget of `papermerge_cli.main`, it was ~300ms
+# when all dependencies were imported eagerly
+IMPORT_BUDGET_MS = float(
+    os.environ.get('PAPERMERGE_CLI_IMPORT_BUDGET_MS', 150)
+)
+
+
+def import_times() -> dict[str, int]:
+    """Returns cumulative import time (in us) of each imported module"""
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime',
+            '-c', 'import papermerge_cli.main'
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def test_cli_does_not_import_heavy_modules():
+    imported = import_times()
+
+    assert [
+        name for name in imported
+        if any(
+            name == module or name.startswith(f'{module}.')
+            for module in HEAVY_MODULES
+        )
+    ] == []
+
+
+def test_cli_import_time_is_within_budget():
+    # best of few runs, to make the measurement less noisy
+    best = min(import_times()['papermerge_cli.main'] for _ in range(3))
+
+    assert best / 1000 < IMPORT_BUDGET_MS
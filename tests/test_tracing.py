@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import papermerge_cli.tracing as tracing
+from papermerge_cli.api_client import ApiClient
+from papermerge_cli.schema.users import User
+
+
+@pytest.fixture
+def tracer():
+    yield tracing.enable()
+    tracing.disable()
+
+
+def events_of(tracer: tracing.Tracer, phase: str = 'X') -> list[dict]:
+    return [event for event in tracer.events() if event['ph'] == phase]
+
+
+def test_span_is_noop_when_disabled():
+    span = tracing.span('scan', 'scan', path='/tmp')
+
+    assert span is tracing.NOOP_SPAN
+    with span:
+        span.set(entries=1)
+
+
+def test_spans_record_thread_and_nesting(tracer):
+    def worker():
+        with tracing.span('read', 'io', size=10):
+            pass
+
+    with tracing.span('scan', 'scan') as span:
+        thread = threading.Thread(target=worker, name='worker-1')
+        thread.start()
+        thread.join()
+        span.set(entries=3)
+    with pytest.raises(ValueError):
+        with tracing.span('validate', 'validation'):
+            raise ValueError('bad')
+
+    read, scan, validate = events_of(tracer)
+    assert scan['name'] == 'scan'
+    assert scan['args'] == {'entries': 3}
+    assert scan['ts'] <= read['ts']
+    assert read['ts'] + read['dur'] <= scan['ts'] + scan['dur']
+    assert read['tid'] != scan['tid']
+    assert validate['args'] == {'error': 'ValueError'}
+    thread_names = {
+        event['tid']: event['args']['name']
+        for event in events_of(tracer, phase='M')
+        if event['name'] == 'thread_name'
+    }
+    assert thread_names[read['tid']] == 'worker-1'
+
+
+def test_asynchronous_spans_are_recorded_as_async_events(tracer):
+    async def request(number: int):
+        with tracing.span(f'GET /{number}', 'http', asynchronous=True):
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(request(1), request(2))
+
+    asyncio.run(main())
+
+    begins = events_of(tracer, phase='b')
+    ends = events_of(tracer, phase='e')
+    assert len(begins) == len(ends) == 2
+    # each request has its own id, although both ran in the same thread
+    assert {event['id'] for event in begins} == \
+        {event['id'] for event in ends}
+    assert len({event['id'] for event in begins}) == 2
+
+
+def test_api_client_calls_are_traced(requests_mock, tracer, tmp_path):
+    requests_mock.get('http://test/api/users/me', status_code=404)
+    client = ApiClient[User](token='abc', host='http://test')
+
+    with pytest.raises(ValueError):
+        client.get('/api/users/me', response_model=User)
+    path = tmp_path / 'trace.json'
+    tracing.write(tracer, path)
+
+    trace = json.loads(path.read_text())
+    [request] = [
+        event for event in trace['traceEvents'] if event.get('cat') == 'http'
+    ]
+    assert request['name'] == 'GET /api/users/me'
+    assert request['args'] == {'status': 404, 'retries': 0}
+    assert trace['displayTimeUnit'] == 'ms'
@@ -0,0 +1,126 @@
+import threading
+import uuid
+
+from laconiq import make
+
+import papermerge_cli.lib.tree as tree
+from papermerge_cli.lib.tree import walk_tree
+from papermerge_cli.schema import Node, Paginator
+
+
+def mock_folder(requests_mock, folder_id, children: list[Node]):
+    payload = make(
+        Paginator,
+        page_number=1,
+        num_pages=1,
+        items=children
+    ).model_dump_json()
+    requests_mock.get(f'http://test/api/nodes/{folder_id}', text=payload)
+
+
+def folder(title: str) -> Node:
+    return make(Node, ctype='folder', title=title, document=None)
+
+
+def document(title: str) -> Node:
+    return make(
+        Node,
+        ctype='document',
+        title=title,
+        document={'ocr': True, 'ocr_status': 'SUCCESS'}
+    )
+
+
+def make_tree(requests_mock) -> uuid.UUID:
+    """
+    /
+    ├── A/
+    │   ├── B/
+    │   │   └── b.pdf
+    │   └── a.pdf
+    └── root.pdf
+    """
+    root_id = uuid.uuid4()
+    folder_a, folder_b = folder('A'), folder('B')
+    mock_folder(requests_mock, root_id, [folder_a, document('root.pdf')])
+    mock_folder(requests_mock, folder_a.id, [folder_b, document('a.pdf')])
+    mock_folder(requests_mock, folder_b.id, [document('b.pdf')])
+
+    return root_id
+
+
+def test_walk_tree_yields_all_nodes_with_paths(requests_mock):
+    root_id = make_tree(requests_mock)
+
+    entries = list(walk_tree(
+        host='http://test',
+        token='abc',
+        folder_id=root_id,
+        workers=4
+    ))
+
+    assert {entry.path: entry.depth for entry in entries} == {
+        '/A': 1,
+        '/root.pdf': 1,
+        '/A/B': 2,
+        '/A/a.pdf': 2,
+        '/A/B/b.pdf': 3,
+    }
+
+
+def test_walk_tree_respects_max_depth(requests_mock):
+    root_id = make_tree(requests_mock)
+
+    entries = walk_tree(
+        host='http://test',
+        token='abc',
+        folder_id=root_id,
+        max_depth=2
+    )
+
+    assert sorted(entry.path for entry in entries) == [
+        '/A', '/A/B', '/A/a.pdf', '/root.pdf'
+    ]
+
+
+def test_walk_tree_hands_workers_only_what_they_can_list(
+    requests_mock,
+    monkeypatch
+):
+    root_id = uuid.uuid4()
+    subfolders = [folder(f'F{number:02}') for number in range(30)]
+    mock_folder(requests_mock, root_id, subfolders)
+    for subfolder in subfolders:
+        mock_folder(requests_mock, subfolder.id, [document('a.pdf')])
+    lock = threading.Lock()
+    queued, most_queued = 0, 0
+
+    class CountingExecutor(tree.ThreadPoolExecutor):
+        """Counts work items waiting in executor queue for a worker"""
+
+        def submit(self, fn, *args):
+            nonlocal queued, most_queued
+
+            def started(*args):
+                nonlocal queued
+                with lock:
+                    queued -= 1
+                fn(*args)
+
+            with lock:
+                queued += 1
+                most_queued = max(most_queued, queued)
+            return super().submit(started, *args)
+
+    monkeypatch.setattr(tree, 'ThreadPoolExecutor', CountingExecutor)
+
+    entries = list(walk_tree(
+        host='http://test',
+        token='abc',
+        folder_id=root_id,
+        workers=2
+    ))
+
+    assert len(entries) == 60
+    # discovered folders wait in the frontier, not in executor queue
+    assert most_queued <= 2
@@ -0,0 +1,166 @@
+import json
+import queue
+import re
+import threading
+import time
+import uuid
+
+from laconiq import make
+
+from papermerge_cli.lib.journal import journal_path
+from papermerge_cli.lib.watch import Watcher, WatchResult, watch_folder
+from papermerge_cli.schema import Document, Folder
+
+
+def mock_server(requests_mock) -> list[dict]:
+    """Mocks node creation and upload; returns list of created nodes"""
+    created = []
+
+    def create_node(request, context):
+        data = json.loads(request.body)
+        model = Folder if data['ctype'] == 'folder' else Document
+        node = make(
+            model,
+            title=data['title'],
+            ctype=data['ctype'],
+            parent_id=data['parent_id'],
+            breadcrumb=[],
+            versions=[]
+        )
+        created.append(data)
+        context.status_code = 201
+        return json.loads(node.model_dump_json())
+
+    def upload(request, context):
+        node = make(
+            Document,
+            id=request.path.split('/')[3],
+            ctype='document',
+            parent_id=uuid.uuid4(),
+            breadcrumb=[],
+            versions=[]
+        )
+        return json.loads(node.model_dump_json())
+
+    requests_mock.post('http://test/api/nodes/', json=create_node)
+    requests_mock.post(
+        re.compile('http://test/api/documents/.*/upload'),
+        json=upload
+    )
+
+    return created
+
+
+class RunningWatcher:
+    """Runs watcher in background thread; results are queued"""
+
+    def __init__(self, watch_dir, **kwargs):
+        self.results: queue.Queue[WatchResult] = queue.Queue()
+        self.watcher = Watcher(
+            host='http://test',
+            token='abc',
+            watch_dir=watch_dir,
+            parent_id=uuid.uuid4(),
+            on_result=self.results.put,
+            **kwargs
+        )
+        self.thread = threading.Thread(target=self.watcher.run)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.watcher.stop()
+        self.thread.join()
+
+    def next_result(self, timeout: float = 5) -> WatchResult:
+        return self.results.get(timeout=timeout)
+
+
+def test_watch_uploads_dropped_file_shortly(tmp_path, requests_mock):
+    created = mock_server(requests_mock)
+
+    with RunningWatcher(tmp_path, settle=5) as running:
+        # give observer time to start watching
+        time.sleep(0.2)
+        started = time.monotonic()
+        (tmp_path / 'scan.pdf').write_bytes(b'scanned')
+        result = running.next_result()
+        latency = time.monotonic() - started
+
+    assert result.ok
+    assert result.path == tmp_path / 'scan.pdf'
+    assert [node['title'] for node in created] == ['scan.pdf']
+    # closed file is complete; settle period does not apply
+    assert latency < 1
+
+
+def test_watch_uploads_existing_files_and_sub_folders(
+    tmp_path,
+    requests_mock
+):
+    created = mock_server(requests_mock)
+    (tmp_path / 'a.pdf').write_bytes(b'a')
+    sub = tmp_path / 'sub'
+    sub.mkdir()
+    (sub / 'b.pdf').write_bytes(b'b')
+    (sub / 'c.pdf').write_bytes(b'c')
+    (tmp_path / '.tmp-scan.pdf').write_bytes(b'incomplete')
+
+    with RunningWatcher(tmp_path, settle=0.1, delete=True) as running:
+        results = [running.next_result() for _ in range(3)]
+
+    assert all(result.ok for result in results)
+    titles = sorted(node['title'] for node in created)
+    # sub-folder is created only once
+    assert titles == ['a.pdf', 'b.pdf', 'c.pdf', 'sub']
+    assert sorted(path.name for path in tmp_path.rglob('*')) == [
+        '.tmp-scan.pdf', 'sub'
+    ]
+
+
+def test_watch_journal_is_apart_from_import_journal(tmp_path):
+    parent_id = uuid.uuid4()
+    journals = []
+
+    def on_start(watcher):
+        journals.append(watcher.journal.path)
+        watcher.stop()
+
+    watch_folder(
+        host='http://test',
+        token='abc',
+        watch_dir=tmp_path,
+        parent_id=parent_id,
+        on_start=on_start
+    )
+
+    # import of the same folder removes its journal once done
+    assert journals[0] != journal_path(
+        'http://test',
+        source=tmp_path,
+        target_id=parent_id
+    )
+    assert journals[0].parent.name == 'watch'
+
+
+def test_file_is_not_complete_while_being_written(tmp_path):
+    watcher = Watcher(
+        host='http://test',
+        token='abc',
+        watch_dir=tmp_path,
+        parent_id=uuid.uuid4(),
+        settle=0.2
+    )
+    path = tmp_path / 'scan.pdf'
+
+    watcher.touch(path)
+    time.sleep(0.1)
+    watcher.touch(path)
+    started = time.monotonic()
+    batch = watcher._next_batch()
+
+    assert batch == [path]
+    # writing postponed the upload
+    assert time.monotonic() - started >= 0.15